@@ -20,6 +20,7 @@ import './UniqueMappings.sol';
 contract Competition is AccessControlRci, ICompetition, CompetitionStorage,
 Initializable, ICompetitionV2, UniqueMappings
 {
+    uint256 private constant BPS_DENOMINATOR = 10000;
 
     function initialize(uint256 stakeThreshold_, uint256 rewardsThreshold_, address tokenAddress_)
     external
@@ -126,6 +127,17 @@ Initializable, ICompetitionV2, UniqueMappings
         success = _updateDeadlines(challengeNumber, index, timestamp);
     }
 
+    function updateDeadlinesBatch(uint32 challengeNumber, uint256[] calldata indices, uint256[] calldata timestamps)
+    external override onlyRole(RCI_CHILD_ADMIN)
+    returns (bool success)
+    {
+        require(indices.length == timestamps.length, "ARER");
+        for (uint i = 0; i < indices.length; i++){
+            _updateDeadlines(challengeNumber, indices[i], timestamps[i]);
+        }
+        success = true;
+    }
+
     function updateRewardsThreshold(uint256 newThreshold)
     external override onlyRole(RCI_CHILD_ADMIN)
     returns (bool success)
@@ -235,6 +247,37 @@ Initializable, ICompetitionV2, UniqueMappings
         success = _payRewards(_challengeCounter, submitters, stakingRewards, challengeRewards, tournamentRewards);
     }
 
+    function payStakingRewardsProRata(uint256 totalBudget, uint256 startIndex, uint256 endIndex)
+    external override onlyRole(RCI_CHILD_ADMIN)
+    returns (bool success)
+    {
+        uint32 challengeNumber = _challengeCounter;
+        require(_challenges[challengeNumber].phase == 3, "WGPH");
+        // the cursor only moves forward, and no chunk starts once it has reached the end of the set.
+        require(startIndex == stakingRewardsCursor[challengeNumber], "WGIX");
+        require(startIndex < endIndex && endIndex <= EnumerableSet.length(_historicalStakerSet[challengeNumber]),
+            "WGIX");
+        if (startIndex == 0){
+            _currentStakingRewardsBudget = totalBudget;
+        } else {
+            require(totalBudget == _currentStakingRewardsBudget, "WGBG");
+        }
+        uint256 totalStake = _historicalTotalStake[challengeNumber];
+        require(totalStake > 0, "NOST");
+
+        // rewards are rounded down, so the unpaid remainder of the budget stays in the competition pool.
+        uint256 totalStakingAmount;
+        for (uint i = startIndex; i < endIndex; i++){
+            address staker = EnumerableSet.at(_historicalStakerSet[challengeNumber], i);
+            uint256 stakingReward = totalBudget * _historicalStakeAmounts[challengeNumber][staker] / totalStake;
+            totalStakingAmount += stakingReward;
+            _paySingleAddress(challengeNumber, staker, stakingReward, 0, 0);
+        }
+        stakingRewardsCursor[challengeNumber] = endIndex;
+
+        success = _updateRewardTotals(challengeNumber, totalStakingAmount, 0, 0);
+    }
+
     function updateChallengeAndTournamentScores(uint32 challengeNumber, address[] calldata participants,
         uint256[] calldata challengeScores, uint256[] calldata tournamentScores)
     external override onlyRole(RCI_CHILD_ADMIN)
@@ -275,6 +318,32 @@ Initializable, ICompetitionV2, UniqueMappings
         emit BatchInformationUpdated(challengeNumber, itemNumber);
     }
 
+    function updateInformationMatrix(uint32 challengeNumber, address[] calldata participants,
+                                     uint256[] calldata itemNumbers, uint[] calldata values)
+    external override onlyRole(RCI_CHILD_ADMIN)
+    returns (bool success)
+    {
+        require(_challenges[challengeNumber].phase >= 3, "WGPH");
+        uint256 itemsCount = itemNumbers.length;
+        require(participants.length * itemsCount == values.length, "ARER");
+
+        // values are laid out one row per participant, with one column per item number.
+        for (uint i = 0; i < participants.length; i++)
+        {
+            mapping(uint256 => uint) storage info = _challenges[challengeNumber].submitterInfo[participants[i]].info;
+            for (uint j = 0; j < itemsCount; j++)
+            {
+                info[itemNumbers[j]] = values[i * itemsCount + j];
+            }
+        }
+        success = true;
+
+        for (uint j = 0; j < itemsCount; j++)
+        {
+            emit BatchInformationUpdated(challengeNumber, itemNumbers[j]);
+        }
+    }
+
     function advanceToPhase(uint8 phase)
     external override onlyRole(RCI_CHILD_ADMIN)
     returns (bool success)
@@ -323,6 +392,8 @@ Initializable, ICompetitionV2, UniqueMappings
     {
         uint32 challengeNumber = _challengeCounter;
         require(_challenges[challengeNumber].phase >= 2, "WGPH");
+        // the snapshot is frozen once the pro-rata payout has started, so every chunk divides by the same total.
+        require(stakingRewardsCursor[challengeNumber] == 0, "PRIP");
         for (uint i = startIndex; i < endIndex; i++){
             address staker = (EnumerableSet.at(stakerSet, i));
             uint256 stakeAmt = _stakes[staker];
@@ -388,6 +459,130 @@ Initializable, ICompetitionV2, UniqueMappings
         success = _burn(_challengeCounter, submitters, burnAmounts);
     }
 
+    function burnBps(address[] calldata submitters, uint16[] calldata bps)
+    external override onlyRole(RCI_CHILD_ADMIN)
+    returns (bool success)
+    {
+        uint32 challengeNumber = _challengeCounter;
+        require(_challenges[challengeNumber].phase == 3, "WGPH");
+        require((submitters.length == bps.length), "WGSL");
+
+        uint256 totalBurnAmount;
+        for (uint i = 0; i < submitters.length; i++)
+        {
+            totalBurnAmount += _burnSingleAddressBps(challengeNumber, submitters[i], bps[i]);
+        }
+
+        success = _updateBurnTotals(challengeNumber, totalBurnAmount);
+    }
+
+    function burnUniformBps(address[] calldata submitters, uint16 bps)
+    external override onlyRole(RCI_CHILD_ADMIN)
+    returns (bool success)
+    {
+        uint32 challengeNumber = _challengeCounter;
+        require(_challenges[challengeNumber].phase == 3, "WGPH");
+
+        uint256 totalBurnAmount;
+        for (uint i = 0; i < submitters.length; i++)
+        {
+            totalBurnAmount += _burnSingleAddressBps(challengeNumber, submitters[i], bps);
+        }
+
+        success = _updateBurnTotals(challengeNumber, totalBurnAmount);
+    }
+
+    function compactStakers(uint256 startIndex, uint256 endIndex)
+    external override onlyRole(RCI_CHILD_ADMIN)
+    returns (bool success)
+    {
+        require(_challenges[_challengeCounter].phase == 4, "WGPH");
+        uint256 removedCount;
+        // walk the range backwards so that when it ends at the end of the set, entries swapped
+        // into a freed index on removal have already been examined.
+        for (uint i = endIndex; i > startIndex; i--){
+            address staker = EnumerableSet.at(stakerSet, i - 1);
+            if (_stakes[staker] == 0){
+                EnumerableSet.remove(stakerSet, staker);
+                removedCount++;
+            }
+        }
+        success = true;
+
+        emit StakersCompacted(removedCount);
+    }
+
+    function recordChallengeArchive(uint32 challengeNumber, bytes32 archiveHash)
+    external override onlyRole(RCI_CHILD_ADMIN)
+    returns (bool success)
+    {
+        require(challengeNumber < _challengeCounter, "WGCH");
+        require(archiveHash != bytes32(0), "NOAR");
+        require(challengeArchiveHashes[challengeNumber] == bytes32(0), "ARST");
+        challengeArchiveHashes[challengeNumber] = archiveHash;
+        success = true;
+
+        emit ChallengeArchiveRecorded(challengeNumber, archiveHash);
+    }
+
+    function pruneChallenge(uint32 challengeNumber, uint256 startIndex, uint256 endIndex)
+    external override onlyRole(RCI_CHILD_ADMIN)
+    returns (bool success)
+    {
+        require(challengeNumber < _challengeCounter, "WGCH");
+        require(challengeArchiveHashes[challengeNumber] != bytes32(0), "NOAR");
+
+        // historical stakers are pruned first, followed by any submitters that were not part of the snapshot.
+        EnumerableSet.AddressSet storage participantSet = _historicalStakerSet[challengeNumber];
+        if (EnumerableSet.length(participantSet) == 0){
+            participantSet = _challenges[challengeNumber].submitters;
+        }
+
+        // walk the range backwards so that when it ends at the end of the set, removals do not reorder the set.
+        for (uint i = endIndex; i > startIndex; i--){
+            _pruneSingleAddress(challengeNumber, EnumerableSet.at(participantSet, i - 1));
+        }
+        success = true;
+
+        emit ChallengePruned(challengeNumber, endIndex - startIndex);
+    }
+
+    function importHistoricalStakes(uint32 challengeNumber, bytes calldata packed)
+    external override onlyRole(RCI_CHILD_ADMIN)
+    returns (bool success)
+    {
+        require(!migrationCompleted, "MGCP");
+        // Only the snapshots of past challenges are imported; the current one is recorded with `recordStakes`.
+        require(challengeNumber < _challengeCounter, "WGCH");
+        require(packed.length % 52 == 0, "WGLN");
+        EnumerableSet.AddressSet storage historicalStakerSet = _historicalStakerSet[challengeNumber];
+        uint256 totalStake = _historicalTotalStake[challengeNumber];
+        for (uint i = 0; i < packed.length; i += 52){
+            address staker = address(bytes20(packed[i:i + 20]));
+            uint256 stakeAmt = uint256(bytes32(packed[i + 20:i + 52]));
+            if (!EnumerableSet.add(historicalStakerSet, staker)) {
+                totalStake -= _historicalStakeAmounts[challengeNumber][staker];
+            }
+            totalStake += stakeAmt;
+            _historicalStakeAmounts[challengeNumber][staker] = stakeAmt;
+        }
+        _historicalTotalStake[challengeNumber] = totalStake;
+        success = true;
+
+        emit HistoricalStakesImported(challengeNumber, packed.length / 52);
+    }
+
+    function completeMigration()
+    external override onlyRole(RCI_CHILD_ADMIN)
+    returns (bool success)
+    {
+        require(!migrationCompleted, "MGCP");
+        migrationCompleted = true;
+        success = true;
+
+        emit MigrationCompleted(block.number);
+    }
+
     /**
     METHODS CALLABLE BY BOTH ADMIN AND PARTICIPANTS.
     **/
@@ -554,6 +749,27 @@ Initializable, ICompetitionV2, UniqueMappings
         deadline = _challenges[challengeNumber].deadlines[index];
     }
 
+    function getInformationPacked(uint32 challengeNumber, address participant, uint256 itemNumber)
+    external view override
+    returns (uint64[4] memory values)
+    {
+        uint256 packedValue = _challenges[challengeNumber].submitterInfo[participant].info[itemNumber];
+        for (uint i = 0; i < 4; i++){
+            values[i] = uint64(packedValue >> (64 * i));
+        }
+    }
+
+    function getDeadlinesBatch(uint32 challengeNumber, uint256[] calldata indices)
+    external view override
+    returns (uint256[] memory)
+    {
+        uint256[] memory deadlineList = new uint256[](indices.length);
+        for (uint i = 0; i < indices.length; i++){
+            deadlineList[i] = _challenges[challengeNumber].deadlines[indices[i]];
+        }
+        return deadlineList;
+    }
+
     function getMessage()
     external view override
     returns (string memory message)
@@ -586,6 +802,17 @@ Initializable, ICompetitionV2, UniqueMappings
         return stakeAmountList;
     }
 
+    function getStakesBatch(address[] calldata participants)
+    external view override
+    returns (uint256[] memory)
+    {
+        uint256[] memory stakeList = new uint256[](participants.length);
+        for (uint i = 0; i < participants.length; i++){
+            stakeList[i] = _stakes[participants[i]];
+        }
+        return stakeList;
+    }
+
     function getAllStakers()
     external view override
     returns (address[] memory)
@@ -783,6 +1010,14 @@ Initializable, ICompetitionV2, UniqueMappings
                 challengeRewards[i], tournamentRewards[i]);
         }
 
+        success = _updateRewardTotals(challengeNumber, totalStakingAmount, totalChallengeAmount, totalTournamentAmount);
+    }
+
+    function _updateRewardTotals(uint32 challengeNumber,
+        uint256 totalStakingAmount, uint256 totalChallengeAmount, uint256 totalTournamentAmount)
+    private
+    returns (bool success)
+    {
         _competitionPool -= totalStakingAmount + totalChallengeAmount + totalTournamentAmount;
         _currentTotalStaked += totalStakingAmount + totalChallengeAmount + totalTournamentAmount;
         challengePayments[challengeNumber] += totalStakingAmount + totalChallengeAmount + totalTournamentAmount;
@@ -808,6 +1043,13 @@ Initializable, ICompetitionV2, UniqueMappings
             _burnSingleAddress(challengeNumber, submitters[i], burnAmounts[i]);
         }
 
+        success = _updateBurnTotals(challengeNumber, totalBurnAmount);
+    }
+
+    function _updateBurnTotals(uint32 challengeNumber, uint256 totalBurnAmount)
+    private
+    returns (bool success)
+    {
         // allow for reverting on underflow
         _burnedAmount += totalBurnAmount;
         _currentTotalStaked -= totalBurnAmount;
@@ -819,7 +1061,11 @@ Initializable, ICompetitionV2, UniqueMappings
                                 uint256 challengeReward, uint256 tournamentReward)
     private
     {
-        _stakes[submitter] += stakingReward + challengeReward + tournamentReward;
+        uint256 totalReward = stakingReward + challengeReward + tournamentReward;
+        if (totalReward > 0){
+            _stakes[submitter] += totalReward;
+            EnumerableSet.add(stakerSet, submitter);
+        }
 
         if (stakingReward > 0){
             _challenges[challengeNumber].submitterInfo[submitter].stakingRewards += stakingReward;
@@ -839,7 +1085,12 @@ Initializable, ICompetitionV2, UniqueMappings
     function _burnSingleAddress(uint32 challengeNumber, address submitter, uint256 burnAmount)
     private
     {
-        _stakes[submitter] -= burnAmount;
+        uint256 remainingStake = _stakes[submitter] - burnAmount;
+        _stakes[submitter] = remainingStake;
+        if (remainingStake == 0){
+            EnumerableSet.remove(stakerSet, submitter);
+        }
+
         uint256 alreadyBurned = _challenges[challengeNumber].submitterInfo[submitter].tokensBurned;
         if (burnAmount > 0){
             _challenges[challengeNumber].submitterInfo[submitter].tokensBurned = burnAmount + alreadyBurned;
@@ -848,6 +1099,25 @@ Initializable, ICompetitionV2, UniqueMappings
         emit Burned(challengeNumber, submitter, burnAmount);
     }
 
+    function _burnSingleAddressBps(uint32 challengeNumber, address submitter, uint16 bps)
+    private
+    returns (uint256 burnAmount)
+    {
+        require(bps <= BPS_DENOMINATOR, "WGBP");
+        burnAmount = _stakes[submitter] * bps / BPS_DENOMINATOR;
+        _burnSingleAddress(challengeNumber, submitter, burnAmount);
+    }
+
+    function _pruneSingleAddress(uint32 challengeNumber, address participant)
+    private
+    {
+        // additional information items are left in place as their keys cannot be enumerated.
+        delete _challenges[challengeNumber].submitterInfo[participant];
+        delete _historicalStakeAmounts[challengeNumber][participant];
+        EnumerableSet.remove(_challenges[challengeNumber].submitters, participant);
+        EnumerableSet.remove(_historicalStakerSet[challengeNumber], participant);
+    }
+
     function _logRewardsPaid(uint32 challengeNumber,
         uint256 totalStakingAmount, uint256 totalChallengeAmount, uint256 totalTournamentAmount)
     private
@@ -42,7 +42,7 @@ contract CompetitionStorage {
     uint256 internal _competitionPool;
     uint256 internal _rewardsThreshold;
     uint256 internal _currentTotalStaked;
-    uint256 internal _currentStakingRewardsBudget; // unused
+    uint256 internal _currentStakingRewardsBudget; // budget of the ongoing payStakingRewardsProRata run
     uint256 internal _currentChallengeRewardsBudget; // unused
     uint256 internal _currentTournamentRewardsBudget; //unused
     string internal _message;
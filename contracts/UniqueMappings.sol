@@ -13,4 +13,7 @@ abstract contract UniqueMappings {
     mapping(bytes32 => bool) internal _publicKeyHashes;
     mapping(uint32 => uint256) public challengePayments;
     mapping(uint32 => uint256) public challengeBurns;
+    mapping(uint32 => bytes32) public challengeArchiveHashes;
+    mapping(uint32 => uint256) public stakingRewardsCursor;
+    bool public migrationCompleted;
 }
\ No newline at end of file
@@ -0,0 +1,34 @@
+pragma solidity ^0.8.4;
+
+// SPDX-License-Identifier: MIT
+
+import "OpenZeppelin/openzeppelin-contracts@4.8.0/contracts/token/ERC20/IERC20.sol";
+
+/**
+ * @dev Funds many local test accounts in one transaction.
+ * @dev Every recipient receives an equal share of the native currency sent and `tokenAmount` tokens,
+ * pulled from the caller, who must have approved this contract for the total.
+ */
+contract BulkFunder {
+
+    constructor(){}
+
+    function fund(address payable[] calldata recipients, address token, uint256 tokenAmount)
+    external payable
+    returns (bool success)
+    {
+        require(recipients.length > 0, "No recipients.");
+        uint256 nativeAmount = msg.value / recipients.length;
+        require(nativeAmount * recipients.length == msg.value, "Uneven value.");
+        for (uint i = 0; i < recipients.length; i++) {
+            if (nativeAmount > 0) {
+                (bool sent, ) = recipients[i].call{value: nativeAmount}("");
+                require(sent, "Native transfer failed.");
+            }
+            if (tokenAmount > 0) {
+                require(IERC20(token).transferFrom(msg.sender, recipients[i], tokenAmount), "Token transfer failed.");
+            }
+        }
+        success = true;
+    }
+}
@@ -17,6 +17,10 @@ interface ICompetitionV2{
         uint256 maxBurnMin, uint256 maxBurnCap, uint256 maxBurnPercentage);
     event VaultUpdated(address indexed vault);
     event Burned(uint32 indexed challengeNumber, address indexed submitter, uint256 indexed burnAmount);
+    event StakersCompacted(uint256 indexed removedCount);
+    event ChallengeArchiveRecorded(uint32 indexed challengeNumber, bytes32 indexed archiveHash);
+    event ChallengePruned(uint32 indexed challengeNumber, uint256 indexed prunedCount);
+    event HistoricalStakesImported(uint32 indexed challengeNumber, uint256 indexed importedCount);
 
     /**
     ADMIN WRITE METHODS
@@ -33,6 +37,47 @@ interface ICompetitionV2{
     function recordStakes(uint256 startIndex, uint256 endIndex)
     external returns (bool success);
 
+    /**
+    * @dev Called by admin to pay staking rewards for the current challenge in proportion to the recorded stakes.
+    * @dev Each historical staker receives `totalBudget * stake / historical total stake`, rounded down. The rounding
+    * @dev remainder is never deducted and stays in the competition pool.
+    * @dev Payment can be split into chunks over the historical stakers. Chunks must be paid in order: `startIndex`
+    * @dev must equal the end of the previous chunk (see `stakingRewardsCursor`) and `totalBudget` must stay the same.
+    * @dev Stakes must have been fully recorded with `recordStakes` before the first chunk is paid.
+    * @param totalBudget Total staking rewards to distribute over all historical stakers of the current challenge.
+    * @param startIndex Starting index of historical stakers to pay.
+    * @param endIndex Ending index of historical stakers to pay, exclusive.
+    * @return success True if the operation completed successfully.
+    **/
+    function payStakingRewardsProRata(uint256 totalBudget, uint256 startIndex, uint256 endIndex)
+    external returns (bool success);
+
+    /**
+    * @dev Called by admin to update several additional information items for a list of participants
+    * @dev in a single call. Values are passed as a flattened matrix with one row per participant and one column per
+    * @dev item number, i.e. the value of `itemNumbers[j]` for `participants[i]` is `values[i * itemNumbers.length + j]`.
+    * @dev Small values can be packed four to an item as uint64s, lowest bits first, and read with
+    * @dev `getInformationPacked`.
+    * @param challengeNumber Challenge to update information for.
+    * @param participants List of participants' addresses.
+    * @param itemNumbers List of items to update.
+    * @param values Flattened matrix of values to store.
+    * @return success True if the operation completed successfully.
+    **/
+    function updateInformationMatrix(uint32 challengeNumber, address[] calldata participants,
+        uint256[] calldata itemNumbers, uint[] calldata values)
+    external returns (bool success);
+
+    /**
+    * @dev Called by admin to update several deadlines of a challenge in a single call.
+    * @param challengeNumber Challenge to perform the update for.
+    * @param indices List of deadline indices to update.
+    * @param timestamps List of corresponding deadline timestamps in milliseconds.
+    * @return success True if the operation completed successfully.
+    **/
+    function updateDeadlinesBatch(uint32 challengeNumber, uint256[] calldata indices, uint256[] calldata timestamps)
+    external returns (bool success);
+
     /**
     * @dev Called by admin to move the existing burned amount to the competition pool.
     * @param amount Amount to move. Must be <= to the amount burned that has not been moved to
@@ -77,10 +122,108 @@ interface ICompetitionV2{
     function burn(address[] calldata submitters, uint256[] calldata slashAmounts)
     external returns (bool success);
 
+    /**
+    * @dev Called by admin to decrement participant stakes by a proportion of their current stakes.
+    * @dev Burned amounts are rounded down and accounted for in the same way as `burn`.
+    * @param submitters List of addresses of participants to decrement stakes of.
+    * @param bps List of proportions of each participant's stake to burn, in basis points (10000 = 100%).
+    * @return success True if the operation completed successfully.
+    **/
+    function burnBps(address[] calldata submitters, uint16[] calldata bps)
+    external returns (bool success);
+
+    /**
+    * @dev Called by admin to decrement participant stakes by the same proportion of their current stakes.
+    * @dev Burned amounts are rounded down and accounted for in the same way as `burn`.
+    * @param submitters List of addresses of participants to decrement stakes of.
+    * @param bps Proportion of each participant's stake to burn, in basis points (10000 = 100%).
+    * @return success True if the operation completed successfully.
+    **/
+    function burnUniformBps(address[] calldata submitters, uint16 bps)
+    external returns (bool success);
+
+    /**
+    * @dev Called by admin to remove addresses with a zero stake from the set of current stakers.
+    * @dev Stakes reduced to zero by `decreaseStake` or `burn` are removed automatically. This is for clearing entries
+    * @dev left behind by earlier versions of this contract. It can only be called in phase 4.
+    * @dev A start and end index must be specified so that large sets can be compacted in chunks. Chunks should be
+    * @dev processed from the end of the set towards the start, with `endIndex` equal to the current number of
+    * @dev stakers, so that no entry is skipped when the set is reordered on removal.
+    * @param startIndex Starting index to compact.
+    * @param endIndex Ending index to compact, exclusive.
+    * @return success True if the operation completed successfully.
+    **/
+    function compactStakers(uint256 startIndex, uint256 endIndex)
+    external returns (bool success);
+
+    /**
+    * @dev Called by admin to record a commitment to the per-participant data of a finished challenge before it is
+    * @dev pruned, so that pruned values remain verifiable off-chain. Can only be recorded once per challenge.
+    * @param challengeNumber Finished challenge to record the commitment for.
+    * @param archiveHash Merkle root (or other hash) of the archived per-participant records.
+    * @return success True if the operation completed successfully.
+    **/
+    function recordChallengeArchive(uint32 challengeNumber, bytes32 archiveHash)
+    external returns (bool success);
+
+    /**
+    * @dev Called by admin to clear per-participant storage of a finished challenge whose archive has been recorded.
+    * @dev Clears the historical stake amounts, submission, rewards, scores and burned amounts of each participant
+    * @dev and removes them from the historical staker and submitter sets. Historical stakers are pruned first,
+    * @dev then any remaining submitters. Additional information items are not cleared.
+    * @dev A start and end index must be specified so that pruning can be split into chunks. Chunks should be
+    * @dev processed from the end of the set towards the start, with `endIndex` equal to the current number of
+    * @dev remaining historical stakers (or submitters, once no historical stakers remain).
+    * @param challengeNumber Finished challenge to prune.
+    * @param startIndex Starting index to prune.
+    * @param endIndex Ending index to prune, exclusive.
+    * @return success True if the operation completed successfully.
+    **/
+    function pruneChallenge(uint32 challengeNumber, uint256 startIndex, uint256 endIndex)
+    external returns (bool success);
+
+    /**
+    * @dev Called by admin during a migration to import the stakes snapshot of a past challenge, one before the
+    * @dev latest challenge.
+    * @dev Records can be imported in chunks. A staker already in the snapshot has their amount overwritten and the
+    * @dev historical total adjusted, so a chunk can be sent again safely.
+    * @param challengeNumber Challenge to import the snapshot of.
+    * @param packed Records of 52 bytes each: the staker address (20 bytes) followed by the staked amount (32 bytes).
+    * @return success True if the operation completed successfully.
+    **/
+    function importHistoricalStakes(uint32 challengeNumber, bytes calldata packed)
+    external returns (bool success);
+
+    /**
+    * @dev Called by admin to mark the migration as complete. Historical stakes can no longer be imported after this.
+    * @return success True if the operation completed successfully.
+    **/
+    function completeMigration()
+    external returns (bool success);
+
     /**
     READ METHODS
     **/
 
+    /**
+    * @dev Get an additional information item that holds four packed uint64 values, lowest bits first.
+    * @param challengeNumber Challenge to get the additional information of.
+    * @param participant Address of participant to check on.
+    * @param itemNumber Additional information item to check on.
+    * @return values The four uint64 values packed into this item.
+    **/
+    function getInformationPacked(uint32 challengeNumber, address participant, uint256 itemNumber)
+    external view returns (uint64[4] memory values);
+
+    /**
+    * @dev Get several deadlines of a challenge in a single call.
+    * @param challengeNumber Challenge to get the deadlines of.
+    * @param indices List of deadline indices to retrieve.
+    * @return List of deadlines in milliseconds, in the same order as `indices`.
+    **/
+    function getDeadlinesBatch(uint32 challengeNumber, uint256[] calldata indices)
+    external view returns (uint256[] memory);
+
     /**
     * @dev Get the full list of addresses that have made submission for the given challenge.
     * @param challengeNumber Challenge number to get list of submitters of.
@@ -105,6 +248,14 @@ interface ICompetitionV2{
     function getHistoricalStakeAmounts(uint32 challengeNumber, address[] calldata stakers)
     external view returns (uint256[] memory);
 
+    /**
+    * @dev Get the current staked amounts of specified addresses in a single call.
+    * @param participants List of addresses to get the staked amounts of.
+    * @return List of staked amounts, in the same order as `participants`.
+    **/
+    function getStakesBatch(address[] calldata participants)
+    external view returns (uint256[] memory);
+
     /**
     * @dev Get the number of addresses that currently have a staked amount > 0.
     * @return stakersCounter Number of addresses that currently have a staked amount > 0.
@@ -0,0 +1,103 @@
+"""
+Concurrent reads of the paged address sets.
+
+All pages of a set are requested at once, up to `max_concurrency` calls in flight, and yielded in order, so the
+result is the same list a serial loop over `startIndex`/`endIndex` would build. Every call of one read is made at
+the same pinned block, so pages are consistent with each other even while new blocks arrive.
+
+Calls are brownie contract calls run in a thread pool, which keeps the blocking web3 providers usable from asyncio.
+
+    reader = AsyncPagedReader(web3)
+    stakers = reader.run(reader.collect(reader.historical_stakers(competition, challenge_number)))
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PAGE_SIZE = 2500
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class AsyncPagedReader:
+    def __init__(self, web3, page_size=DEFAULT_PAGE_SIZE, max_concurrency=DEFAULT_MAX_CONCURRENCY, retries=3,
+                 retry_delay=0.5):
+        self.web3 = web3
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def close(self):
+        self.executor.shutdown()
+
+    def run(self, coroutine):
+        return asyncio.run(coroutine)
+
+    async def call(self, fn, args, block, semaphore=None):
+        """Call the view function `fn(*args)` at `block`, retrying failed calls with an increasing delay."""
+        loop = asyncio.get_running_loop()
+        semaphore = semaphore if semaphore is not None else asyncio.Semaphore(1)
+        for attempt in range(self.retries + 1):
+            async with semaphore:
+                try:
+                    return await loop.run_in_executor(self.executor, lambda: fn(*args, block_identifier=block))
+                except Exception:
+                    if attempt == self.retries:
+                        raise
+            await asyncio.sleep(self.retry_delay * 2 ** attempt)
+
+    async def pages(self, fn_counter, fn_partial, args=(), block=None):
+        """
+        Yield the pages of `fn_partial(*args, start, end)` in order. `fn_counter(*args)` gives the size of the set.
+        `block` defaults to the latest block when the read starts.
+        """
+        block = self.web3.eth.block_number if block is None else block
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        counter = await self.call(fn_counter, list(args), block, semaphore)
+        tasks = [asyncio.ensure_future(self.call(fn_partial, list(args) + [i, min(i + self.page_size, counter)],
+                                                 block, semaphore))
+                 for i in range(0, counter, self.page_size)]
+        try:
+            for task in tasks:
+                yield list(await task)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def items(self, fn_counter, fn_partial, args=(), block=None):
+        async for page in self.pages(fn_counter, fn_partial, args, block):
+            for item in page:
+                yield item
+
+    async def collect(self, async_iterable):
+        return [item async for item in async_iterable]
+
+    def historical_stakers(self, competition, challenge_number, block=None):
+        return self.items(competition.getHistoricalStakersCounter, competition.getHistoricalStakersPartial,
+                          [challenge_number], block)
+
+    def submitters(self, competition, challenge_number, block=None):
+        return self.items(competition.getSubmissionCounter, competition.getSubmitters, [challenge_number], block)
+
+    def stakers(self, competition, block=None):
+        return self.items(competition.getStakersCounter, competition.getStakers, [], block)
+
+    def shareholders(self, token, block=None):
+        return self.items(token.numberOfShareHolders, token.getShareHolders, [], block)
+
+    async def historical_stakes(self, competition, challenge_number, block=None):
+        """Yield `(staker, amount)` for the stakes snapshot of `challenge_number`, in set order."""
+        block = self.web3.eth.block_number if block is None else block
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pages = await self.collect(self.pages(competition.getHistoricalStakersCounter,
+                                              competition.getHistoricalStakersPartial, [challenge_number], block))
+        tasks = [asyncio.ensure_future(self.call(competition.getHistoricalStakeAmounts, [challenge_number, page],
+                                                 block, semaphore))
+                 for page in pages]
+        try:
+            for page, task in zip(pages, tasks):
+                for staker, amount in zip(page, await task):
+                    yield staker, amount
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,171 @@
+"""
+Gas and scaling benchmark of the Competition settlement paths.
+
+For each population size a fresh token and competition are deployed, every staker stakes and submits, and the
+settlement calls are run in chunks planned by `SettlementPlanner` under the block gas limit. The report records,
+per size and operation, the gas per call and per element, the wall time, and the largest chunk that fits in one
+block. Gas per element is compared against a stored baseline; the run fails if it grew by more than `tolerance`.
+
+    brownie run benchmark
+    brownie run benchmark main 10,100 benchmarks/baseline.json benchmarks/report.json
+    brownie run benchmark main 10,100,1000,10000 benchmarks/baseline.json benchmarks/report.json 0.05 true
+
+The last argument writes the report as the new baseline. Stakers are funded in bulk, but each of them still sends
+its own stake, so setting up 10,000 stakers takes a while on a local chain.
+"""
+import json
+import os
+import sys
+import time
+from brownie import ChildToken, Competition, accounts, web3
+from web3 import Web3
+from scripts.settlement import SettlementPlanner, Operation, record_stakes_operation, pay_rewards_operation, \
+    burn_operation, scores_operation
+from scripts.population import derive_accounts, fund_accounts
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+DEFAULT_BASELINE = 'benchmarks/baseline.json'
+DEFAULT_REPORT = 'benchmarks/report.json'
+DEFAULT_TOLERANCE = 0.05
+
+STAKE_AMOUNT = 100 * 10 ** 6
+NATIVE_FUNDING = 10 ** 15
+
+
+def deploy(admin, stakers):
+    token = ChildToken.deploy({'from': admin})
+    token.initialize('Yiedl', 'YIEDL', 100_000_000 * 10 ** 6 + len(stakers) * 2 * STAKE_AMOUNT, admin, {'from': admin})
+    competition = Competition.deploy({'from': admin})
+    competition.initialize(10 ** 6, 0, token, {'from': admin})
+    token.authorizeCompetition(competition, 'Benchmark', {'from': admin})
+
+    fund_accounts(token, admin, stakers, NATIVE_FUNDING, STAKE_AMOUNT)
+
+    sponsor_amount = len(stakers) * 10 * 10 ** 6
+    token.increaseAllowance(competition, sponsor_amount, {'from': admin})
+    competition.sponsor(sponsor_amount, {'from': admin})
+    now = int(time.time() * 1000)
+    competition.openChallenge(Web3.keccak(text='dataset'), Web3.keccak(text='key'), now + 86400000, now + 864000000,
+                              {'from': admin})
+    for i, staker in enumerate(stakers):
+        token.stakeAndSubmit(competition, STAKE_AMOUNT, Web3.keccak(text='submission-{}'.format(i)), {'from': staker})
+    return token, competition
+
+
+def measure_transactions(planner, operation):
+    model = planner.fit(operation)
+    start = time.time()
+    txs = planner.execute(operation, planner.plan(operation, model))
+    seconds = time.time() - start
+    gas_total = sum(tx.gas_used for tx in txs)
+    return {
+        'elements': operation.count,
+        'calls': len(txs),
+        'gas_total': gas_total,
+        'gas_per_call': gas_total // max(1, len(txs)),
+        'gas_per_element': gas_total / max(1, operation.count),
+        'seconds': seconds,
+        'max_chunk': model.max_items(planner.gas_ceiling / planner.safety_margin),
+    }
+
+
+def measure_view(planner, fn, args, chunk_operation):
+    result = {'elements': chunk_operation.count, 'calls': 1}
+    try:
+        gas = fn.estimate_gas(*args)
+        start = time.time()
+        fn(*args)
+        result.update({'gas_total': gas, 'gas_per_call': gas, 'gas_per_element': gas / max(1, chunk_operation.count),
+                       'seconds': time.time() - start})
+    except Exception as e:
+        # Calls over the node's gas cap fail outright; the largest chunk still shows how to page them.
+        result['error'] = str(e)
+    model = planner.fit(chunk_operation)
+    result['max_chunk'] = model.max_items(planner.gas_ceiling / planner.safety_margin)
+    return result
+
+
+def run_size(count, admin, block_gas_limit):
+    stakers = derive_accounts(count, seed='benchmark')
+    token, competition = deploy(admin, stakers)
+    challenge_number = competition.getLatestChallengeNumber()
+    planner = SettlementPlanner({'from': admin}, gas_ceiling=block_gas_limit)
+    results = {}
+
+    competition.closeSubmission({'from': admin})
+    results['recordStakes'] = measure_transactions(planner, record_stakes_operation(competition))
+    competition.advanceToPhase(3, {'from': admin})
+
+    results['updateChallengeAndTournamentScores'] = measure_transactions(
+        planner, scores_operation(competition, challenge_number, stakers, list(range(count)), list(range(count))))
+    results['payRewards'] = measure_transactions(
+        planner, pay_rewards_operation(competition, stakers, [10 ** 6] * count, [10 ** 6] * count, [10 ** 6] * count))
+    results['burn'] = measure_transactions(planner, burn_operation(competition, stakers, [10 ** 5] * count))
+
+    results['getHistoricalStakeAmounts'] = measure_view(
+        planner, competition.getHistoricalStakeAmounts, [challenge_number, stakers],
+        Operation(competition.getHistoricalStakeAmounts, count, lambda s, e: [challenge_number, stakers[s:e]]))
+    results['getAllSubmitters'] = measure_view(
+        planner, competition.getAllSubmitters, [challenge_number],
+        Operation(competition.getSubmitters, count, lambda s, e: [challenge_number, s, e]))
+    return results
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, block_gas_limit=None):
+    admin = accounts[0]
+    block_gas_limit = web3.eth.get_block('latest')['gasLimit'] if block_gas_limit is None else block_gas_limit
+    report = {'block_gas_limit': block_gas_limit, 'results': {}}
+    for count in sizes:
+        print('Benchmarking {} stakers.'.format(count))
+        report['results'][str(count)] = run_size(count, admin, block_gas_limit)
+    return report
+
+
+def compare_to_baseline(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Return a description of every operation whose gas per element exceeds the baseline by more than `tolerance`."""
+    regressions = []
+    for size, operations in report['results'].items():
+        for name, result in operations.items():
+            expected = baseline.get('results', {}).get(size, {}).get(name, {}).get('gas_per_element')
+            actual = result.get('gas_per_element')
+            if expected is None or actual is None:
+                continue
+            if actual > expected * (1 + tolerance):
+                regressions.append('{} with {} stakers: {:.0f} gas per element, baseline {:.0f}.'.format(
+                    name, size, actual, expected))
+    return regressions
+
+
+def write_json(path, content):
+    if os.path.dirname(path) != '':
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(content, f, indent=2, sort_keys=True)
+
+
+def main(sizes=None, baseline_path=DEFAULT_BASELINE, report_path=DEFAULT_REPORT, tolerance=DEFAULT_TOLERANCE,
+         update_baseline=False):
+    sizes = DEFAULT_SIZES if sizes is None else [int(s) for s in str(sizes).split(',')]
+    report = run_benchmark(sizes)
+    write_json(report_path, report)
+
+    for size, operations in report['results'].items():
+        for name, result in operations.items():
+            print('{:>6} {:<36} {:>12} gas/element {:>8} calls {:>8} max chunk'.format(
+                size, name, '{:.0f}'.format(result['gas_per_element']) if 'gas_per_element' in result else '-',
+                result['calls'], str(result['max_chunk'])))
+
+    if str(update_baseline).lower() == 'true':
+        write_json(baseline_path, report)
+        print('Baseline written to {}.'.format(baseline_path))
+        return report
+    if not os.path.exists(baseline_path):
+        print('No baseline found at {}.'.format(baseline_path))
+        return report
+    with open(baseline_path) as f:
+        regressions = compare_to_baseline(report, json.load(f), float(tolerance))
+    for regression in regressions:
+        print('Regression: {}'.format(regression))
+    if len(regressions) > 0:
+        sys.exit(1)
+    return report
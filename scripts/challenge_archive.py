@@ -0,0 +1,121 @@
+"""
+Archiving of finished challenges before their per-participant storage is pruned.
+
+The records of a challenge are read through the competition getters, hashed into Merkle leaves and the root is
+committed on-chain with `recordChallengeArchive`. Once committed, `pruneChallenge` can clear the storage, and any
+pruned value can later be proven against the root with `get_merkle_proof`.
+Leaves are ordered pairwise before hashing, matching OpenZeppelin's `MerkleProof.verify`.
+"""
+from web3 import Web3
+import eth_abi
+
+RECORD_FIELDS = ['challengeNumber', 'participant', 'staked', 'submission', 'stakingRewards', 'challengeRewards',
+                 'tournamentRewards', 'challengeScores', 'tournamentScores', 'tokensBurned']
+RECORD_TYPES = ['uint32', 'address', 'uint256', 'bytes32', 'uint256', 'uint256',
+                'uint256', 'uint256', 'uint256', 'uint256']
+
+_encode = getattr(eth_abi, 'encode', None) or eth_abi.encode_abi
+
+
+def get_paged(fn_counter, fn_partial, chunk=2500):
+    counter = fn_counter()
+    items = []
+    for i in range(0, counter, chunk):
+        items.extend(fn_partial(i, min(i + chunk, counter)))
+    return items
+
+
+def get_challenge_participants(competition, challenge_number, chunk=2500):
+    # Historical stakers first, followed by submitters that were not part of the stakes snapshot.
+    # This is the same order in which `pruneChallenge` walks the two sets.
+    stakers = get_paged(lambda: competition.getHistoricalStakersCounter(challenge_number),
+                        lambda s, e: competition.getHistoricalStakersPartial(challenge_number, s, e), chunk)
+    submitters = get_paged(lambda: competition.getSubmissionCounter(challenge_number),
+                           lambda s, e: competition.getSubmitters(challenge_number, s, e), chunk)
+    seen = set(stakers)
+    return stakers + [s for s in submitters if s not in seen]
+
+
+def get_challenge_records(competition, challenge_number, chunk=2500):
+    participants = get_challenge_participants(competition, challenge_number, chunk)
+    records = []
+    for i in range(0, len(participants), chunk):
+        participants_chunk = participants[i:i + chunk]
+        staked_chunk = competition.getHistoricalStakeAmounts(challenge_number, participants_chunk)
+        for participant, staked in zip(participants_chunk, staked_chunk):
+            records.append((
+                challenge_number,
+                participant,
+                staked,
+                bytes(competition.getSubmission(challenge_number, participant)),
+                competition.getStakingRewards(challenge_number, participant),
+                competition.getChallengeRewards(challenge_number, participant),
+                competition.getTournamentRewards(challenge_number, participant),
+                competition.getChallengeScores(challenge_number, participant),
+                competition.getTournamentScores(challenge_number, participant),
+                competition.getBurnedAmount(challenge_number, participant),
+            ))
+    return records
+
+
+def hash_record(record):
+    challenge_number, participant, *values = record
+    encoded = _encode(RECORD_TYPES, [challenge_number, Web3.toChecksumAddress(str(participant))] + values)
+    return Web3.keccak(encoded)
+
+
+def _hash_pair(a, b):
+    return Web3.keccak(a + b) if a < b else Web3.keccak(b + a)
+
+
+def _merkle_layers(leaves):
+    layers = [list(leaves)]
+    while len(layers[-1]) > 1:
+        layer = layers[-1]
+        next_layer = [_hash_pair(layer[i], layer[i + 1]) for i in range(0, len(layer) - 1, 2)]
+        if len(layer) % 2 == 1:
+            next_layer.append(layer[-1])
+        layers.append(next_layer)
+    return layers
+
+
+def merkle_root(leaves):
+    if len(leaves) == 0:
+        return bytes(32)
+    return bytes(_merkle_layers(leaves)[-1][0])
+
+
+def get_merkle_proof(leaves, index):
+    proof = []
+    for layer in _merkle_layers(leaves)[:-1]:
+        sibling = index ^ 1
+        if sibling < len(layer):
+            proof.append(bytes(layer[sibling]))
+        index //= 2
+    return proof
+
+
+def verify_merkle_proof(proof, root, leaf):
+    computed = leaf
+    for node in proof:
+        computed = _hash_pair(computed, node)
+    return bytes(computed) == bytes(root)
+
+
+def archive_challenge(competition, challenge_number, tx_params, chunk=2500):
+    """Commit the archive root of a finished challenge on-chain and return the archived records and root."""
+    records = get_challenge_records(competition, challenge_number, chunk)
+    root = merkle_root([hash_record(r) for r in records])
+    competition.recordChallengeArchive(challenge_number, root, tx_params)
+    return records, root
+
+
+def prune_challenge(competition, challenge_number, tx_params, chunk=500):
+    """Prune a challenge whose archive has been recorded, from the end of each set towards the start."""
+    txs = []
+    for counter_fn in [competition.getHistoricalStakersCounter, competition.getSubmissionCounter]:
+        remaining = counter_fn(challenge_number)
+        while remaining > 0:
+            txs.append(competition.pruneChallenge(challenge_number, max(0, remaining - chunk), remaining, tx_params))
+            remaining = counter_fn(challenge_number)
+    return txs
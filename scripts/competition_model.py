@@ -0,0 +1,334 @@
+"""
+Pure-Python reference model of the accounting and phase rules of `Competition`, staked through `Token`.
+
+Every method mirrors one transaction: it either applies the transaction to the model, or raises `ModelRevert`
+with the revert reason the contracts give, leaving the model unchanged. Arithmetic panics, such as burning more
+than a stake, raise `ModelRevert` with no reason. `check_invariants` asserts the accounting invariants in memory.
+
+    model = CompetitionModel(stake_threshold, rewards_threshold, {admin: 10 ** 12}, burn_recipient)
+    model.sponsor(admin, 10 ** 9)
+    model.open_challenge()
+    model.stake_and_submit(participant, 10 ** 8, submission_hash)
+"""
+BPS_DENOMINATOR = 10000
+ZERO_HASH = bytes(32)
+
+INSUFFICIENT_BALANCE = "ERC20: transfer amount exceeds balance"
+
+
+class ModelRevert(Exception):
+    def __init__(self, reason=None):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def _require(condition, reason=None):
+    if not condition:
+        raise ModelRevert(reason)
+
+
+class AddressSet:
+    """`EnumerableSet.AddressSet`, including the order it leaves behind on removal (swap and pop)."""
+    def __init__(self):
+        self._values = []
+        self._indexes = {}
+
+    def add(self, value):
+        if value in self._indexes:
+            return False
+        self._indexes[value] = len(self._values)
+        self._values.append(value)
+        return True
+
+    def remove(self, value):
+        index = self._indexes.pop(value, None)
+        if index is None:
+            return False
+        last = self._values.pop()
+        if index < len(self._values):
+            self._values[index] = last
+            self._indexes[last] = index
+        return True
+
+    def at(self, index):
+        _require(index < len(self._values))
+        return self._values[index]
+
+    def values(self):
+        return list(self._values)
+
+    def __contains__(self, value):
+        return value in self._indexes
+
+    def __len__(self):
+        return len(self._values)
+
+
+class CompetitionModel:
+    def __init__(self, stake_threshold, rewards_threshold, balances, burn_recipient):
+        """
+        `balances` are the token balances of the accounts that will send transactions, and `burn_recipient`
+        the account tokens moved out of the burned amount are sent to.
+        """
+        self.stake_threshold = stake_threshold
+        self.rewards_threshold = rewards_threshold
+        self.burn_recipient = burn_recipient
+        self.balances = dict(balances)
+        self.balances.setdefault(burn_recipient, 0)
+        self.balance = 0
+
+        self.challenge_counter = 0
+        self.phases = {0: 4}
+        self.competition_pool = 0
+        self.total_staked = 0
+        self.burned_amount = 0
+        self.stakes = {}
+        self.staker_set = AddressSet()
+
+        self.submissions = {}
+        self.submitters = {}
+        self.historical_stakers = {}
+        self.historical_stake_amounts = {}
+        self.historical_total_stake = {}
+        self.challenge_payments = {}
+        self.challenge_burns = {}
+        self.staking_rewards_cursor = {}
+        self.staking_rewards_budget = 0
+
+    """
+    VIEWS
+    """
+
+    @property
+    def phase(self):
+        return self.phases[self.challenge_counter]
+
+    @property
+    def remainder(self):
+        # Negative values are returned as is; the contract reverts on them.
+        return self.balance - self.total_staked - self.competition_pool - self.burned_amount
+
+    def get_stake(self, staker):
+        return self.stakes.get(staker, 0)
+
+    def get_submission(self, challenge_number, staker):
+        return self.submissions.get((challenge_number, staker), ZERO_HASH)
+
+    def get_submitters(self, challenge_number):
+        return self.submitters.setdefault(challenge_number, AddressSet())
+
+    def get_historical_stakers(self, challenge_number):
+        return self.historical_stakers.setdefault(challenge_number, AddressSet())
+
+    def check_invariants(self):
+        assert self.remainder >= 0, "Negative remainder."
+        assert sum(self.stakes.values()) == self.total_staked, "Stakes do not add up to the total staked."
+        assert set(self.staker_set.values()) == set(s for s, a in self.stakes.items() if a > 0), \
+            "Staker set does not match non-zero stakes."
+        assert 1 <= self.phase <= 4, "Invalid phase."
+        submitters = self.get_submitters(self.challenge_counter)
+        assert set(submitters.values()) == set(s for (c, s), h in self.submissions.items()
+                                               if c == self.challenge_counter and h != ZERO_HASH), \
+            "Submitter set does not match non-zero submissions."
+
+    """
+    TOKEN
+    """
+
+    def _transfer_to_competition(self, sender, amount):
+        _require(self.balances.get(sender, 0) >= amount, INSUFFICIENT_BALANCE)
+        self.balances[sender] -= amount
+        self.balance += amount
+
+    def transfer(self, sender, amount):
+        """A plain token transfer to the competition, which shows up in the remainder."""
+        self._transfer_to_competition(sender, amount)
+
+    def sponsor(self, sponsor, amount):
+        self._transfer_to_competition(sponsor, amount)
+        self.competition_pool += amount
+
+    def increase_stake(self, staker, amount):
+        _require(self.phase == 1, "STUK")
+        current = self.get_stake(staker)
+        _require(current + amount >= self.stake_threshold, "MIN")
+        self._transfer_to_competition(staker, amount)
+        self.stakes[staker] = current + amount
+        self.total_staked += amount
+        self.staker_set.add(staker)
+
+    def decrease_stake(self, staker, amount):
+        _require(self.phase == 1, "STUK")
+        current = self.get_stake(staker)
+        _require(amount <= current, "Insufficient funds.")
+        remaining = current - amount
+        _require(remaining == 0 or remaining >= self.stake_threshold, "MIN")
+        if remaining == 0:
+            _require(self.get_submission(self.challenge_counter, staker) == ZERO_HASH, "SBBK")
+            self.staker_set.remove(staker)
+        self.stakes[staker] = remaining
+        self.total_staked -= amount
+        self.balance -= amount
+        self.balances[staker] = self.balances.get(staker, 0) + amount
+
+    def stake_and_submit(self, staker, amount, submission_hash):
+        _require(self.phase == 1, "WGPH")
+        challenge_number = self.challenge_counter
+        key = (challenge_number, staker)
+        previous = self.submissions.get(key, ZERO_HASH)
+        self.submissions[key] = submission_hash
+        try:
+            current = self.get_stake(staker)
+            if amount > current:
+                self.increase_stake(staker, amount - current)
+            else:
+                self.decrease_stake(staker, current - amount)
+        except ModelRevert:
+            self.submissions[key] = previous
+            raise
+        if submission_hash == ZERO_HASH:
+            self.get_submitters(challenge_number).remove(staker)
+        else:
+            self.get_submitters(challenge_number).add(staker)
+
+    """
+    CHALLENGE PHASES
+    """
+
+    def open_challenge(self):
+        _require(self.phase == 4, "WGPH")
+        _require(self.competition_pool >= self.rewards_threshold, "NORW")
+        self.challenge_counter += 1
+        self.phases[self.challenge_counter] = 1
+
+    def close_submission(self):
+        _require(self.phase == 1, "PH1")
+        self.phases[self.challenge_counter] = 2
+
+    def advance_to_phase(self, phase):
+        challenge_number = self.challenge_counter
+        _require(2 < phase < 5 and phase - 1 == self.phase, "WGPH")
+        if phase == 4:
+            _require(self.challenge_payments.get(challenge_number, 0) > 0 or
+                     self.challenge_burns.get(challenge_number, 0) > 0, "PYBN")
+        self.phases[challenge_number] = phase
+
+    def retreat_to_phase(self, phase):
+        _require(0 < phase < 4 and phase + 1 == self.phase, "WGPH")
+        self.phases[self.challenge_counter] = phase
+
+    def record_stakes(self, start_index, end_index):
+        _require(self.phase >= 2, "WGPH")
+        challenge_number = self.challenge_counter
+        _require(self.staking_rewards_cursor.get(challenge_number, 0) == 0, "PRIP")
+        stakers = [self.staker_set.at(i) for i in range(start_index, end_index)]
+        historical_stakers = self.get_historical_stakers(challenge_number)
+        amounts = self.historical_stake_amounts.setdefault(challenge_number, {})
+        for staker in stakers:
+            if historical_stakers.add(staker):
+                self.historical_total_stake[challenge_number] = \
+                    self.historical_total_stake.get(challenge_number, 0) + self.get_stake(staker)
+            amounts[staker] = self.get_stake(staker)
+
+    """
+    REWARDS AND BURNS
+    """
+
+    def _pay(self, challenge_number, rewards):
+        total = sum(rewards.values())
+        _require(total <= self.competition_pool)
+        for submitter, reward in rewards.items():
+            if reward > 0:
+                self.stakes[submitter] = self.get_stake(submitter) + reward
+                self.staker_set.add(submitter)
+        self.competition_pool -= total
+        self.total_staked += total
+        self.challenge_payments[challenge_number] = self.challenge_payments.get(challenge_number, 0) + total
+
+    def pay_rewards(self, submitters, staking_rewards, challenge_rewards, tournament_rewards):
+        _require(self.phase == 3, "WGPH")
+        _require(len(submitters) == len(staking_rewards) == len(challenge_rewards) == len(tournament_rewards),
+                 "ARER")
+        rewards = {}
+        for submitter, s, c, t in zip(submitters, staking_rewards, challenge_rewards, tournament_rewards):
+            rewards[submitter] = rewards.get(submitter, 0) + s + c + t
+        self._pay(self.challenge_counter, rewards)
+
+    def pay_staking_rewards_pro_rata(self, total_budget, start_index, end_index):
+        challenge_number = self.challenge_counter
+        _require(self.phase == 3, "WGPH")
+        _require(start_index == self.staking_rewards_cursor.get(challenge_number, 0), "WGIX")
+        _require(start_index < end_index <= len(self.get_historical_stakers(challenge_number)), "WGIX")
+        _require(start_index == 0 or total_budget == self.staking_rewards_budget, "WGBG")
+        total_stake = self.historical_total_stake.get(challenge_number, 0)
+        _require(total_stake > 0, "NOST")
+        historical_stakers = self.get_historical_stakers(challenge_number)
+        amounts = self.historical_stake_amounts.get(challenge_number, {})
+        rewards = {}
+        for i in range(start_index, end_index):
+            staker = historical_stakers.at(i)
+            rewards[staker] = rewards.get(staker, 0) + total_budget * amounts.get(staker, 0) // total_stake
+        self._pay(challenge_number, rewards)
+        self.staking_rewards_budget = total_budget
+        self.staking_rewards_cursor[challenge_number] = end_index
+
+    def _burn(self, burns):
+        # `burns` is a list of (submitter, amount) in call order.
+        challenge_number = self.challenge_counter
+        remaining = {}
+        for submitter, amount in burns:
+            current = remaining.get(submitter, self.get_stake(submitter))
+            _require(amount <= current)
+            remaining[submitter] = current - amount
+        for submitter, stake in remaining.items():
+            self.stakes[submitter] = stake
+            if stake == 0:
+                self.staker_set.remove(submitter)
+        total = sum(amount for _, amount in burns)
+        self.burned_amount += total
+        self.total_staked -= total
+        self.challenge_burns[challenge_number] = self.challenge_burns.get(challenge_number, 0) + total
+
+    def burn(self, submitters, burn_amounts):
+        _require(self.phase == 3, "WGPH")
+        _require(len(submitters) == len(burn_amounts), "WGSL")
+        self._burn(list(zip(submitters, burn_amounts)))
+
+    def burn_bps(self, submitters, bps):
+        _require(self.phase == 3, "WGPH")
+        _require(len(submitters) == len(bps), "WGSL")
+        remaining = {}
+        burns = []
+        for submitter, b in zip(submitters, bps):
+            _require(b <= BPS_DENOMINATOR, "WGBP")
+            current = remaining.get(submitter, self.get_stake(submitter))
+            amount = current * b // BPS_DENOMINATOR
+            remaining[submitter] = current - amount
+            burns.append((submitter, amount))
+        self._burn(burns)
+
+    def burn_uniform_bps(self, submitters, bps):
+        self.burn_bps(submitters, [bps] * len(submitters))
+
+    """
+    POOL MOVEMENTS
+    """
+
+    def move_remainder_to_pool(self):
+        _require(self.phase == 4, "WGPH")
+        remainder = self.remainder
+        _require(remainder > 0, "No remainder.")
+        self.competition_pool += remainder
+
+    def move_burned_to_pool(self, amount):
+        _require(self.phase == 4, "WGPH")
+        _require(amount <= self.burned_amount, "Not enough.")
+        self.burned_amount -= amount
+        self.competition_pool += amount
+
+    def move_burned_out(self, amount):
+        _require(self.phase == 4, "WGPH")
+        _require(amount <= self.burned_amount, "Not enough.")
+        self.burned_amount -= amount
+        self.balance -= amount
+        self.balances[self.burn_recipient] += amount
@@ -0,0 +1,10 @@
+"""
+Offline index of Competition events in a local SQLite store.
+
+    store = IndexStore('competition.db')
+    indexer = EventIndexer(web3, competition, store)
+    indexer.sync()
+    store.get_recorded_stakes(challenge_number)
+"""
+from .store import IndexStore
+from .indexer import EventIndexer, INDEXED_EVENTS
@@ -0,0 +1,172 @@
+"""
+Block-range event indexer for a Competition contract.
+
+Logs are fetched with `eth_getLogs` in batches of blocks and materialized into an `IndexStore`. The last indexed
+block and its hash are stored with the data, so indexing resumes where it stopped, and a hash mismatch on resume
+rolls the store back to the latest block still on the canonical chain.
+"""
+from web3 import Web3
+from web3.exceptions import BlockNotFound
+
+INDEXED_EVENTS = ['StakeIncreased', 'StakeDecreased', 'SubmissionUpdated', 'RewardsPayment', 'TotalRewardsPaid',
+                  'Burned', 'ChallengeOpened', 'SubmissionClosed', 'Sponsor']
+# How providers reject an `eth_getLogs` request whose range holds too many logs or blocks.
+LOG_LIMIT_ERROR_CODES = [-32005]
+LOG_LIMIT_ERROR_MESSAGES = ['query returned more than', 'response size', 'too many', 'block range', 'limit exceeded']
+
+
+def _event_signature(abi_entry):
+    return '{}({})'.format(abi_entry['name'], ','.join(i['type'] for i in abi_entry['inputs']))
+
+
+def _is_log_limit_error(error):
+    # web3 raises JSON-RPC errors as a `ValueError` holding the error object, or its message.
+    if not isinstance(error, ValueError) or len(error.args) == 0:
+        return False
+    detail = error.args[0]
+    if isinstance(detail, dict):
+        if detail.get('code') in LOG_LIMIT_ERROR_CODES:
+            return True
+        detail = detail.get('message', '')
+    return any(message in str(detail).lower() for message in LOG_LIMIT_ERROR_MESSAGES)
+
+
+class EventIndexer:
+    def __init__(self, web3, competition, store, batch_size=2000, confirmations=0, reorg_depth=128,
+                 start_block=0):
+        """
+        `competition` can be a brownie contract or any object with `address` and `abi` attributes.
+        Only blocks at least `confirmations` deep are indexed, and block hashes are kept for the last
+        `reorg_depth` blocks to find the common ancestor after a reorg.
+        """
+        self.web3 = web3
+        self.address = Web3.toChecksumAddress(str(competition.address))
+        self.contract = web3.eth.contract(address=self.address, abi=competition.abi)
+        self.store = store
+        self.batch_size = batch_size
+        self.confirmations = confirmations
+        self.reorg_depth = reorg_depth
+        self.start_block = start_block
+
+        self.events_by_topic = {}
+        for entry in competition.abi:
+            if entry['type'] == 'event' and entry['name'] in INDEXED_EVENTS:
+                topic = Web3.keccak(text=_event_signature(entry)).hex()
+                self.events_by_topic[topic] = getattr(self.contract.events, entry['name'])()
+
+        self.handlers = {
+            'StakeIncreased': self._on_stake_increased,
+            'StakeDecreased': self._on_stake_decreased,
+            'SubmissionUpdated': self._on_submission_updated,
+            'RewardsPayment': self._on_rewards_payment,
+            'TotalRewardsPaid': self._on_total_rewards_paid,
+            'Burned': self._on_burned,
+            'ChallengeOpened': self._on_challenge_opened,
+            'SubmissionClosed': self._on_submission_closed,
+            'Sponsor': self._on_sponsor,
+        }
+        self._challenge_number = store.get_latest_challenge_number()
+
+    def sync(self, to_block=None):
+        """Index up to `to_block` (default: the latest confirmed block) and return the last indexed block."""
+        head = self.web3.eth.block_number - self.confirmations
+        to_block = head if to_block is None else min(to_block, head)
+        self._handle_reorg()
+
+        cursor, _ = self.store.get_cursor()
+        from_block = self.start_block if cursor is None else cursor + 1
+        while from_block <= to_block:
+            end_block = min(from_block + self.batch_size - 1, to_block)
+            self._index_range(from_block, end_block)
+            from_block = end_block + 1
+        cursor, _ = self.store.get_cursor()
+        return cursor
+
+    def _block_hash(self, block_number):
+        return self.web3.eth.get_block(block_number)['hash'].hex()
+
+    def _is_canonical(self, block_number, block_hash):
+        # A block that no longer exists was dropped by a reorg to a shorter chain; other errors propagate.
+        try:
+            return self._block_hash(block_number) == block_hash
+        except BlockNotFound:
+            return False
+
+    def _handle_reorg(self):
+        cursor, cursor_hash = self.store.get_cursor()
+        if cursor is None or self._is_canonical(cursor, cursor_hash):
+            return False
+        # Walk back through the stored hashes to the latest block still on the canonical chain.
+        for block_number, block_hash in self.store.get_recent_blocks():
+            if self._is_canonical(block_number, block_hash):
+                self.store.rollback(block_number, block_hash)
+                break
+        else:
+            self.store.rollback(self.start_block - 1)
+        self.store.commit()
+        self._challenge_number = self.store.get_latest_challenge_number()
+        return True
+
+    def _get_logs(self, from_block, to_block):
+        try:
+            return self.web3.eth.get_logs({'address': self.address, 'fromBlock': from_block, 'toBlock': to_block,
+                                           'topics': [list(self.events_by_topic.keys())]})
+        except ValueError as e:
+            # Providers cap the size of a single response; split the range until it fits. Other errors propagate.
+            if from_block == to_block or not _is_log_limit_error(e):
+                raise
+            middle = (from_block + to_block) // 2
+            return self._get_logs(from_block, middle) + self._get_logs(middle + 1, to_block)
+
+    def _index_range(self, from_block, to_block):
+        logs = sorted(self._get_logs(from_block, to_block), key=lambda l: (l['blockNumber'], l['logIndex']))
+        for log in logs:
+            event = self.events_by_topic[log['topics'][0].hex()].processLog(log)
+            self.handlers[event['event']](log['blockNumber'], log['logIndex'], event['args'])
+            self.store.add_block(log['blockNumber'], log['blockHash'].hex())
+        self.store.set_cursor(to_block, self._block_hash(to_block))
+        self.store.prune_blocks(to_block - self.reorg_depth)
+        self.store.commit()
+
+    # Event handlers.
+
+    def _on_challenge_opened(self, block_number, log_index, args):
+        self._challenge_number = args['challengeNumber']
+        self.store.add_challenge_phase(block_number, log_index, args['challengeNumber'], 'opened')
+
+    def _on_submission_closed(self, block_number, log_index, args):
+        self.store.add_challenge_phase(block_number, log_index, args['challengeNumber'], 'closed')
+
+    def _on_stake_increased(self, block_number, log_index, args):
+        self.store.add_stake_change(block_number, log_index, self._challenge_number, args['sender'],
+                                    'increase', args['amount'])
+
+    def _on_stake_decreased(self, block_number, log_index, args):
+        self.store.add_stake_change(block_number, log_index, self._challenge_number, args['sender'],
+                                    'decrease', -args['amount'])
+
+    def _on_submission_updated(self, block_number, log_index, args):
+        self.store.add_submission(block_number, log_index, args['challengeNumber'], args['participantAddress'],
+                                  '0x' + bytes(args['newSubmissionHash']).hex())
+
+    def _on_rewards_payment(self, block_number, log_index, args):
+        total = args['stakingReward'] + args['challengeReward'] + args['tournamentReward']
+        self.store.add_reward(block_number, log_index, args['challengeNumber'], args['submitter'],
+                              args['stakingReward'], args['challengeReward'], args['tournamentReward'])
+        if total > 0:
+            self.store.add_stake_change(block_number, log_index, args['challengeNumber'], args['submitter'],
+                                        'reward', total)
+
+    def _on_total_rewards_paid(self, block_number, log_index, args):
+        self.store.add_reward_totals(block_number, log_index, args['challengeNumber'], args['totalStakingAmount'],
+                                     args['totalChallengeAmount'], args['totalTournamentAmount'])
+
+    def _on_burned(self, block_number, log_index, args):
+        self.store.add_burn(block_number, log_index, args['challengeNumber'], args['submitter'], args['burnAmount'])
+        if args['burnAmount'] > 0:
+            self.store.add_stake_change(block_number, log_index, args['challengeNumber'], args['submitter'],
+                                        'burn', -args['burnAmount'])
+
+    def _on_sponsor(self, block_number, log_index, args):
+        self.store.add_sponsor(block_number, log_index, self._challenge_number, args['sponsorAddress'],
+                               args['sponsorAmount'], args['poolTotal'])
@@ -0,0 +1,248 @@
+"""
+SQLite store for indexed Competition events.
+
+Every materialized row keeps the block number and log index of the event it came from, so rolling back a reorg
+is a delete of everything above the common ancestor. Token amounts are `uint256` on chain, wider than SQLite
+integers, so they are stored as decimal text and summed in Python.
+"""
+import sqlite3
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cursor (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    block_number INTEGER NOT NULL,
+    block_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    block_number INTEGER PRIMARY KEY,
+    block_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS challenge_phases (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    challenge_number INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE TABLE IF NOT EXISTS stake_changes (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    challenge_number INTEGER NOT NULL,
+    participant TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    delta TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index, participant)
+);
+CREATE INDEX IF NOT EXISTS stake_changes_challenge ON stake_changes (challenge_number, participant);
+CREATE TABLE IF NOT EXISTS submissions (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    challenge_number INTEGER NOT NULL,
+    participant TEXT NOT NULL,
+    submission TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS submissions_challenge ON submissions (challenge_number, participant);
+CREATE TABLE IF NOT EXISTS rewards (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    challenge_number INTEGER NOT NULL,
+    participant TEXT NOT NULL,
+    staking_reward TEXT NOT NULL,
+    challenge_reward TEXT NOT NULL,
+    tournament_reward TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS rewards_challenge ON rewards (challenge_number, participant);
+CREATE TABLE IF NOT EXISTS reward_totals (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    challenge_number INTEGER NOT NULL,
+    staking_amount TEXT NOT NULL,
+    challenge_amount TEXT NOT NULL,
+    tournament_amount TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE TABLE IF NOT EXISTS burns (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    challenge_number INTEGER NOT NULL,
+    participant TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS burns_challenge ON burns (challenge_number, participant);
+CREATE TABLE IF NOT EXISTS sponsors (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    challenge_number INTEGER NOT NULL,
+    sponsor TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    pool_total TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+'''
+
+def _amount(value):
+    return str(int(value))
+
+
+def _sum_by_participant(rows):
+    # {participant: sum of the amounts}, for rows of (participant, amount as decimal text).
+    totals = {}
+    for participant, amount in rows:
+        totals[participant] = totals.get(participant, 0) + int(amount)
+    return totals
+
+
+DATA_TABLES = ['challenge_phases', 'stake_changes', 'submissions', 'rewards', 'reward_totals', 'burns', 'sponsors']
+
+
+class IndexStore:
+    def __init__(self, path=':memory:'):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # Cursor and reorg tracking.
+
+    def get_cursor(self):
+        row = self.conn.execute('SELECT block_number, block_hash FROM cursor WHERE id = 0').fetchone()
+        return (row[0], row[1]) if row is not None else (None, None)
+
+    def set_cursor(self, block_number, block_hash):
+        self.conn.execute('INSERT OR REPLACE INTO cursor (id, block_number, block_hash) VALUES (0, ?, ?)',
+                          (block_number, block_hash))
+        self.conn.execute('INSERT OR REPLACE INTO blocks (block_number, block_hash) VALUES (?, ?)',
+                          (block_number, block_hash))
+
+    def add_block(self, block_number, block_hash):
+        self.conn.execute('INSERT OR REPLACE INTO blocks (block_number, block_hash) VALUES (?, ?)',
+                          (block_number, block_hash))
+
+    def get_recent_blocks(self):
+        return self.conn.execute('SELECT block_number, block_hash FROM blocks ORDER BY block_number DESC').fetchall()
+
+    def prune_blocks(self, below_block_number):
+        self.conn.execute('DELETE FROM blocks WHERE block_number < ?', (below_block_number,))
+
+    def rollback(self, block_number, block_hash=None):
+        # Remove everything indexed after `block_number`, a block on the canonical chain with hash `block_hash`.
+        # Without a hash, the cursor is cleared so that indexing restarts from the indexer's start block.
+        for table in DATA_TABLES:
+            self.conn.execute('DELETE FROM {} WHERE block_number > ?'.format(table), (block_number,))
+        self.conn.execute('DELETE FROM blocks WHERE block_number > ?', (block_number,))
+        if block_hash is None:
+            self.conn.execute('DELETE FROM cursor')
+        else:
+            self.set_cursor(block_number, block_hash)
+
+    def commit(self):
+        self.conn.commit()
+
+    # Writes, one per event type.
+
+    def add_challenge_phase(self, block_number, log_index, challenge_number, event):
+        self.conn.execute('INSERT OR REPLACE INTO challenge_phases VALUES (?, ?, ?, ?)',
+                          (block_number, log_index, challenge_number, event))
+
+    def add_stake_change(self, block_number, log_index, challenge_number, participant, kind, delta):
+        self.conn.execute('INSERT OR REPLACE INTO stake_changes VALUES (?, ?, ?, ?, ?, ?)',
+                          (block_number, log_index, challenge_number, participant, kind, _amount(delta)))
+
+    def add_submission(self, block_number, log_index, challenge_number, participant, submission):
+        self.conn.execute('INSERT OR REPLACE INTO submissions VALUES (?, ?, ?, ?, ?)',
+                          (block_number, log_index, challenge_number, participant, submission))
+
+    def add_reward(self, block_number, log_index, challenge_number, participant, staking, challenge, tournament):
+        self.conn.execute('INSERT OR REPLACE INTO rewards VALUES (?, ?, ?, ?, ?, ?, ?)',
+                          (block_number, log_index, challenge_number, participant, _amount(staking), _amount(challenge),
+                           _amount(tournament)))
+
+    def add_reward_totals(self, block_number, log_index, challenge_number, staking, challenge, tournament):
+        self.conn.execute('INSERT OR REPLACE INTO reward_totals VALUES (?, ?, ?, ?, ?, ?)',
+                          (block_number, log_index, challenge_number, _amount(staking), _amount(challenge),
+                           _amount(tournament)))
+
+    def add_burn(self, block_number, log_index, challenge_number, participant, amount):
+        self.conn.execute('INSERT OR REPLACE INTO burns VALUES (?, ?, ?, ?, ?)',
+                          (block_number, log_index, challenge_number, participant, _amount(amount)))
+
+    def add_sponsor(self, block_number, log_index, challenge_number, sponsor, amount, pool_total):
+        self.conn.execute('INSERT OR REPLACE INTO sponsors VALUES (?, ?, ?, ?, ?, ?)',
+                          (block_number, log_index, challenge_number, sponsor, _amount(amount), _amount(pool_total)))
+
+    # Reads.
+
+    def get_latest_challenge_number(self):
+        row = self.conn.execute("SELECT MAX(challenge_number) FROM challenge_phases WHERE event = 'opened'").fetchone()
+        return row[0] if row[0] is not None else 0
+
+    def get_challenges(self):
+        # {challenge number: (opened block, submission closed block)}; the closed block is the latest close.
+        rows = self.conn.execute('''
+            SELECT challenge_number,
+                   MIN(CASE WHEN event = 'opened' THEN block_number END),
+                   MAX(CASE WHEN event = 'closed' THEN block_number END)
+            FROM challenge_phases GROUP BY challenge_number ORDER BY challenge_number''').fetchall()
+        return {r[0]: (r[1], r[2]) for r in rows}
+
+    def get_stakes(self, challenge_number=None):
+        # Stakes after all activity up to and including `challenge_number` (default: all indexed activity).
+        query = 'SELECT participant, delta FROM stake_changes {}'
+        if challenge_number is None:
+            rows = self.conn.execute(query.format('')).fetchall()
+        else:
+            rows = self.conn.execute(query.format('WHERE challenge_number <= ?'), (challenge_number,)).fetchall()
+        return {p: stake for p, stake in _sum_by_participant(rows).items() if stake != 0}
+
+    def get_recorded_stakes(self, challenge_number):
+        # Stakes as of the close of submissions for `challenge_number`, i.e. the values `recordStakes` snapshots:
+        # staking changes up to this challenge plus rewards and burns of earlier challenges.
+        rows = self.conn.execute('''
+            SELECT participant, delta FROM stake_changes
+            WHERE (kind IN ('increase', 'decrease') AND challenge_number <= ?)
+               OR (kind IN ('reward', 'burn') AND challenge_number < ?)''',
+                                 (challenge_number, challenge_number)).fetchall()
+        return {p: stake for p, stake in _sum_by_participant(rows).items() if stake != 0}
+
+    def get_submissions(self, challenge_number):
+        # Latest non-withdrawn submission of each participant.
+        rows = self.conn.execute('''
+            SELECT participant, submission FROM submissions
+            WHERE challenge_number = ? ORDER BY block_number, log_index''', (challenge_number,)).fetchall()
+        latest = {}
+        for participant, submission in rows:
+            latest[participant] = submission
+        return {p: s for p, s in latest.items() if int(s, 16) != 0}
+
+    def get_rewards(self, challenge_number):
+        rows = self.conn.execute('''
+            SELECT participant, staking_reward, challenge_reward, tournament_reward FROM rewards
+            WHERE challenge_number = ?''', (challenge_number,)).fetchall()
+        rewards = {}
+        for participant, staking, challenge, tournament in rows:
+            totals = rewards.get(participant, (0, 0, 0))
+            rewards[participant] = (totals[0] + int(staking), totals[1] + int(challenge), totals[2] + int(tournament))
+        return rewards
+
+    def get_reward_totals(self, challenge_number):
+        rows = self.conn.execute('''
+            SELECT staking_amount, challenge_amount, tournament_amount FROM reward_totals
+            WHERE challenge_number = ?''', (challenge_number,)).fetchall()
+        return tuple(sum(int(row[i]) for row in rows) for i in range(3))
+
+    def get_burns(self, challenge_number):
+        rows = self.conn.execute('SELECT participant, amount FROM burns WHERE challenge_number = ?',
+                                 (challenge_number,)).fetchall()
+        return _sum_by_participant(rows)
+
+    def get_sponsored_amount(self, challenge_number=None):
+        if challenge_number is None:
+            rows = self.conn.execute('SELECT amount FROM sponsors').fetchall()
+        else:
+            rows = self.conn.execute('SELECT amount FROM sponsors WHERE challenge_number = ?',
+                                     (challenge_number,)).fetchall()
+        return sum(int(row[0]) for row in rows)
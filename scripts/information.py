@@ -0,0 +1,50 @@
+"""
+Helpers for publishing additional information items with `updateInformationMatrix`.
+
+A metrics table maps each participant to a row of values, one per item number. Rows are flattened into the single
+value list expected by the contract. Values that fit in 64 bits can be packed four to an item, lowest bits first,
+and read back on-chain with `getInformationPacked`.
+"""
+
+PACKED_WIDTH = 64
+PACKED_COUNT = 4
+_PACKED_MASK = (1 << PACKED_WIDTH) - 1
+
+
+def pack_uint64(values):
+    assert len(values) <= PACKED_COUNT, 'At most {} values can be packed into one item.'.format(PACKED_COUNT)
+    packed = 0
+    for i, value in enumerate(values):
+        assert 0 <= value <= _PACKED_MASK, 'Value {} does not fit in {} bits.'.format(value, PACKED_WIDTH)
+        packed |= value << (PACKED_WIDTH * i)
+    return packed
+
+
+def unpack_uint64(packed):
+    return [(packed >> (PACKED_WIDTH * i)) & _PACKED_MASK for i in range(PACKED_COUNT)]
+
+
+def pack_row(values):
+    # Pack a row of small values into as few items as possible.
+    return [pack_uint64(values[i:i + PACKED_COUNT]) for i in range(0, len(values), PACKED_COUNT)]
+
+
+def flatten_matrix(participants, rows):
+    """
+    Flatten `rows` (one list of values per participant, all the same length) into the value list
+    expected by `updateInformationMatrix`.
+    """
+    assert len(participants) == len(rows), 'One row of values is required per participant.'
+    width = len(rows[0]) if len(rows) > 0 else 0
+    values = []
+    for row in rows:
+        assert len(row) == width, 'All rows must have the same number of values.'
+        values.extend(row)
+    return values
+
+
+def chunk_matrix(participants, item_numbers, values, chunk):
+    # Split a flattened matrix into chunks of `chunk` participants for separate `updateInformationMatrix` calls.
+    width = len(item_numbers)
+    for i in range(0, len(participants), chunk):
+        yield participants[i:i + chunk], item_numbers, values[i * width:(i + chunk) * width]
@@ -0,0 +1,64 @@
+"""
+Large populations of local accounts for tests and benchmarks.
+
+Accounts are derived from a seed, so the same seed always yields the same addresses, and are funded in bulk
+through `BulkFunder`, one transaction per chunk of recipients instead of one or two transactions per account.
+
+    participants = derive_accounts(10000)
+    fund_accounts(token, admin, participants, native_amount=10 ** 15, token_amount=100 * 10 ** 6)
+"""
+from brownie import BulkFunder, accounts
+from brownie.network.account import LocalAccount
+from web3 import Web3
+
+DEFAULT_SEED = 'competition'
+DEFAULT_FUNDING_CHUNK = 50
+
+
+def derive_private_key(seed, index):
+    return Web3.keccak(text='{}-{}'.format(seed, index)).hex()
+
+
+def derive_accounts(count, seed=DEFAULT_SEED, offset=0):
+    """Return `count` local accounts derived from `seed`, starting at index `offset`."""
+    derived = []
+    for i in range(offset, offset + count):
+        derived.append(accounts.add(derive_private_key(seed, i)))
+    return derived
+
+
+def fund_accounts(token, admin, recipients, native_amount=0, token_amount=0, chunk=DEFAULT_FUNDING_CHUNK,
+                  funder=None):
+    """
+    Send `native_amount` wei and `token_amount` tokens from `admin` to each of `recipients`.
+    Returns the `BulkFunder` used, which can be passed back in to fund further accounts.
+    """
+    funder = BulkFunder.deploy({'from': admin}) if funder is None else funder
+    if token_amount > 0:
+        token.increaseAllowance(funder, token_amount * len(recipients), {'from': admin})
+    for i in range(0, len(recipients), chunk):
+        recipients_chunk = recipients[i:i + chunk]
+        funder.fund(recipients_chunk, token, token_amount,
+                    {'from': admin, 'value': native_amount * len(recipients_chunk)})
+    return funder
+
+
+def development_accounts():
+    # The unlocked accounts of the development node, excluding any local accounts added since.
+    return [a for a in accounts if not isinstance(a, LocalAccount)]
+
+
+def make_participants(count, token, admin, native_amount=0, token_amount=0, seed=DEFAULT_SEED):
+    """
+    Return `count` participants: the unlocked development accounts other than `admin` first, followed by
+    derived accounts funded with `native_amount` wei, as development accounts already hold native currency.
+    All participants receive `token_amount` tokens.
+    """
+    participants = [a for a in development_accounts() if a != admin][:count]
+    derived = derive_accounts(count - len(participants), seed) if count > len(participants) else []
+    funder = None
+    if token_amount > 0 and len(participants) > 0:
+        funder = fund_accounts(token, admin, participants, 0, token_amount)
+    if len(derived) > 0:
+        funder = fund_accounts(token, admin, derived, native_amount, token_amount, funder=funder)
+    return participants + derived
@@ -0,0 +1,158 @@
+"""
+Block-pinned cache of view calls.
+
+Results are keyed by contract address, function selector, arguments and block number, so a cached value is only
+returned for the block it was read at. The latest block number itself is re-read at most every `block_interval`
+seconds; when it moves on, entries of older blocks are dropped. Transactions sent through a `CachedContract`
+refresh the block number immediately, so reads after them see the new state.
+
+Identical calls made concurrently from several threads are coalesced into one request.
+
+    cache = ReadCache(web3)
+    competition = CachedContract(competition, cache)
+    competition.getStake(participant)
+    cache.stats()
+"""
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_SIZE = 10000
+
+
+def _normalize(arg):
+    if isinstance(arg, (list, tuple)):
+        return tuple(_normalize(a) for a in arg)
+    if hasattr(arg, 'address'):
+        return str(arg.address).lower()
+    if isinstance(arg, str) and arg.startswith('0x'):
+        return arg.lower()
+    if isinstance(arg, (bytes, bytearray)):
+        return bytes(arg)
+    return arg
+
+
+class ReadCache:
+    def __init__(self, web3, max_size=DEFAULT_MAX_SIZE, block_interval=1.0):
+        self.web3 = web3
+        self.max_size = max_size
+        self.block_interval = block_interval
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._block = None
+        self._block_checked_at = 0
+
+    def current_block(self):
+        if self._block is None or time.time() - self._block_checked_at >= self.block_interval:
+            self._set_block(self.web3.eth.block_number)
+        return self._block
+
+    def _set_block(self, block):
+        with self._lock:
+            self._block_checked_at = time.time()
+            if block != self._block:
+                self._block = block
+                # Entries for earlier blocks are no longer read; entries for explicitly pinned blocks are kept.
+                for key in [k for k in self._entries if k[-2] is None and k[-1] < block]:
+                    del self._entries[key]
+
+    def invalidate(self):
+        """Re-read the block number on the next call, e.g. after sending a transaction."""
+        self._block = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def call(self, fn, args=(), block=None):
+        """
+        Return `fn(*args)` at `block` (default: the latest block), where `fn` is a brownie contract call.
+        """
+        pinned = block
+        block = self.current_block() if block is None else block
+        key = (str(fn._address).lower(), fn.signature, _normalize(args), pinned, block)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            waiter = self._in_flight.get(key)
+            if waiter is None:
+                waiter = self._in_flight[key] = {'event': threading.Event()}
+                owner = True
+                self.misses += 1
+            else:
+                owner = False
+                self.coalesced += 1
+
+        if not owner:
+            waiter['event'].wait()
+            if 'error' in waiter:
+                raise waiter['error']
+            return waiter['result']
+
+        try:
+            result = fn(*args, block_identifier=block)
+            waiter['result'] = result
+            with self._lock:
+                self._entries[key] = result
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+            return result
+        except Exception as e:
+            waiter['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            waiter['event'].set()
+
+    def stats(self):
+        requests = self.hits + self.misses + self.coalesced
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'hit_rate': (self.hits + self.coalesced) / requests if requests > 0 else 0,
+            'size': len(self._entries),
+        }
+
+
+class CachedContract:
+    def __init__(self, contract, cache):
+        """
+        Wrap a brownie contract so that its view functions are read through `cache`. Transactions are sent
+        as usual and invalidate the cached block number.
+        """
+        self._contract = contract
+        self._cache = cache
+
+    def __getattr__(self, name):
+        attr = getattr(self._contract, name)
+        abi = getattr(attr, 'abi', None)
+        if not isinstance(abi, dict) or abi.get('type') != 'function':
+            return attr
+        if abi.get('stateMutability') in ('view', 'pure'):
+            def cached_call(*args, block_identifier=None):
+                return self._cache.call(attr, args, block_identifier)
+            return cached_call
+
+        def transact(*args):
+            try:
+                return attr(*args)
+            finally:
+                self._cache.invalidate()
+        return transact
+
+    @property
+    def address(self):
+        return self._contract.address
+
+    def __str__(self):
+        return str(self._contract)
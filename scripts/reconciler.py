@@ -0,0 +1,162 @@
+"""
+Reconciliation of the Competition accounting against its staker sets.
+
+All reads are made at one pinned block. The staker set and the stakes snapshot of a challenge are streamed page by
+page, the addresses of a page and their amounts (`getStakesBatch`, `getHistoricalStakeAmounts`) in consecutive
+calls, with at most `max_concurrency` pages in flight, so memory stays bounded by the window rather than the size
+of the set. The checks are:
+
+    - the current stakes of the staker set add up to `getCurrentTotalStaked`, and every member has a stake;
+    - the stakes snapshot of each challenge adds up to `getHistoricalTotalStaked`;
+    - the token balance of the contract covers stakes + pool + burned, i.e. `getRemainder` does not revert.
+
+Given the expected stakes per address (from an indexer, a model or the tests), every address whose amount differs,
+including addresses missing from or unexpected in a set, is reported.
+
+    reconciler = Reconciler(web3, competition, token)
+    report = reconciler.reconcile(challenge_numbers=[challenge_number], expected_stakes=stakes)
+    assert report.ok, report.discrepancies
+"""
+import asyncio
+from collections import deque
+from scripts.async_reader import AsyncPagedReader, DEFAULT_PAGE_SIZE, DEFAULT_MAX_CONCURRENCY
+
+
+class Discrepancy:
+    def __init__(self, check, expected, actual, address=None, challenge_number=None):
+        self.check = check
+        self.expected = expected
+        self.actual = actual
+        self.address = address
+        self.challenge_number = challenge_number
+
+    def __eq__(self, other):
+        return isinstance(other, Discrepancy) and vars(self) == vars(other)
+
+    def __repr__(self):
+        where = ''.join([' challenge {}'.format(self.challenge_number) if self.challenge_number is not None else '',
+                         ' {}'.format(self.address) if self.address is not None else ''])
+        return '<Discrepancy {}{}: expected {}, actual {}>'.format(self.check, where, self.expected, self.actual)
+
+
+class ReconciliationReport:
+    def __init__(self, block):
+        self.block = block
+        self.discrepancies = []
+        self.totals = {}
+        self.counts = {}
+
+    @property
+    def ok(self):
+        return len(self.discrepancies) == 0
+
+    def add(self, check, expected, actual, address=None, challenge_number=None):
+        if expected != actual:
+            self.discrepancies.append(Discrepancy(check, expected, actual, address, challenge_number))
+
+    def by_check(self, check):
+        return [d for d in self.discrepancies if d.check == check]
+
+
+class Reconciler:
+    def __init__(self, web3, competition, token, page_size=DEFAULT_PAGE_SIZE,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, retries=3):
+        self.web3 = web3
+        self.competition = competition
+        self.token = token
+        self.reader = AsyncPagedReader(web3, page_size, max_concurrency, retries)
+
+    def close(self):
+        self.reader.close()
+
+    async def stream(self, fn_counter, fn_partial, fn_amounts, args, block):
+        """
+        Yield `(addresses, amounts)` page by page, in set order, with at most `max_concurrency` pages in flight.
+        `fn_amounts(*args, addresses)` returns the amounts of a page.
+        """
+        reader = self.reader
+        semaphore = asyncio.Semaphore(reader.max_concurrency)
+
+        async def read_page(start, end):
+            addresses = list(await reader.call(fn_partial, list(args) + [start, end], block, semaphore))
+            amounts = await reader.call(fn_amounts, list(args) + [addresses], block, semaphore)
+            return addresses, [int(amount) for amount in amounts]
+
+        counter = await reader.call(fn_counter, list(args), block, semaphore)
+        window = deque()
+        try:
+            for start in range(0, counter, reader.page_size):
+                window.append(asyncio.ensure_future(read_page(start, min(start + reader.page_size, counter))))
+                if len(window) == reader.max_concurrency:
+                    yield await window.popleft()
+            while window:
+                yield await window.popleft()
+        finally:
+            for task in window:
+                task.cancel()
+
+    async def check_set(self, report, check, pages, expected_total, expected=None, challenge_number=None):
+        """Add up the amounts of a streamed set, compare them with `expected` and the on-chain total."""
+        remaining = {str(address): amount for address, amount in expected.items()} if expected is not None else None
+        total = 0
+        count = 0
+        async for addresses, amounts in pages:
+            for address, amount in zip(addresses, amounts):
+                total += amount
+                count += 1
+                if check == 'stakes' and amount == 0:
+                    report.add('zero_stake_member', 'nonzero', 0, address, challenge_number)
+                if remaining is not None:
+                    report.add(check, int(remaining.pop(address, 0)), amount, address, challenge_number)
+        if remaining is not None:
+            for address, amount in remaining.items():
+                # Expected in the set but not a member of it.
+                if int(amount) != 0:
+                    report.add(check, int(amount), 0, address, challenge_number)
+        report.add(check + '_total', int(expected_total), total, challenge_number=challenge_number)
+        return total, count
+
+    async def reconcile_async(self, challenge_numbers=(), expected_stakes=None, expected_snapshots=None,
+                              block=None):
+        c = self.competition
+        block = self.web3.eth.block_number if block is None else block
+        report = ReconciliationReport(block)
+        call = self.reader.call
+
+        current_total, pool, burned, balance = await asyncio.gather(
+            call(c.getCurrentTotalStaked, [], block), call(c.getCompetitionPool, [], block),
+            call(c.getTotalBurnedAmount, [], block), call(self.token.balanceOf, [c.address], block))
+        report.totals.update({'staked': current_total, 'pool': pool, 'burned': burned, 'balance': balance})
+
+        _, count = await self.check_set(
+            report, 'stakes', self.stream(c.getStakersCounter, c.getStakers, c.getStakesBatch, [], block),
+            current_total, expected_stakes)
+        report.counts['stakers'] = count
+
+        accounted = current_total + pool + burned
+        if balance < accounted:
+            # `getRemainder` would revert: the tokens held do not cover what the contract owes.
+            report.add('balance', accounted, balance)
+        else:
+            remainder = await call(c.getRemainder, [], block)
+            report.add('remainder', balance - accounted, remainder)
+            report.totals['remainder'] = remainder
+
+        expected_snapshots = expected_snapshots if expected_snapshots is not None else {}
+        for challenge_number in challenge_numbers:
+            historical_total = await call(c.getHistoricalTotalStaked, [challenge_number], block)
+            _, count = await self.check_set(
+                report, 'snapshot',
+                self.stream(c.getHistoricalStakersCounter, c.getHistoricalStakersPartial, c.getHistoricalStakeAmounts,
+                            [challenge_number], block),
+                historical_total, expected_snapshots.get(challenge_number), challenge_number)
+            report.counts['snapshot_{}'.format(challenge_number)] = count
+        return report
+
+    def reconcile(self, challenge_numbers=(), expected_stakes=None, expected_snapshots=None, block=None):
+        """
+        Reconcile the current stakes and the stakes snapshots of `challenge_numbers` at `block` (default: latest).
+        `expected_stakes` maps addresses to their current stakes; `expected_snapshots` maps challenge numbers to
+        such mappings. Returns a `ReconciliationReport`.
+        """
+        return self.reader.run(self.reconcile_async(challenge_numbers, expected_stakes, expected_snapshots, block))
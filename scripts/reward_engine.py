@@ -0,0 +1,223 @@
+"""
+Integer-exact reward and burn vectors for a challenge.
+
+Staking rewards are split in proportion to the stake snapshot of the challenge, challenge and tournament rewards
+in proportion to the scores, and burns are basis points of the current stakes, all with integer arithmetic on
+NumPy arrays. Each budget is paid out in full: every participant receives the rounded-down share, and the few
+units left over go to the largest fractional remainders. The vectors are checked against the competition pool
+and sent as `payRewards` and `burn` transactions in chunks sized by `SettlementPlanner`.
+
+Amounts are `int64` arrays. Amounts are `uint256` on chain: stakes, scores or budgets that do not fit in 64 bits, or
+weights whose total does not, are kept as Python ints in `object` arrays instead, which is exact but slower.
+
+    stakers, stakes = snapshot_from_chain(competition, challenge_number)
+    budgets = split_budget(budget, staking_bps=3000, challenge_bps=4500, tournament_bps=2500)
+    plan = compute_rewards(stakers, stakes, challenge_scores, tournament_scores, *budgets,
+                           competition_pool=competition.getCompetitionPool())
+    plan.execute(competition, SettlementPlanner({'from': admin}))
+"""
+import numpy as np
+from scripts.settlement import pay_rewards_operation, burn_operation
+
+BPS_DENOMINATOR = 10000
+AMOUNT_DTYPE = np.int64
+DEFAULT_SNAPSHOT_PAGE = 1000
+QUOTIENT_LIMIT = 2 ** 52
+DIVISOR_LIMIT = 2 ** 60
+
+
+class RewardError(Exception):
+    pass
+
+
+def to_amounts(values):
+    """
+    `values`, integers, as an `AMOUNT_DTYPE` array, or as an `object` array of Python ints when one of them does not
+    fit in 64 bits.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in 'bi' or (values.dtype.kind == 'u' and values.dtype.itemsize < 8):
+        return values.astype(AMOUNT_DTYPE)
+    amounts = np.array([int(v) for v in values.ravel().tolist()], dtype=object).reshape(values.shape)
+    try:
+        return amounts.astype(AMOUNT_DTYPE)
+    except OverflowError:
+        return amounts
+
+
+def mul_div_rem(a, b, c):
+    """
+    Return `(a * b // c, a * b % c)` element-wise for non-negative integers, exactly. Where `c` is zero both are
+    zero. Quotients below `QUOTIENT_LIMIT` with `c` below `DIVISOR_LIMIT` are computed on 64-bit arrays, even though
+    `a * b` itself may not fit in 64 bits; anything larger falls back to Python ints in `object` arrays.
+    """
+    a, b, c = np.broadcast_arrays(*[np.atleast_1d(to_amounts(x)) for x in (a, b, c)])
+    if any(x.dtype == object for x in (a, b, c)) or np.any(a < 0) or np.any(b < 0) or np.any(c >= DIVISOR_LIMIT):
+        return _exact_mul_div_rem(a, b, c)
+    c_safe = np.where(c == 0, 1, c)
+    # The float estimate is off by at most one; the exact residual a * b - q * c is small, so it can be computed
+    # modulo 2 ** 64 and read back as a signed value.
+    estimate = np.floor(a.astype(np.float64) * b.astype(np.float64) / c_safe.astype(np.float64))
+    if np.any(estimate >= QUOTIENT_LIMIT - 1):
+        return _exact_mul_div_rem(a, b, c)
+    q = estimate.astype(AMOUNT_DTYPE)
+    residual = (a.astype(np.uint64) * b.astype(np.uint64) - q.astype(np.uint64) * c_safe.astype(np.uint64))
+    residual = residual.view(AMOUNT_DTYPE)
+    for _ in range(2):
+        low = residual < 0
+        q, residual = np.where(low, q - 1, q), np.where(low, residual + c_safe, residual)
+        high = residual >= c_safe
+        q, residual = np.where(high, q + 1, q), np.where(high, residual - c_safe, residual)
+    return np.where(c == 0, 0, q), np.where(c == 0, 0, residual)
+
+
+def _exact_mul_div_rem(a, b, c):
+    a, b, c = (x.astype(object) for x in (a, b, c))
+    c_safe = np.where(c == 0, 1, c)
+    product = a * b
+    return np.where(c == 0, 0, product // c_safe), np.where(c == 0, 0, product % c_safe)
+
+
+def mul_div(a, b, c):
+    return mul_div_rem(a, b, c)[0]
+
+
+def allocate(weights, budget, distribute_remainder=True):
+    """
+    Split `budget` in proportion to the integer `weights`. The shares are rounded down; with
+    `distribute_remainder` the units left over are given, one each, to the largest fractional remainders
+    (the earliest first on ties), so the shares add up to `budget` exactly.
+    """
+    weights = to_amounts(weights)
+    if np.any(weights < 0):
+        raise RewardError("Weights must not be negative.")
+    total = int(weights.astype(object).sum())
+    shares, remainders = mul_div_rem(weights, int(budget), total)
+    shares = shares.reshape(weights.shape)
+    if distribute_remainder and total > 0:
+        leftover = int(budget) - int(shares.sum())
+        order = np.argsort(-remainders.reshape(weights.shape), kind='stable')
+        shares[order[:leftover]] += 1
+    return shares
+
+
+def split_budget(budget, staking_bps, challenge_bps, tournament_bps):
+    """Split `budget` into staking, challenge and tournament budgets; rounding leaves any units in the pool."""
+    if staking_bps + challenge_bps + tournament_bps > BPS_DENOMINATOR:
+        raise RewardError("Budget shares add up to more than 100%.")
+    return tuple(int(budget) * bps // BPS_DENOMINATOR for bps in (staking_bps, challenge_bps, tournament_bps))
+
+
+def snapshot_from_chain(competition, challenge_number, page_size=DEFAULT_SNAPSHOT_PAGE):
+    """Return the historical stakers of `challenge_number` and their recorded stakes."""
+    stakers = []
+    counter = competition.getHistoricalStakersCounter(challenge_number)
+    for i in range(0, counter, page_size):
+        stakers += list(competition.getHistoricalStakersPartial(challenge_number, i, min(i + page_size, counter)))
+    amounts = []
+    for i in range(0, len(stakers), page_size):
+        amounts += list(competition.getHistoricalStakeAmounts(challenge_number, stakers[i:i + page_size]))
+    return stakers, to_amounts([int(amount) for amount in amounts])
+
+
+class RewardPlan:
+    def __init__(self, participants, staking_rewards, challenge_rewards, tournament_rewards, burn_amounts, budget):
+        self.participants = list(participants)
+        self.staking_rewards = staking_rewards
+        self.challenge_rewards = challenge_rewards
+        self.tournament_rewards = tournament_rewards
+        self.burn_amounts = burn_amounts
+        self.budget = budget
+
+    @property
+    def total_rewards(self):
+        return sum(int(rewards.astype(object).sum())
+                   for rewards in (self.staking_rewards, self.challenge_rewards, self.tournament_rewards))
+
+    @property
+    def total_burned(self):
+        return int(self.burn_amounts.astype(object).sum())
+
+    @property
+    def undistributed(self):
+        """The part of the budget not paid out, which stays in the competition pool."""
+        return self.budget - self.total_rewards
+
+    def check_pool(self, competition_pool):
+        if self.total_rewards > competition_pool:
+            raise RewardError("Rewards of {} exceed the competition pool of {}.".format(
+                self.total_rewards, competition_pool))
+
+    def payment_arguments(self):
+        """`payRewards` arguments for every participant with a reward, as lists of Python integers."""
+        paid = np.flatnonzero((self.staking_rewards != 0) | (self.challenge_rewards != 0) |
+                              (self.tournament_rewards != 0))
+        return ([self.participants[i] for i in paid], self.staking_rewards[paid].tolist(),
+                self.challenge_rewards[paid].tolist(), self.tournament_rewards[paid].tolist())
+
+    def burn_arguments(self):
+        """`burn` arguments for every participant with a burn, as lists of Python integers."""
+        burned = np.flatnonzero(self.burn_amounts)
+        return [self.participants[i] for i in burned], self.burn_amounts[burned].tolist()
+
+    def chunks(self, chunk_size):
+        """Fixed-size chunks of `('burn', args)` and `('payRewards', args)`, burns first."""
+        chunks = []
+        submitters, amounts = self.burn_arguments()
+        for i in range(0, len(submitters), chunk_size):
+            chunks.append(('burn', [submitters[i:i + chunk_size], amounts[i:i + chunk_size]]))
+        payments = self.payment_arguments()
+        for i in range(0, len(payments[0]), chunk_size):
+            chunks.append(('payRewards', [column[i:i + chunk_size] for column in payments]))
+        return chunks
+
+    def operations(self, competition):
+        """The `burn` and `payRewards` operations of the plan, burns first, for `SettlementPlanner`."""
+        operations = []
+        submitters, amounts = self.burn_arguments()
+        if len(submitters) > 0:
+            operations.append(burn_operation(competition, submitters, amounts))
+        payments = self.payment_arguments()
+        if len(payments[0]) > 0:
+            operations.append(pay_rewards_operation(competition, *payments))
+        return operations
+
+    def plan(self, competition, planner):
+        """Return `(operation, chunks)` for each operation, with chunks sized to the planner's gas ceiling."""
+        return [(operation, planner.plan(operation)) for operation in self.operations(competition)]
+
+    def execute(self, competition, planner):
+        self.check_pool(competition.getCompetitionPool())
+        txs = []
+        for operation, chunks in self.plan(competition, planner):
+            txs += planner.execute(operation, chunks)
+        return txs
+
+
+def compute_rewards(participants, stakes, challenge_scores, tournament_scores, staking_budget, challenge_budget,
+                    tournament_budget, burn_bps=0, current_stakes=None, competition_pool=None,
+                    distribute_remainder=True):
+    """
+    Return the `RewardPlan` for `participants`, given their recorded `stakes`, integer scores and the three budgets.
+    `burn_bps`, one value or one per participant, is burned from `current_stakes` (default: `stakes`).
+    If `competition_pool` is given, the total rewards are checked against it.
+    """
+    stakes = to_amounts(stakes)
+    current_stakes = stakes if current_stakes is None else to_amounts(current_stakes)
+    burn_bps = np.broadcast_to(np.asarray(burn_bps, dtype=AMOUNT_DTYPE), stakes.shape)
+    if np.any(burn_bps > BPS_DENOMINATOR) or np.any(burn_bps < 0):
+        raise RewardError("Burn basis points must be between 0 and {}.".format(BPS_DENOMINATOR))
+    for column in (stakes, current_stakes, np.asarray(challenge_scores), np.asarray(tournament_scores)):
+        if len(column) != len(participants):
+            raise RewardError("Every participant needs a stake and scores.")
+
+    plan = RewardPlan(
+        participants,
+        allocate(stakes, staking_budget, distribute_remainder),
+        allocate(challenge_scores, challenge_budget, distribute_remainder),
+        allocate(tournament_scores, tournament_budget, distribute_remainder),
+        mul_div(current_stakes, burn_bps, BPS_DENOMINATOR).reshape(stakes.shape),
+        int(staking_budget) + int(challenge_budget) + int(tournament_budget))
+    if competition_pool is not None:
+        plan.check_pool(competition_pool)
+    return plan
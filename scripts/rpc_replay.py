@@ -0,0 +1,212 @@
+"""
+Record and replay of JSON-RPC reads, for running fork tests offline.
+
+A recording run wraps the provider of an archive node in `RpcRecorder`. Every read is pinned to one block, sent to
+the node and its response kept; the state behind the reads (code, balance, nonce and storage slots of the accounts
+touched) is kept as well, from `debug_traceCall` with the prestate tracer where the node supports it and from
+`record_account` otherwise. The recording is saved as a gzip-compressed JSON fixture.
+
+Later runs either answer the same reads from the fixture with `RpcReplayProvider`, without any node, or seed a local
+chain with the recorded state through `seed_chain` and run transactions against it.
+
+    recorder = RpcRecorder(archive_web3.provider, block=40000000, trace_calls=True)
+    ... reads through Web3(recorder) ...
+    recorder.save('tests/fixtures/migration.json.gz')
+
+    fixture = load_fixture('tests/fixtures/migration.json.gz')
+    seed_chain(web3, fixture)
+"""
+import gzip
+import json
+from web3.providers.base import BaseProvider
+
+FIXTURE_VERSION = 1
+
+# Reads that only depend on the state at their block, and the position of their block parameter.
+BLOCK_PARAMETER = {
+    'eth_call': 1,
+    'eth_getStorageAt': 2,
+    'eth_getCode': 1,
+    'eth_getBalance': 1,
+    'eth_getTransactionCount': 1,
+    'eth_getBlockByNumber': 0,
+}
+CONSTANT_METHODS = {'eth_chainId', 'net_version'}
+
+# Methods that write an account's state on each local chain, in the order code, balance, nonce, storage.
+SEED_METHODS = {
+    'ganache': ('evm_setAccountCode', 'evm_setAccountBalance', 'evm_setAccountNonce', 'evm_setAccountStorageAt'),
+    'hardhat': ('hardhat_setCode', 'hardhat_setBalance', 'hardhat_setNonce', 'hardhat_setStorageAt'),
+    'anvil': ('anvil_setCode', 'anvil_setBalance', 'anvil_setNonce', 'anvil_setStorageAt'),
+}
+
+
+class ReplayMiss(Exception):
+    def __init__(self, method, params):
+        super().__init__("No recorded response for {} {}.".format(method, json.dumps(params)))
+        self.method = method
+        self.params = params
+
+
+def to_word(value):
+    """32-byte hex representation of a slot or storage value."""
+    value = int(value, 16) if isinstance(value, str) else int(value)
+    return '0x' + value.to_bytes(32, 'big').hex()
+
+
+def canonical(value):
+    # Hex strings are case-insensitive, so lowercase them for the lookup key.
+    if isinstance(value, str):
+        return value.lower()
+    if isinstance(value, dict):
+        return {k: canonical(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [canonical(v) for v in value]
+    return value
+
+
+def request_key(method, params):
+    return json.dumps([method, canonical(params)], sort_keys=True, separators=(',', ':'))
+
+
+def pin(method, params, block):
+    """Return `params` with the block parameter of a read set to `block`."""
+    params = list(params)
+    position = BLOCK_PARAMETER.get(method)
+    if position is None:
+        return params
+    if len(params) <= position:
+        params += [None] * (position + 1 - len(params))
+    if params[position] in (None, 'latest', 'pending', 'safe', 'finalized'):
+        params[position] = hex(block)
+    return params
+
+
+class RpcRecorder(BaseProvider):
+    def __init__(self, provider, block, trace_calls=False):
+        """
+        Record the reads sent through `provider`, all pinned to `block`. With `trace_calls`, the state touched by
+        each `eth_call` is traced with the prestate tracer, which needs a node with the debug namespace.
+        """
+        self.provider = provider
+        self.block = block
+        self.trace_calls = trace_calls
+        self.responses = {}
+        self.accounts = {}
+
+    def isConnected(self):
+        return self.provider.isConnected()
+
+    def account(self, address):
+        return self.accounts.setdefault(address.lower(), {'storage': {}})
+
+    def make_request(self, method, params):
+        if method == 'eth_blockNumber':
+            return {'jsonrpc': '2.0', 'id': 0, 'result': hex(self.block)}
+        params = pin(method, params, self.block)
+        response = self.provider.make_request(method, params)
+        if 'error' in response or (method not in BLOCK_PARAMETER and method not in CONSTANT_METHODS):
+            return response
+        result = response['result']
+        self.responses[request_key(method, params)] = result
+
+        if method == 'eth_getStorageAt':
+            self.account(params[0])['storage'][to_word(params[1])] = to_word(result)
+        elif method == 'eth_getCode':
+            self.account(params[0])['code'] = result
+        elif method == 'eth_getBalance':
+            self.account(params[0])['balance'] = result
+        elif method == 'eth_getTransactionCount':
+            self.account(params[0])['nonce'] = result
+        elif method == 'eth_call' and self.trace_calls:
+            self.trace(params)
+        return response
+
+    def trace(self, params):
+        response = self.provider.make_request('debug_traceCall', params + [{'tracer': 'prestateTracer'}])
+        if 'error' in response:
+            raise ValueError("Tracing failed: {}".format(response['error']))
+        for address, state in response['result'].items():
+            account = self.account(address)
+            for field in ('code', 'balance'):
+                if field in state:
+                    account[field] = state[field]
+            if 'nonce' in state:
+                account['nonce'] = hex(state['nonce']) if isinstance(state['nonce'], int) else state['nonce']
+            for slot, value in state.get('storage', {}).items():
+                account['storage'][to_word(slot)] = to_word(value)
+
+    def record_account(self, address, slots=()):
+        """Record the code, balance, nonce and the given storage `slots` of `address`."""
+        self.make_request('eth_getCode', [address])
+        self.make_request('eth_getBalance', [address])
+        self.make_request('eth_getTransactionCount', [address])
+        for slot in slots:
+            self.make_request('eth_getStorageAt', [address, hex(int(slot)) if not isinstance(slot, str) else slot])
+
+    def fixture(self):
+        return {'version': FIXTURE_VERSION, 'block': self.block, 'responses': self.responses,
+                'accounts': self.accounts}
+
+    def save(self, path):
+        save_fixture(self.fixture(), path)
+
+
+def save_fixture(fixture, path):
+    # Sorted keys and a fixed mtime keep the file identical for identical recordings.
+    with gzip.GzipFile(path, 'wb', mtime=0) as f:
+        f.write(json.dumps(fixture, sort_keys=True, separators=(',', ':')).encode())
+
+
+def load_fixture(path):
+    with gzip.open(path, 'rb') as f:
+        fixture = json.loads(f.read().decode())
+    if fixture.get('version') != FIXTURE_VERSION:
+        raise ValueError("Unsupported fixture version {}.".format(fixture.get('version')))
+    return fixture
+
+
+class RpcReplayProvider(BaseProvider):
+    def __init__(self, fixture, fallback=None):
+        """Answer the reads of `fixture`. Other requests go to `fallback` if given and raise `ReplayMiss` if not."""
+        self.fixture = fixture
+        self.block = fixture['block']
+        self.responses = fixture['responses']
+        self.fallback = fallback
+
+    def isConnected(self):
+        return True
+
+    def make_request(self, method, params):
+        if method == 'eth_blockNumber':
+            return {'jsonrpc': '2.0', 'id': 0, 'result': hex(self.block)}
+        key = request_key(method, pin(method, params, self.block))
+        if key in self.responses:
+            return {'jsonrpc': '2.0', 'id': 0, 'result': self.responses[key]}
+        if self.fallback is not None:
+            return self.fallback.make_request(method, params)
+        raise ReplayMiss(method, params)
+
+
+def seed_chain(web3, fixture, node='ganache', relocate=None):
+    """
+    Write the recorded accounts into the local chain behind `web3`. `relocate` maps recorded addresses to the
+    addresses to write them at instead.
+    """
+    set_code, set_balance, set_nonce, set_storage = SEED_METHODS[node]
+    relocate = {k.lower(): v for k, v in (relocate or {}).items()}
+    for address, account in fixture['accounts'].items():
+        target = relocate.get(address, address)
+        requests = []
+        if 'code' in account:
+            requests.append((set_code, [target, account['code']]))
+        if 'balance' in account:
+            requests.append((set_balance, [target, hex(int(account['balance'], 16))]))
+        if 'nonce' in account:
+            requests.append((set_nonce, [target, hex(int(account['nonce'], 16))]))
+        for slot, value in account['storage'].items():
+            requests.append((set_storage, [target, slot, value]))
+        for method, params in requests:
+            response = web3.provider.make_request(method, params)
+            if 'error' in response:
+                raise ValueError("{} failed for {}: {}".format(method, target, response['error']))
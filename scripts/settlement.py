@@ -0,0 +1,163 @@
+"""
+Gas-aware chunking of the per-participant settlement calls.
+
+Each operation is a contract function applied to a list of items, split into `(start, end)` chunks. The planner
+probes `estimate_gas` at two chunk sizes, fits a linear model (fixed cost plus cost per item) and packs the items
+into the fewest chunks that stay under the gas ceiling. Before sending, every chunk is estimated again and split
+further if it does not fit, so out-of-gas transactions are not sent in the first place.
+
+    planner = SettlementPlanner({'from': admin}, gas_ceiling=10_000_000)
+    planner.execute(pay_rewards_operation(competition, submitters, staking, challenge, tournament))
+"""
+import math
+
+DEFAULT_GAS_CEILING = 15_000_000
+DEFAULT_SAFETY_MARGIN = 1.2
+DEFAULT_PROBE_SIZES = (1, 16)
+# Node errors of calls and transactions that ran out of gas or do not fit in the gas limit.
+GAS_FAILURE_MESSAGES = ('out of gas', 'gas required exceeds allowance', 'exceeds block gas limit')
+
+
+class ChunkTooLarge(Exception):
+    def __init__(self, start, end, gas):
+        super().__init__('Chunk {}-{} needs {} gas.'.format(start, end, gas))
+
+
+class ChunkFailed(Exception):
+    def __init__(self, start, end, tx):
+        super().__init__('Chunk {}-{} failed in {}.'.format(start, end, tx.txid))
+        # A failed transaction that used all of its gas limit ran out of gas.
+        self.out_of_gas = tx.gas_used is not None and tx.gas_used >= tx.gas_limit
+
+
+class Operation:
+    def __init__(self, fn, count, build_args):
+        """
+        `fn` is a brownie contract function and `build_args(start, end)` returns its arguments, without the
+        transaction parameters, for items `start` (inclusive) to `end` (exclusive) of the `count` items.
+        """
+        self.fn = fn
+        self.count = count
+        self.build_args = build_args
+
+    def estimate_gas(self, start, end, tx_params):
+        return self.fn.estimate_gas(*self.build_args(start, end), tx_params)
+
+    def send(self, start, end, tx_params):
+        return self.fn(*self.build_args(start, end), tx_params)
+
+
+def record_stakes_operation(competition, count=None):
+    count = competition.getStakersCounter() if count is None else count
+    return Operation(competition.recordStakes, count, lambda s, e: [s, e])
+
+
+def pay_rewards_operation(competition, submitters, staking_rewards, challenge_rewards, tournament_rewards):
+    return Operation(competition.payRewards, len(submitters),
+                     lambda s, e: [submitters[s:e], staking_rewards[s:e], challenge_rewards[s:e],
+                                   tournament_rewards[s:e]])
+
+
+def burn_operation(competition, submitters, amounts):
+    return Operation(competition.burn, len(submitters), lambda s, e: [submitters[s:e], amounts[s:e]])
+
+
+def scores_operation(competition, challenge_number, participants, challenge_scores, tournament_scores):
+    return Operation(competition.updateChallengeAndTournamentScores, len(participants),
+                     lambda s, e: [challenge_number, participants[s:e], challenge_scores[s:e],
+                                   tournament_scores[s:e]])
+
+
+def information_operation(competition, challenge_number, participants, item_number, values):
+    return Operation(competition.updateInformationBatch, len(participants),
+                     lambda s, e: [challenge_number, participants[s:e], item_number, values[s:e]])
+
+
+def _is_gas_failure(exception):
+    if isinstance(exception, ChunkTooLarge):
+        return True
+    if isinstance(exception, ChunkFailed):
+        return exception.out_of_gas
+    # Errors that only mention gas, such as "insufficient funds for gas * price + value", are not gas failures.
+    if getattr(exception, 'revert_type', None) == 'out of gas':
+        return True
+    message = str(exception).lower()
+    return any(m in message for m in GAS_FAILURE_MESSAGES)
+
+
+class GasModel:
+    def __init__(self, base, per_item):
+        self.base = base
+        self.per_item = per_item
+
+    def estimate(self, size):
+        return self.base + self.per_item * size
+
+    def max_items(self, gas_ceiling):
+        if self.per_item <= 0:
+            return None
+        return max(1, int((gas_ceiling - self.base) // self.per_item))
+
+
+class SettlementPlanner:
+    def __init__(self, tx_params, gas_ceiling=DEFAULT_GAS_CEILING, safety_margin=DEFAULT_SAFETY_MARGIN,
+                 probe_sizes=DEFAULT_PROBE_SIZES):
+        """
+        `gas_ceiling` is the most gas any one transaction may use; chunks are sized so that their estimate
+        times `safety_margin` stays under it.
+        """
+        self.tx_params = tx_params
+        self.gas_ceiling = gas_ceiling
+        self.safety_margin = safety_margin
+        self.probe_sizes = probe_sizes
+
+    def fits(self, gas):
+        return gas * self.safety_margin <= self.gas_ceiling
+
+    def fit(self, operation):
+        # Probe from the start of the items at two sizes and fit a line through the two estimates.
+        sizes = sorted(set(min(max(1, s), operation.count) for s in self.probe_sizes))
+        estimates = [operation.estimate_gas(0, size, self.tx_params) for size in sizes]
+        if len(sizes) == 1:
+            return GasModel(0, estimates[0] / sizes[0])
+        per_item = (estimates[-1] - estimates[0]) / (sizes[-1] - sizes[0])
+        return GasModel(estimates[0] - per_item * sizes[0], per_item)
+
+    def plan(self, operation, model=None):
+        """Return the `(start, end)` chunks covering all items of `operation`."""
+        if operation.count == 0:
+            return []
+        model = self.fit(operation) if model is None else model
+        max_items = model.max_items(self.gas_ceiling / self.safety_margin)
+        if max_items is None or max_items >= operation.count:
+            return [(0, operation.count)]
+        # Spread the items evenly over the fewest chunks.
+        num_chunks = math.ceil(operation.count / max_items)
+        size = math.ceil(operation.count / num_chunks)
+        return [(s, min(s + size, operation.count)) for s in range(0, operation.count, size)]
+
+    def execute(self, operation, chunks=None):
+        """
+        Send every chunk of `operation` in order and return the transactions. A chunk whose estimate is over
+        the ceiling, or whose transaction runs out of gas, is split in half and the halves are sent instead.
+        """
+        pending = list(reversed(self.plan(operation) if chunks is None else chunks))
+        txs = []
+        while len(pending) > 0:
+            start, end = pending.pop()
+            try:
+                gas = operation.estimate_gas(start, end, self.tx_params)
+                if not self.fits(gas):
+                    raise ChunkTooLarge(start, end, gas)
+                tx = operation.send(start, end, dict(self.tx_params, gas_limit=int(gas * self.safety_margin)))
+                if tx.status == 0:
+                    raise ChunkFailed(start, end, tx)
+                txs.append(tx)
+            except Exception as e:
+                # Only gas failures are retried in smaller chunks; a revert of the call itself is raised.
+                if end - start <= 1 or not _is_gas_failure(e):
+                    raise
+                middle = (start + end) // 2
+                pending.extend([(middle, end), (start, middle)])
+        return txs
+
@@ -0,0 +1,302 @@
+"""
+Off-chain simulator of Competition economics.
+
+Participant state lives in NumPy columns (token balance, stake, submission), one entry per participant, and every
+round is applied to all participants at once with the integer semantics of the contracts: stakes below the stake
+threshold are rejected, a stake cannot be withdrawn while a submission exists, a challenge only opens while the
+pool holds the rewards threshold, rewards move tokens from the pool into stakes and burns move them from stakes
+into the burned amount. Amounts are integers in the token's smallest unit, as on chain.
+
+Each round returns the actions it took, so the same round can be replayed against the contracts.
+
+    params = SimulationParameters(stake_threshold=10 * 10 ** 6, burn_bps=500)
+    history = Simulator(params, num_participants=100000, seed=1).run(500)
+    results = sweep([SimulationParameters(stake_threshold=t) for t in thresholds], 1000, 100)
+"""
+import numpy as np
+from scripts.reward_engine import BPS_DENOMINATOR, AMOUNT_DTYPE, allocate, split_budget
+
+SCORE_SCALE = 10 ** 6
+
+
+class SimulationError(Exception):
+    pass
+
+
+class SimulationParameters:
+    def __init__(self, stake_threshold=10 * 10 ** 6, rewards_threshold=10 * 10 ** 6, sponsor_amount=0,
+                 budget=1000 * 10 ** 6, staking_bps=3000, challenge_bps=4500, tournament_bps=2500, burn_bps=0,
+                 burned_to_pool_bps=0, initial_balance=1000 * 10 ** 6, mean_stake=100 * 10 ** 6, stake_sigma=1.0,
+                 stake_probability=0.2, submit_probability=0.8, exit_probability=0.02, initial_pool=0):
+        """
+        Contract parameters: `stake_threshold`, `rewards_threshold`.
+        Rewards policy, per round: `sponsor_amount` added to the pool, `budget` paid out of the pool (at most the
+        pool), split into staking, challenge and tournament rewards by the `*_bps` shares. Stakers that did not
+        submit are burned `burn_bps` of their stake, and `burned_to_pool_bps` of the burned amount is moved back
+        into the pool.
+        Participant behaviour: each round a participant changes their stake with `stake_probability`, to a
+        log-normal amount around `mean_stake`, withdraws it entirely with `exit_probability`, and a staked
+        participant submits with `submit_probability`.
+        """
+        if staking_bps + challenge_bps + tournament_bps > BPS_DENOMINATOR:
+            raise ValueError("Reward shares add up to more than 100%.")
+        self.stake_threshold = stake_threshold
+        self.rewards_threshold = rewards_threshold
+        self.sponsor_amount = sponsor_amount
+        self.budget = budget
+        self.staking_bps = staking_bps
+        self.challenge_bps = challenge_bps
+        self.tournament_bps = tournament_bps
+        self.burn_bps = burn_bps
+        self.burned_to_pool_bps = burned_to_pool_bps
+        self.initial_balance = initial_balance
+        self.mean_stake = mean_stake
+        self.stake_sigma = stake_sigma
+        self.stake_probability = stake_probability
+        self.submit_probability = submit_probability
+        self.exit_probability = exit_probability
+        self.initial_pool = initial_pool
+
+
+class RoundActions:
+    """What one round did, in the order it would be sent to the contracts."""
+    def __init__(self, challenge_number):
+        self.challenge_number = challenge_number
+        self.opened = False
+        self.closed = False
+        self.sponsor_amount = 0
+        self.targets = None
+        self.applied = None
+        self.submitted = None
+        self.staking_rewards = None
+        self.challenge_rewards = None
+        self.tournament_rewards = None
+        self.burn_bps = 0
+        self.burned = None
+        self.burn_amounts = None
+        self.burned_to_pool = 0
+
+
+class Simulator:
+    def __init__(self, parameters, num_participants, seed=None):
+        self.parameters = parameters
+        self.num_participants = num_participants
+        self.rng = np.random.default_rng(seed)
+
+        self.balances = np.full(num_participants, parameters.initial_balance, dtype=AMOUNT_DTYPE)
+        self.stakes = np.zeros(num_participants, dtype=AMOUNT_DTYPE)
+        self.submitted = np.zeros(num_participants, dtype=bool)
+        self.snapshot = np.zeros(num_participants, dtype=AMOUNT_DTYPE)
+
+        self.challenge_counter = 0
+        self.phase = 4
+        self.competition_pool = 0
+        self.total_staked = 0
+        self.burned_amount = 0
+        self.balance = 0
+        self.challenge_payments = 0
+        self.challenge_burns = 0
+        self.history = []
+        if parameters.initial_pool > 0:
+            self.sponsor(parameters.initial_pool)
+
+    @property
+    def remainder(self):
+        return self.balance - self.total_staked - self.competition_pool - self.burned_amount
+
+    """
+    CONTRACT OPERATIONS
+    """
+
+    def sponsor(self, amount):
+        # Sponsors are outside the simulated population.
+        self.balance += int(amount)
+        self.competition_pool += int(amount)
+
+    def open_challenge(self):
+        if self.phase != 4 or self.competition_pool < self.parameters.rewards_threshold:
+            return False
+        self.challenge_counter += 1
+        self.phase = 1
+        self.submitted[:] = False
+        self.challenge_payments = 0
+        self.challenge_burns = 0
+        return True
+
+    def set_stakes(self, targets):
+        """`setStake` for every participant at once. Returns the mask of participants whose call succeeded."""
+        if self.phase != 1:
+            raise SimulationError("Stakes can only change in phase 1.")
+        targets = np.asarray(targets, dtype=AMOUNT_DTYPE)
+        delta = targets - self.stakes
+        threshold = self.parameters.stake_threshold
+        increase = delta > 0
+        valid = np.where(increase,
+                         (targets >= threshold) & (self.balances >= delta),
+                         ((targets == 0) & ~self.submitted) | (targets >= threshold))
+        delta = np.where(valid, delta, 0)
+        self.stakes += delta
+        self.balances -= delta
+        moved = int(delta.sum())
+        self.total_staked += moved
+        self.balance += moved
+        return valid
+
+    def submit(self, mask):
+        """`stakeAndSubmit` at the current stake; only staked participants can submit."""
+        if self.phase != 1:
+            raise SimulationError("Submissions can only change in phase 1.")
+        valid = np.asarray(mask, dtype=bool) & (self.stakes > 0)
+        self.submitted |= valid
+        return valid
+
+    def close_submission(self):
+        if self.phase != 1:
+            raise SimulationError("Submission is not open.")
+        self.phase = 2
+
+    def record_stakes(self):
+        # Stakers with a stake of zero are not in the staker set and are recorded as zero either way.
+        if self.phase < 2:
+            raise SimulationError("Submission is still open.")
+        self.snapshot = self.stakes.copy()
+
+    def advance_to_phase(self, phase):
+        if phase not in (3, 4) or phase - 1 != self.phase:
+            raise SimulationError("Cannot advance from phase {} to {}.".format(self.phase, phase))
+        if phase == 4 and self.challenge_payments == 0 and self.challenge_burns == 0:
+            return False
+        self.phase = phase
+        return True
+
+    def pay_rewards(self, staking_rewards, challenge_rewards, tournament_rewards):
+        if self.phase != 3:
+            raise SimulationError("Rewards can only be paid in phase 3.")
+        rewards = (np.asarray(staking_rewards, dtype=AMOUNT_DTYPE) + np.asarray(challenge_rewards, dtype=AMOUNT_DTYPE)
+                   + np.asarray(tournament_rewards, dtype=AMOUNT_DTYPE))
+        total = int(rewards.sum())
+        if total > self.competition_pool:
+            raise SimulationError("Rewards of {} exceed the competition pool of {}.".format(
+                total, self.competition_pool))
+        self.stakes += rewards
+        self.competition_pool -= total
+        self.total_staked += total
+        self.challenge_payments += total
+
+    def burn(self, burn_amounts):
+        if self.phase != 3:
+            raise SimulationError("Stakes can only be burned in phase 3.")
+        burn_amounts = np.asarray(burn_amounts, dtype=AMOUNT_DTYPE)
+        if np.any(burn_amounts > self.stakes):
+            raise SimulationError("Burn exceeds stake.")
+        total = int(burn_amounts.sum())
+        self.stakes -= burn_amounts
+        self.burned_amount += total
+        self.total_staked -= total
+        self.challenge_burns += total
+
+    def burn_bps(self, mask, bps):
+        """`burnUniformBps` for the participants in `mask`. Returns the amounts burned."""
+        burn_amounts = np.where(mask, self.stakes * int(bps) // BPS_DENOMINATOR, 0).astype(AMOUNT_DTYPE)
+        self.burn(burn_amounts)
+        return burn_amounts
+
+    def move_burned_to_pool(self, amount):
+        if self.phase != 4:
+            raise SimulationError("The challenge is not closed.")
+        if amount > self.burned_amount:
+            raise SimulationError("Not enough burned.")
+        self.burned_amount -= int(amount)
+        self.competition_pool += int(amount)
+
+    """
+    ROUNDS
+    """
+
+    def choose_targets(self):
+        p = self.parameters
+        n = self.num_participants
+        holdings = self.balances + self.stakes
+        draws = self.rng.lognormal(np.log(p.mean_stake), p.stake_sigma, n).astype(AMOUNT_DTYPE)
+        changing = self.rng.random(n) < p.stake_probability
+        exiting = self.rng.random(n) < p.exit_probability
+        targets = np.where(changing, np.minimum(draws, holdings), self.stakes)
+        return np.where(exiting & ~changing, 0, targets).astype(AMOUNT_DTYPE)
+
+    def compute_rewards(self, budget, submitted):
+        p = self.parameters
+        n = self.num_participants
+        staking_budget, challenge_budget, tournament_budget = split_budget(
+            budget, p.staking_bps, p.challenge_bps, p.tournament_bps)
+        # scores are random and scaled to integers, so rewards are split in exact proportions.
+        challenge_scores = np.where(submitted, (self.rng.random(n) * SCORE_SCALE).astype(AMOUNT_DTYPE), 0)
+        tournament_scores = np.where(submitted, (self.rng.random(n) * SCORE_SCALE).astype(AMOUNT_DTYPE), 0)
+        return (allocate(self.snapshot, staking_budget), allocate(challenge_scores, challenge_budget),
+                allocate(tournament_scores, tournament_budget))
+
+    def run_round(self):
+        p = self.parameters
+        actions = RoundActions(self.challenge_counter + 1)
+        if p.sponsor_amount > 0:
+            self.sponsor(p.sponsor_amount)
+            actions.sponsor_amount = p.sponsor_amount
+
+        actions.opened = self.open_challenge()
+        if not actions.opened:
+            self.history.append(self.summary(actions))
+            return actions
+
+        actions.targets = self.choose_targets()
+        actions.applied = self.set_stakes(actions.targets)
+        actions.submitted = self.submit(self.rng.random(self.num_participants) < p.submit_probability)
+
+        self.close_submission()
+        self.record_stakes()
+        self.advance_to_phase(3)
+
+        budget = min(p.budget, self.competition_pool)
+        rewards = self.compute_rewards(budget, actions.submitted)
+        actions.staking_rewards, actions.challenge_rewards, actions.tournament_rewards = rewards
+        self.pay_rewards(*rewards)
+        if p.burn_bps > 0:
+            actions.burn_bps = p.burn_bps
+            actions.burned = (self.stakes > 0) & ~actions.submitted
+            actions.burn_amounts = self.burn_bps(actions.burned, p.burn_bps)
+
+        actions.closed = self.advance_to_phase(4)
+        if actions.closed and p.burned_to_pool_bps > 0:
+            actions.burned_to_pool = self.burned_amount * p.burned_to_pool_bps // BPS_DENOMINATOR
+            self.move_burned_to_pool(actions.burned_to_pool)
+        self.history.append(self.summary(actions))
+        return actions
+
+    def run(self, num_rounds):
+        for _ in range(num_rounds):
+            self.run_round()
+        return self.history
+
+    def summary(self, actions=None):
+        summary = {
+            'challenge_number': self.challenge_counter,
+            'phase': self.phase,
+            'competition_pool': self.competition_pool,
+            'total_staked': self.total_staked,
+            'burned_amount': self.burned_amount,
+            'remainder': self.remainder,
+            'stakers': int(np.count_nonzero(self.stakes)),
+            'submitters': int(np.count_nonzero(self.submitted)),
+        }
+        if actions is not None:
+            summary['opened'] = actions.opened
+            summary['closed'] = actions.closed
+        return summary
+
+
+def sweep(parameter_sets, num_participants, num_rounds, seed=0):
+    """Run one simulation per parameter set, all with the same seed, and return the final summary of each."""
+    results = []
+    for parameters in parameter_sets:
+        simulator = Simulator(parameters, num_participants, seed)
+        simulator.run(num_rounds)
+        results.append(simulator.summary())
+    return results
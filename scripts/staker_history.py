@@ -0,0 +1,236 @@
+"""
+Streaming loader for CSV histories of staked amounts, and their verification against the recorded stakes.
+
+The CSV has three columns: challenge number, staker address and staked amount (in the token's smallest unit), with
+an optional header row. The file is memory-mapped and parsed in chunks of about `chunk_bytes`, cut at line ends, into
+NumPy columns, and each chunk is grouped by challenge. Verification sends `getHistoricalStakeAmounts` for batches of
+each group while the following chunks are parsed, with at most `max_in_flight` calls outstanding, so memory stays
+bounded by the chunk size and the window however long the history is.
+
+Amounts are `uint64` columns. Amounts are `uint256` on chain: a chunk holding an amount of 2**64 or more keeps its
+amounts as Python ints in an `object` column instead, which is exact but slower to parse and compare.
+
+    for chunk in read_chunks('tests/staker_info.csv'):
+        for challenge_number, stakers, amounts in chunk.groups():
+            ...
+    report = verify_history('tests/staker_info.csv', competition, web3)
+    assert report.ok, report.mismatches[:10]
+
+During a migration the same file is imported with `importHistoricalStakes`, each group sent in gas-sized chunks. The
+contract only accepts snapshots of challenges before its latest one:
+
+    import_history('tests/staker_info.csv', competition, SettlementPlanner({'from': admin}))
+"""
+import asyncio
+import mmap
+import os
+from collections import deque
+import numpy as np
+from scripts.async_reader import AsyncPagedReader
+from scripts.settlement import Operation
+
+DEFAULT_CHUNK_BYTES = 8 * 2 ** 20
+DEFAULT_BATCH_SIZE = 2500
+DEFAULT_MAX_IN_FLIGHT = 16
+RECORD_SIZE = 52
+UINT256_MAX = 2 ** 256 - 1
+
+
+class HistoryError(Exception):
+    pass
+
+
+class HistoryChunk:
+    def __init__(self, challenge_numbers, stakers, amounts, first_row):
+        self.challenge_numbers = challenge_numbers
+        self.stakers = stakers
+        self.amounts = amounts
+        self.first_row = first_row
+
+    def __len__(self):
+        return len(self.challenge_numbers)
+
+    def groups(self):
+        """Yield `(challenge_number, stakers, amounts)` for each challenge in the chunk, keeping the file order."""
+        order = np.argsort(self.challenge_numbers, kind='stable')
+        challenge_numbers = self.challenge_numbers[order]
+        bounds = np.concatenate([[0], np.flatnonzero(np.diff(challenge_numbers)) + 1, [len(order)]])
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            rows = order[start:end]
+            yield int(challenge_numbers[start]), self.stakers[rows], self.amounts[rows]
+
+
+def to_amounts(values):
+    """
+    `values`, integers or their decimal strings, as a `uint64` array, or as an `object` array of Python ints when one
+    of them does not fit in 64 bits.
+    """
+    values = np.asarray(values)
+    try:
+        return values.astype(np.uint64)
+    except OverflowError:
+        amounts = np.array([int(v) for v in values.tolist()], dtype=object)
+        if any(a < 0 or a > UINT256_MAX for a in amounts):
+            raise OverflowError("Amount out of the uint256 range")
+        return amounts
+
+
+def parse_chunk(data, first_row=0):
+    """Parse complete CSV lines into a `HistoryChunk`. `first_row` is the row number of the first line."""
+    lines = data.split()
+    fields = b','.join(lines).split(b',') if lines else []
+    if len(fields) % 3 != 0:
+        for i, line in enumerate(lines):
+            if line.count(b',') != 2:
+                raise HistoryError("Row {} does not have 3 columns: {}".format(first_row + i, line.decode()))
+    try:
+        challenge_numbers = np.array(fields[0::3], dtype=bytes).astype(np.uint32)
+        amounts = to_amounts(np.array(fields[2::3], dtype=bytes))
+    except (ValueError, OverflowError) as e:
+        raise HistoryError("Invalid number in rows {} to {}: {}".format(first_row, first_row + len(lines) - 1, e))
+    stakers = np.array(fields[1::3], dtype='S42').astype('U42')
+    return HistoryChunk(challenge_numbers, stakers, amounts, first_row)
+
+
+def read_chunks(path, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Yield the rows of the CSV at `path` as `HistoryChunk`s of about `chunk_bytes`, skipping a header row."""
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        size = len(data)
+        position = 0
+        first_line = data[:data.find(b'\n') if data.find(b'\n') >= 0 else size]
+        if not first_line.strip()[:1].isdigit():
+            position = len(first_line) + 1
+        row = 0
+        while position < size:
+            end = min(position + chunk_bytes, size)
+            if end < size:
+                # Cut the chunk at the last line end, or run on to the next one for very long lines.
+                cut = data.rfind(b'\n', position, end)
+                end = cut + 1 if cut >= 0 else (data.find(b'\n', end) + 1 or size)
+            chunk = parse_chunk(data[position:end], row)
+            row += len(chunk)
+            position = end
+            yield chunk
+
+
+def load_history(path, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Return `{challenge_number: (stakers, amounts)}` for the whole CSV at `path`, in file order per challenge."""
+    groups = {}
+    for chunk in read_chunks(path, chunk_bytes):
+        for challenge_number, stakers, amounts in chunk.groups():
+            groups.setdefault(challenge_number, []).append((stakers, amounts))
+    return {challenge_number: (np.concatenate([s for s, _ in parts]), np.concatenate([a for _, a in parts]))
+            for challenge_number, parts in groups.items()}
+
+
+class HistoryReport:
+    def __init__(self, block):
+        self.block = block
+        self.rows = 0
+        self.totals = {}
+        self.counts = {}
+        self.mismatches = []
+
+    @property
+    def ok(self):
+        return len(self.mismatches) == 0
+
+    def add_batch(self, challenge_number, stakers, expected, actual):
+        self.rows += len(stakers)
+        self.totals[challenge_number] = self.totals.get(challenge_number, 0) + int(expected.sum(dtype=object))
+        self.counts[challenge_number] = self.counts.get(challenge_number, 0) + len(stakers)
+        actual = to_amounts([int(a) for a in actual])
+        if actual.dtype != expected.dtype:
+            expected, actual = expected.astype(object), actual.astype(object)
+        for i in np.flatnonzero(actual != expected):
+            self.mismatches.append((challenge_number, str(stakers[i]), int(expected[i]), int(actual[i])))
+
+
+async def verify_history_async(path, competition, reader, block, batch_size=DEFAULT_BATCH_SIZE,
+                               max_in_flight=DEFAULT_MAX_IN_FLIGHT, chunk_bytes=DEFAULT_CHUNK_BYTES,
+                               check_totals=False):
+    report = HistoryReport(block)
+    semaphore = asyncio.Semaphore(max_in_flight)
+    window = deque()
+
+    async def settle():
+        challenge_number, stakers, amounts, task = window.popleft()
+        report.add_batch(challenge_number, stakers, amounts, await task)
+
+    try:
+        for chunk in read_chunks(path, chunk_bytes):
+            for challenge_number, stakers, amounts in chunk.groups():
+                for i in range(0, len(stakers), batch_size):
+                    batch = stakers[i:i + batch_size]
+                    task = asyncio.ensure_future(reader.call(competition.getHistoricalStakeAmounts,
+                                                             [challenge_number, batch.tolist()], block, semaphore))
+                    window.append((challenge_number, batch, amounts[i:i + batch_size], task))
+                    while len(window) >= max_in_flight:
+                        await settle()
+            # Let the calls already sent make progress before parsing the next chunk.
+            await asyncio.sleep(0)
+        while window:
+            await settle()
+    finally:
+        for _, _, _, task in window:
+            task.cancel()
+
+    if check_totals:
+        for challenge_number, total in report.totals.items():
+            recorded = await reader.call(competition.getHistoricalTotalStaked, [challenge_number], block)
+            if recorded != total:
+                report.mismatches.append((challenge_number, None, total, recorded))
+    return report
+
+
+def verify_history(path, competition, web3, block=None, batch_size=DEFAULT_BATCH_SIZE,
+                   max_in_flight=DEFAULT_MAX_IN_FLIGHT, chunk_bytes=DEFAULT_CHUNK_BYTES, check_totals=False):
+    """
+    Compare every row of the CSV at `path` with `getHistoricalStakeAmounts` at `block` (default: latest).
+    Mismatches are `(challenge_number, staker, csv_amount, recorded_amount)`. With `check_totals`, the CSV must
+    hold complete snapshots: each challenge's total is compared with `getHistoricalTotalStaked`, reported with a
+    staker of `None`.
+    """
+    reader = AsyncPagedReader(web3, max_concurrency=max_in_flight)
+    try:
+        block = web3.eth.block_number if block is None else block
+        return reader.run(verify_history_async(path, competition, reader, block, batch_size, max_in_flight,
+                                               chunk_bytes, check_totals))
+    finally:
+        reader.close()
+
+
+def pack_stakes(stakers, amounts):
+    """Pack `(staker, amount)` records for `importHistoricalStakes`: 20 address bytes, then a 32-byte amount."""
+    records = np.zeros((len(stakers), RECORD_SIZE), dtype=np.uint8)
+    if len(stakers) > 0:
+        addresses = bytes.fromhex(''.join(str(staker)[2:] for staker in stakers))
+        records[:, :20] = np.frombuffer(addresses, dtype=np.uint8).reshape(-1, 20)
+        amounts = to_amounts(amounts)
+        if amounts.dtype == object:
+            words = b''.join(int(a).to_bytes(32, 'big') for a in amounts)
+            records[:, 20:] = np.frombuffer(words, dtype=np.uint8).reshape(-1, 32)
+        else:
+            # The upper 24 bytes of amounts that fit in 64 bits stay zero.
+            records[:, RECORD_SIZE - 8:] = amounts.astype('>u8').view(np.uint8).reshape(-1, 8)
+    return records.tobytes()
+
+
+def import_stakes_operation(competition, challenge_number, stakers, amounts):
+    packed = pack_stakes(stakers, amounts)
+    return Operation(competition.importHistoricalStakes, len(stakers),
+                     lambda s, e: [challenge_number, packed[s * RECORD_SIZE:e * RECORD_SIZE]])
+
+
+def import_history(path, competition, planner, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """
+    Import the stakes snapshots in the CSV at `path` with `importHistoricalStakes`, chunk by chunk, each challenge's
+    rows sent in chunks sized by `planner`. Returns the transactions.
+    """
+    txs = []
+    for chunk in read_chunks(path, chunk_bytes):
+        for challenge_number, stakers, amounts in chunk.groups():
+            txs += planner.execute(import_stakes_operation(competition, challenge_number, stakers, amounts))
+    return txs
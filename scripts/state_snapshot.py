@@ -0,0 +1,290 @@
+"""
+Compact columnar snapshots of Competition state at a block.
+
+A snapshot is a directory of `.npy` columns and a `manifest.json`. Addresses are stored as 20-byte rows and hashes
+as 32-byte rows of `uint8`; amounts and scores as `uint64`, or as 32-byte big-endian rows when a value does not fit.
+Per-challenge rows (the submitters and historical stakers of every challenge, with their `Information`) are stored
+one after the other, and the manifest indexes each challenge's range of rows, so a challenge loads as slices of
+memory-mapped arrays without copying.
+
+State is read straight from storage with `CompetitionStorageReader`. `seed_snapshot` writes a snapshot into the
+storage of another, initialized deployment on a local chain, for load tests on realistic state; the token, roles
+and initialized state of that deployment are kept.
+
+    export_snapshot(web3, competition.address, 'build/snapshots/competition-40000000')
+    snapshot = load_snapshot('build/snapshots/competition-40000000')
+    stakes = snapshot.columns['stakes']
+    seed_snapshot(web3, snapshot, fresh_competition.address)
+"""
+import json
+import os
+import numpy as np
+import requests
+from scripts.storage_reader import CompetitionStorageReader, SLOTS, CHALLENGE_FIELDS, SUBMITTER_INFO_OFFSET, \
+    DEADLINES_OFFSET, SUBMITTERS_OFFSET, INFORMATION_FIELDS, mapping_slot, array_slot, word
+from scripts.rpc_replay import SEED_METHODS, to_word
+
+SNAPSHOT_VERSION = 1
+MANIFEST = 'manifest.json'
+DEFAULT_DEADLINE_INDICES = (0, 1)
+DEFAULT_SEED_BATCH = 500
+UINT64_MAX = 2 ** 64 - 1
+
+# Per-challenge values, one row per challenge.
+CHALLENGE_UINTS = ['phase', 'challenge_opened_block_numbers', 'submission_closed_block_numbers',
+                   'historical_total_stake', 'challenge_payments', 'challenge_burns', 'staking_rewards_cursor']
+CHALLENGE_HASHES = ['dataset', 'results', 'key', 'private_key', 'challenge_archive_hashes']
+# Per-participant values of a challenge; `historical_stake` comes from the stakes snapshot, the rest from
+# `Information`.
+PARTICIPANT_UINTS = ['historical_stake', 'staking_rewards', 'challenge_rewards', 'tournament_rewards',
+                     'challenge_scores', 'tournament_scores', 'tokens_burned', 'staked']
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def address_column(addresses):
+    hex_string = ''.join(str(a)[2:] for a in addresses)
+    return np.frombuffer(bytes.fromhex(hex_string), dtype=np.uint8).reshape(-1, 20).copy()
+
+
+def word_column(values):
+    return np.frombuffer(b''.join(word(v) for v in values), dtype=np.uint8).reshape(-1, 32).copy()
+
+
+def uint_column(values):
+    """`uint64` if every value fits, 32-byte big-endian rows otherwise."""
+    values = [int(v) for v in values]
+    if all(v <= UINT64_MAX for v in values):
+        return np.asarray(values, dtype=np.uint64)
+    return word_column(values)
+
+
+def to_addresses(column):
+    return ['0x' + row.tobytes().hex() for row in column]
+
+
+def to_ints(column):
+    """Python integers of a uint column in either encoding."""
+    if column.ndim == 1:
+        return [int(v) for v in column]
+    return [int.from_bytes(row.tobytes(), 'big') for row in column]
+
+
+class Snapshot:
+    def __init__(self, path, manifest, columns):
+        self.path = path
+        self.manifest = manifest
+        self.columns = columns
+
+    @property
+    def challenge_numbers(self):
+        return [int(n) for n in self.columns['challenge_numbers']]
+
+    def challenge(self, challenge_number):
+        """Views of the rows of one challenge: its challenge values and its participant columns."""
+        row = self.manifest['challenges'][str(challenge_number)]
+        start, end = row['start'], row['end']
+        result = {name: self.columns[name][row['row']] for name in CHALLENGE_UINTS + CHALLENGE_HASHES + ['deadlines']}
+        for name in ['participants', 'submitter_positions', 'historical_positions', 'submissions'] + PARTICIPANT_UINTS:
+            result[name] = self.columns[name][start:end]
+        return result
+
+
+def export_snapshot(web3, address, path, block=None, challenge_numbers=None,
+                    deadline_indices=DEFAULT_DEADLINE_INDICES, batch_size=None):
+    """
+    Write the state of the Competition at `address` at `block` (default: latest) to the directory `path`, for
+    `challenge_numbers` (default: all). Returns the loaded `Snapshot`.
+    """
+    kwargs = {} if batch_size is None else {'batch_size': batch_size}
+    reader = CompetitionStorageReader(web3, address, block, **kwargs)
+    try:
+        scalars = reader.scalars()
+        scalars['message'] = reader.message()
+        if challenge_numbers is None:
+            challenge_numbers = range(1, scalars['challenge_counter'] + 1)
+        challenge_numbers = list(challenge_numbers)
+
+        stakers = reader.stakers()
+        columns = {'stakers': address_column(stakers), 'stakes': uint_column(reader.stakes(stakers)),
+                   'challenge_numbers': np.asarray(challenge_numbers, dtype=np.uint32)}
+        challenge_rows = {name: [] for name in CHALLENGE_UINTS + CHALLENGE_HASHES + ['deadlines']}
+        participant_rows = {name: [] for name in ['participants', 'submitter_positions', 'historical_positions',
+                                                  'submissions'] + PARTICIPANT_UINTS}
+        index = {}
+        count = 0
+        for row, challenge_number in enumerate(challenge_numbers):
+            challenge = reader.challenge(challenge_number)
+            for name in CHALLENGE_UINTS:
+                challenge_rows[name].append(challenge[name])
+            for name in CHALLENGE_HASHES:
+                challenge_rows[name].append(int(challenge[name], 16))
+            challenge_rows['deadlines'].append(reader.deadlines(challenge_number, deadline_indices))
+
+            # Historical stakers first, then submitters that are not part of the stakes snapshot.
+            historical_stakers = reader.historical_stakers(challenge_number)
+            submitters = reader.submitters(challenge_number)
+            participants = list(dict.fromkeys(historical_stakers + submitters))
+            submitter_positions = {s: i for i, s in enumerate(submitters)}
+            historical_positions = {s: i for i, s in enumerate(historical_stakers)}
+            information = reader.information(challenge_number, participants)
+            participant_rows['participants'] += participants
+            participant_rows['submitter_positions'] += [submitter_positions.get(p, -1) for p in participants]
+            participant_rows['historical_positions'] += [historical_positions.get(p, -1) for p in participants]
+            participant_rows['submissions'] += [int(s, 16) for s in information['submission']]
+            participant_rows['historical_stake'] += reader.historical_stake_amounts(challenge_number, participants)
+            for name in PARTICIPANT_UINTS[1:]:
+                participant_rows[name] += information[name]
+            index[str(challenge_number)] = {'row': row, 'start': count, 'end': count + len(participants)}
+            count += len(participants)
+    finally:
+        reader.close()
+
+    for name in CHALLENGE_UINTS:
+        columns[name] = uint_column(challenge_rows[name])
+    for name in CHALLENGE_HASHES:
+        columns[name] = word_column(challenge_rows[name])
+    columns['deadlines'] = uint_column([d for row in challenge_rows['deadlines'] for d in row])
+    columns['deadlines'] = columns['deadlines'].reshape((len(challenge_numbers), len(deadline_indices)) +
+                                                        columns['deadlines'].shape[1:])
+    columns['participants'] = address_column(participant_rows['participants'])
+    for name in ['submitter_positions', 'historical_positions']:
+        columns[name] = np.asarray(participant_rows[name], dtype=np.int64)
+    columns['submissions'] = word_column(participant_rows['submissions'])
+    for name in PARTICIPANT_UINTS:
+        columns[name] = uint_column(participant_rows[name])
+
+    os.makedirs(path, exist_ok=True)
+    for name, column in columns.items():
+        np.save(os.path.join(path, name + '.npy'), column)
+    manifest = {
+        'version': SNAPSHOT_VERSION,
+        'address': str(address),
+        'block': reader.block,
+        'scalars': scalars,
+        'deadline_indices': list(deadline_indices),
+        'challenges': index,
+        'columns': {name: {'dtype': str(column.dtype), 'shape': list(column.shape)}
+                    for name, column in columns.items()},
+    }
+    with open(os.path.join(path, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return load_snapshot(path)
+
+
+def load_snapshot(path, mmap_mode='r'):
+    """Load the snapshot in the directory `path`, with its columns memory-mapped (`mmap_mode=None` reads them)."""
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != SNAPSHOT_VERSION:
+        raise SnapshotError("Unsupported snapshot version {}.".format(manifest.get('version')))
+    columns = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode)
+               for name in manifest['columns']}
+    return Snapshot(path, manifest, columns)
+
+
+def address_set_slots(slot, addresses):
+    """`(slot, value)` pairs that make the `EnumerableSet.AddressSet` at `slot` hold `addresses`, in order."""
+    base = array_slot(slot)
+    pairs = [(slot, len(addresses))]
+    for i, a in enumerate(addresses):
+        pairs.append((base + i, int(a, 16)))
+        pairs.append((mapping_slot(a, slot + 1), i + 1))
+    return pairs
+
+
+def snapshot_slots(snapshot, token_word, vault_word):
+    """
+    `(slot, value)` pairs for the state in `snapshot`. `token_word` and `vault_word` are the current values of slots 2
+    and 22: the token address and the `Initializable` flags packed after the vault are kept.
+    """
+    scalars = snapshot.manifest['scalars']
+    columns = snapshot.columns
+    address_mask = 2 ** 160 - 1
+    pairs = [(SLOTS['token'], (token_word & address_mask) | (scalars['challenge_counter'] << 160)),
+             (SLOTS['vault'], (vault_word & ~address_mask) | int(scalars['vault'], 16))]
+    for name in ['stake_threshold', 'competition_pool', 'rewards_threshold', 'current_total_staked',
+                 'current_staking_rewards_budget', 'burned_amount', 'migration_completed']:
+        pairs.append((SLOTS[name], int(scalars[name])))
+    pairs.append((SLOTS['burn_recipient'], int(scalars['burn_recipient'], 16)))
+
+    message = scalars['message'].encode()
+    if len(message) < 32:
+        pairs.append((SLOTS['message'], int.from_bytes(message.ljust(31, b'\0') + bytes([len(message) * 2]), 'big')))
+    else:
+        pairs.append((SLOTS['message'], len(message) * 2 + 1))
+        padded = message.ljust((len(message) + 31) // 32 * 32, b'\0')
+        for i in range(0, len(padded), 32):
+            pairs.append((array_slot(SLOTS['message'], i // 32), int.from_bytes(padded[i:i + 32], 'big')))
+
+    stakers = to_addresses(columns['stakers'])
+    pairs += address_set_slots(SLOTS['staker_set'], stakers)
+    pairs += [(mapping_slot(s, SLOTS['stakes']), v) for s, v in zip(stakers, to_ints(columns['stakes']))]
+
+    deadline_indices = snapshot.manifest['deadline_indices']
+    for challenge_number in snapshot.challenge_numbers:
+        c = snapshot.challenge(challenge_number)
+        base = mapping_slot(challenge_number, SLOTS['challenges'])
+        for name in ['dataset', 'results', 'key', 'private_key']:
+            pairs.append((base + CHALLENGE_FIELDS[name], int.from_bytes(c[name].tobytes(), 'big')))
+        for name, slot in [('dataset', SLOTS['dataset_hashes']), ('key', SLOTS['public_key_hashes'])]:
+            # Keep the uniqueness checks of dataset and key hashes.
+            value = int.from_bytes(c[name].tobytes(), 'big')
+            if value != 0:
+                pairs.append((mapping_slot(value, slot), 1))
+        pairs.append((base + CHALLENGE_FIELDS['phase'], int(c['phase'])))
+        for name in CHALLENGE_UINTS[1:]:
+            pairs.append((mapping_slot(challenge_number, SLOTS[name]), int(c[name])))
+        pairs.append((mapping_slot(challenge_number, SLOTS['challenge_archive_hashes']),
+                      int.from_bytes(c['challenge_archive_hashes'].tobytes(), 'big')))
+        for i, deadline in zip(deadline_indices, to_ints(c['deadlines'])):
+            pairs.append((mapping_slot(i, base + DEADLINES_OFFSET), deadline))
+
+        participants = to_addresses(c['participants'])
+        submitters = [p for _, p in sorted((int(i), p) for i, p in zip(c['submitter_positions'], participants)
+                                           if i >= 0)]
+        historical_stakers = [p for _, p in sorted((int(i), p) for i, p in zip(c['historical_positions'],
+                                                                              participants) if i >= 0)]
+        pairs += address_set_slots(base + SUBMITTERS_OFFSET, submitters)
+        historical_slot = mapping_slot(challenge_number, SLOTS['historical_staker_set'])
+        pairs += address_set_slots(historical_slot, historical_stakers)
+        amounts_slot = mapping_slot(challenge_number, SLOTS['historical_stake_amounts'])
+        values = {name: to_ints(c[name]) for name in PARTICIPANT_UINTS}
+        for i, p in enumerate(participants):
+            pairs.append((mapping_slot(p, amounts_slot), values['historical_stake'][i]))
+            info = mapping_slot(p, base + SUBMITTER_INFO_OFFSET)
+            submission = int.from_bytes(c['submissions'][i].tobytes(), 'big')
+            pairs.append((info + INFORMATION_FIELDS['submission'], submission))
+            for name in PARTICIPANT_UINTS[1:]:
+                pairs.append((info + INFORMATION_FIELDS[name], values[name][i]))
+    return pairs
+
+
+def seed_snapshot(web3, snapshot, address, node='ganache', batch_size=DEFAULT_SEED_BATCH):
+    """
+    Write `snapshot` into the storage of the initialized Competition at `address` on a local chain. Returns the
+    number of slots written. The contract's token balance is not part of the snapshot.
+    """
+    set_storage = SEED_METHODS[node][3]
+    token_word, vault_word = [int(web3.provider.make_request('eth_getStorageAt', [str(address), hex(SLOTS[name]),
+                                                                                'latest'])['result'], 16)
+                              for name in ['token', 'vault']]
+    pairs = snapshot_slots(snapshot, token_word, vault_word)
+    requests_ = [{'jsonrpc': '2.0', 'id': i, 'method': set_storage, 'params': [str(address), to_word(s), to_word(v)]}
+                 for i, (s, v) in enumerate(pairs)]
+    endpoint = getattr(web3.provider, 'endpoint_uri', None)
+    with requests.Session() as session:
+        for i in range(0, len(requests_), batch_size):
+            batch = requests_[i:i + batch_size]
+            if endpoint is None:
+                responses = [web3.provider.make_request(r['method'], r['params']) for r in batch]
+            else:
+                response = session.post(endpoint, json=batch)
+                response.raise_for_status()
+                responses = response.json()
+            for r in responses:
+                if 'error' in r:
+                    raise SnapshotError("{} failed: {}".format(set_storage, r['error']))
+    return len(pairs)
@@ -0,0 +1,288 @@
+"""
+Bulk reads of Competition state straight from its storage slots.
+
+The storage layout of `Competition` (`AccessControlEnumerable`, then `CompetitionStorage`, `Initializable` and
+`UniqueMappings`) is fixed, so the slot of any value can be derived off-chain: a mapping value lives at
+`keccak(key . slot)`, a struct field at the struct's slot plus the field offset, and the addresses of an
+`EnumerableSet` at `keccak(slot) + index`, with the set size at `slot`. Slots are read with `eth_getStorageAt`, sent
+as JSON-RPC batches, several batches at a time, all at one pinned block. No call is executed and nothing is ABI
+encoded, which also reaches state without a getter such as `Information.staked`.
+
+`SLOTS` follows the storage layout solc reports for `Competition`; `layout_slots()` derives the same table from the
+compiler output, and the tests compare the two.
+
+    reader = CompetitionStorageReader(web3, competition.address)
+    stakers = reader.stakers()
+    stakes = reader.stakes(stakers)
+    state = reader.export()
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import requests
+from eth_utils import keccak, to_checksum_address
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Slots of the state variables of `Competition`.
+SLOTS = {
+    'token': 2,  # shares its slot with `challenge_counter`
+    'challenge_counter': 2,
+    'stake_threshold': 3,
+    'competition_pool': 4,
+    'rewards_threshold': 5,
+    'current_total_staked': 6,
+    'current_staking_rewards_budget': 7,
+    'message': 10,
+    'stakes': 11,
+    'challenges': 12,
+    'burn_recipient': 13,
+    'burned_amount': 14,
+    'staker_set': 15,
+    'challenge_opened_block_numbers': 17,
+    'submission_closed_block_numbers': 18,
+    'historical_staker_set': 19,
+    'historical_stake_amounts': 20,
+    'historical_total_stake': 21,
+    'vault': 22,
+    'initialized': 22,  # `Initializable._initialized`, packed after `vault`, followed by `_initializing`
+    'dataset_hashes': 23,
+    'public_key_hashes': 24,
+    'challenge_payments': 25,
+    'challenge_burns': 26,
+    'challenge_archive_hashes': 27,
+    'staking_rewards_cursor': 28,
+    'migration_completed': 29,
+}
+
+# Names of the state variables in the contract sources, for `layout_slots()`.
+LABELS = {
+    'token': '_token', 'challenge_counter': '_challengeCounter', 'stake_threshold': '_stakeThreshold',
+    'competition_pool': '_competitionPool', 'rewards_threshold': '_rewardsThreshold',
+    'current_total_staked': '_currentTotalStaked', 'current_staking_rewards_budget': '_currentStakingRewardsBudget',
+    'message': '_message', 'stakes': '_stakes', 'challenges': '_challenges', 'burn_recipient': '_burnRecipient',
+    'burned_amount': '_burnedAmount', 'staker_set': 'stakerSet',
+    'challenge_opened_block_numbers': 'challengeOpenedBlockNumbers',
+    'submission_closed_block_numbers': 'submissionClosedBlockNumbers',
+    'historical_staker_set': '_historicalStakerSet', 'historical_stake_amounts': '_historicalStakeAmounts',
+    'historical_total_stake': '_historicalTotalStake', 'vault': '_vault', 'initialized': '_initialized',
+    'dataset_hashes': '_datasetHashes', 'public_key_hashes': '_publicKeyHashes',
+    'challenge_payments': 'challengePayments', 'challenge_burns': 'challengeBurns',
+    'challenge_archive_hashes': 'challengeArchiveHashes', 'staking_rewards_cursor': 'stakingRewardsCursor',
+    'migration_completed': 'migrationCompleted',
+}
+
+# Field offsets of the `Challenge` struct.
+CHALLENGE_FIELDS = {'dataset': 0, 'results': 1, 'key': 2, 'private_key': 3, 'phase': 4}
+SUBMITTER_INFO_OFFSET = 5
+DEADLINES_OFFSET = 6
+SUBMITTERS_OFFSET = 7
+
+# Field offsets of the `Information` struct.
+INFORMATION_FIELDS = {'submission': 0, 'staked': 1, 'staking_rewards': 2, 'challenge_rewards': 3,
+                      'tournament_rewards': 4, 'challenge_scores': 5, 'tournament_scores': 6, 'tokens_burned': 8}
+INFO_OFFSET = 7
+
+# Per-challenge values held in mappings keyed by challenge number.
+CHALLENGE_MAPPINGS = ['challenge_opened_block_numbers', 'submission_closed_block_numbers', 'historical_total_stake',
+                      'challenge_payments', 'challenge_burns', 'challenge_archive_hashes', 'staking_rewards_cursor']
+
+
+def layout_slots(source='contracts/Competition.sol', contract='Competition', solc_version='0.8.17',
+                 packages=Path.home() / '.brownie' / 'packages'):
+    """
+    `{name: slot}` for the names of `SLOTS`, from the storage layout solc reports for `contract`. Dependencies are
+    resolved from the brownie packages folder; the compiler is the one brownie installs with `py-solc-x`.
+    """
+    import solcx
+    output = solcx.compile_files([source], output_values=['storage-layout'], solc_version=solc_version,
+                                 import_remappings=['OpenZeppelin/={}/OpenZeppelin/'.format(packages)],
+                                 allow_paths=[str(packages), str(Path(source).resolve().parents[1])])
+    layout = output['{}:{}'.format(source, contract)]['storage-layout']
+    layout = json.loads(layout) if isinstance(layout, str) else layout
+    slots = {entry['label']: int(entry['slot']) for entry in layout['storage']}
+    return {name: slots[label] for name, label in LABELS.items()}
+
+
+def word(value):
+    return int(value).to_bytes(32, 'big')
+
+
+def mapping_slot(key, slot):
+    """Slot of `mapping[key]` for a mapping at `slot`; `key` is an integer or an address."""
+    key = int(str(key), 16) if isinstance(key, str) or hasattr(key, 'address') else int(key)
+    return int.from_bytes(keccak(word(key) + word(slot)), 'big')
+
+
+def array_slot(slot, index=0):
+    """Slot of element `index` of a dynamic array of one-slot elements at `slot`."""
+    return int.from_bytes(keccak(word(slot)), 'big') + index
+
+
+def to_address(value):
+    return to_checksum_address('0x' + (value & (2 ** 160 - 1)).to_bytes(20, 'big').hex())
+
+
+def to_bytes32(value):
+    return '0x' + word(value).hex()
+
+
+class StorageReader:
+    def __init__(self, web3, address, block=None, batch_size=DEFAULT_BATCH_SIZE,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        """Read the storage of `address` at `block` (default: latest when the reader is created)."""
+        self.web3 = web3
+        self.address = str(address)
+        self.block = web3.eth.block_number if block is None else block
+        self.batch_size = batch_size
+        self.endpoint = getattr(web3.provider, 'endpoint_uri', None)
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def close(self):
+        self.executor.shutdown()
+        self.session.close()
+
+    def read_batch(self, slots):
+        block = hex(self.block)
+        if self.endpoint is None:
+            # Not an HTTP provider: read the slots one by one.
+            return [int(self.web3.provider.make_request('eth_getStorageAt', [self.address, hex(s), block])['result'],
+                        16) for s in slots]
+        payload = [{'jsonrpc': '2.0', 'id': i, 'method': 'eth_getStorageAt', 'params': [self.address, hex(s), block]}
+                   for i, s in enumerate(slots)]
+        response = self.session.post(self.endpoint, json=payload)
+        response.raise_for_status()
+        results = {r['id']: r for r in response.json()}
+        values = []
+        for i in range(len(slots)):
+            if 'error' in results[i]:
+                raise ValueError("Reading slot {} failed: {}".format(hex(slots[i]), results[i]['error']))
+            values.append(int(results[i]['result'], 16))
+        return values
+
+    def read(self, slots):
+        """Return the values of `slots`, as integers, in order."""
+        slots = list(slots)
+        batches = [slots[i:i + self.batch_size] for i in range(0, len(slots), self.batch_size)]
+        values = []
+        for batch_values in self.executor.map(self.read_batch, batches):
+            values += batch_values
+        return values
+
+    def address_set(self, slot):
+        """The addresses of the `EnumerableSet.AddressSet` at `slot`, in set order."""
+        length = self.read([slot])[0]
+        base = array_slot(slot)
+        return [to_address(v) for v in self.read(base + i for i in range(length))]
+
+    def address_set_size(self, slot):
+        return self.read([slot])[0]
+
+
+class CompetitionStorageReader(StorageReader):
+    def scalars(self):
+        names = ['challenge_counter', 'stake_threshold', 'competition_pool', 'rewards_threshold',
+                 'current_total_staked', 'current_staking_rewards_budget', 'burn_recipient', 'burned_amount',
+                 'vault', 'migration_completed']
+        values = dict(zip(names, self.read(SLOTS[name] for name in names)))
+        token_slot = values['challenge_counter']
+        values['token'] = to_address(token_slot)
+        values['challenge_counter'] = (token_slot >> 160) & (2 ** 32 - 1)
+        values['burn_recipient'] = to_address(values['burn_recipient'])
+        vault_slot = values['vault']
+        values['vault'] = to_address(vault_slot)
+        values['initialized'] = (vault_slot >> 160) & 0xff
+        values['migration_completed'] = bool(values['migration_completed'] & 0xff)
+        values['stakers_counter'] = self.address_set_size(SLOTS['staker_set'])
+        return values
+
+    def message(self):
+        value = self.read([SLOTS['message']])[0]
+        if value & 1 == 0:
+            # Short strings are stored in place, with twice their length in the lowest byte.
+            return word(value)[:(value & 0xff) // 2].decode()
+        length = (value - 1) // 2
+        words = self.read(array_slot(SLOTS['message'], i) for i in range((length + 31) // 32))
+        return b''.join(word(w) for w in words)[:length].decode()
+
+    def stakes(self, addresses):
+        return self.read(mapping_slot(a, SLOTS['stakes']) for a in addresses)
+
+    def stakers(self):
+        return self.address_set(SLOTS['staker_set'])
+
+    def challenge_slot(self, challenge_number):
+        return mapping_slot(challenge_number, SLOTS['challenges'])
+
+    def challenge(self, challenge_number):
+        """The hashes and phase of a challenge, with its per-challenge mapping values."""
+        base = self.challenge_slot(challenge_number)
+        fields = list(CHALLENGE_FIELDS)
+        slots = [base + CHALLENGE_FIELDS[f] for f in fields]
+        slots += [mapping_slot(challenge_number, SLOTS[name]) for name in CHALLENGE_MAPPINGS]
+        slots += [base + SUBMITTERS_OFFSET, mapping_slot(challenge_number, SLOTS['historical_staker_set'])]
+        values = self.read(slots)
+        result = {f: to_bytes32(v) for f, v in zip(fields, values)}
+        result['phase'] = values[CHALLENGE_FIELDS['phase']] & 0xff
+        result.update(zip(CHALLENGE_MAPPINGS, values[len(fields):]))
+        result['challenge_archive_hashes'] = to_bytes32(result['challenge_archive_hashes'])
+        result['submission_counter'], result['historical_stakers_counter'] = values[-2:]
+        return result
+
+    def deadlines(self, challenge_number, indices):
+        base = self.challenge_slot(challenge_number) + DEADLINES_OFFSET
+        return self.read(mapping_slot(i, base) for i in indices)
+
+    def submitters(self, challenge_number):
+        return self.address_set(self.challenge_slot(challenge_number) + SUBMITTERS_OFFSET)
+
+    def historical_stakers(self, challenge_number):
+        return self.address_set(mapping_slot(challenge_number, SLOTS['historical_staker_set']))
+
+    def historical_stake_amounts(self, challenge_number, addresses):
+        base = mapping_slot(challenge_number, SLOTS['historical_stake_amounts'])
+        return self.read(mapping_slot(a, base) for a in addresses)
+
+    def information(self, challenge_number, addresses, fields=tuple(INFORMATION_FIELDS)):
+        """`{field: [value per address]}` of the `Information` of each address; submissions as hex strings."""
+        info_base = self.challenge_slot(challenge_number) + SUBMITTER_INFO_OFFSET
+        bases = [mapping_slot(a, info_base) for a in addresses]
+        values = self.read(base + INFORMATION_FIELDS[f] for base in bases for f in fields)
+        result = {f: values[i::len(fields)] for i, f in enumerate(fields)}
+        if 'submission' in result:
+            result['submission'] = [to_bytes32(v) for v in result['submission']]
+        return result
+
+    def information_items(self, challenge_number, addresses, item_number):
+        info_base = self.challenge_slot(challenge_number) + SUBMITTER_INFO_OFFSET
+        return self.read(mapping_slot(item_number, mapping_slot(a, info_base) + INFO_OFFSET) for a in addresses)
+
+    def export(self, challenge_numbers=None):
+        """
+        The full state: scalars, the stakes of the staker set and, for each challenge (default: all of them), its
+        fields, the stakes snapshot and the `Information` of its submitters and historical stakers.
+        """
+        state = self.scalars()
+        state['block'] = self.block
+        state['message'] = self.message()
+        stakers = self.stakers()
+        state['stakes'] = dict(zip(stakers, self.stakes(stakers)))
+        if challenge_numbers is None:
+            challenge_numbers = range(1, state['challenge_counter'] + 1)
+        state['challenges'] = {}
+        for challenge_number in challenge_numbers:
+            challenge = self.challenge(challenge_number)
+            historical_stakers = self.historical_stakers(challenge_number)
+            challenge['historical_stakes'] = dict(zip(historical_stakers,
+                                                      self.historical_stake_amounts(challenge_number,
+                                                                                    historical_stakers)))
+            submitters = self.submitters(challenge_number)
+            participants = list(dict.fromkeys(submitters + historical_stakers))
+            information = self.information(challenge_number, participants)
+            challenge['submitters'] = submitters
+            challenge['information'] = {p: {f: information[f][i] for f in information}
+                                        for i, p in enumerate(participants)}
+            state['challenges'][challenge_number] = challenge
+        return state
@@ -0,0 +1,166 @@
+"""
+Pipelined sending of admin transactions.
+
+Nonces are assigned locally, so up to `max_in_flight` transactions from the same sender can be pending at once
+instead of waiting for each receipt before sending the next. Receipts are collected by polling. A transaction
+that disappears from the pool before its nonce is used, or that stays pending for longer than `replace_after`
+seconds, is sent again with the same nonce and a higher gas price.
+
+Transactions from one sender are mined in nonce order, but a later call still runs if an earlier one reverts.
+Calls that depend on the outcome of earlier ones (e.g. advancing the phase after paying rewards) are sent after
+`barrier()`, which waits for every pending receipt and raises if any transaction failed.
+
+    pipeline = TxPipeline(web3, admin)
+    for chunk in chunks:
+        pipeline.submit(competition.payRewards, chunk)
+    pipeline.barrier()
+    pipeline.submit(competition.advanceToPhase, [4])
+    pipeline.barrier()
+"""
+import time
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+DEFAULT_GAS_PRICE_BUMP = 1.125  # nodes only accept a replacement priced at least 10% higher
+
+
+class PipelineError(Exception):
+    def __init__(self, failed_jobs):
+        self.failed_jobs = failed_jobs
+        super().__init__('{} transaction(s) failed, starting with nonce {}.'.format(
+            len(failed_jobs), failed_jobs[0].nonce))
+
+
+class Job:
+    def __init__(self, nonce, tx, label=None):
+        self.nonce = nonce
+        self.tx = tx
+        self.label = label
+        self.tx_hashes = []
+        self.sent_at = None
+        self.receipt = None
+
+    @property
+    def done(self):
+        return self.receipt is not None
+
+    @property
+    def failed(self):
+        return self.receipt is not None and self.receipt['status'] == 0
+
+
+class TxPipeline:
+    def __init__(self, web3, sender, max_in_flight=16, gas_price=None, gas_price_bump=DEFAULT_GAS_PRICE_BUMP,
+                 replace_after=120, poll_interval=0.5, wait_fn=None):
+        """
+        `sender` is a brownie account, or any object with an `address` (and a `private_key` if the node does
+        not hold the key). `wait_fn` is called between polls and defaults to sleeping for `poll_interval`.
+        """
+        self.web3 = web3
+        self.sender = sender
+        self.address = Web3.toChecksumAddress(str(sender.address))
+        self.max_in_flight = max_in_flight
+        self.gas_price = gas_price
+        self.gas_price_bump = gas_price_bump
+        self.replace_after = replace_after
+        self.wait_fn = wait_fn if wait_fn is not None else lambda: time.sleep(poll_interval)
+
+        self.next_nonce = web3.eth.get_transaction_count(self.address, 'pending')
+        self.jobs = []
+        self.in_flight = []
+        self._barrier_index = 0
+
+    def submit(self, fn, args, gas_limit=None, label=None):
+        """
+        Send `fn(*args)`, where `fn` is a brownie contract function, and return its `Job` without waiting for
+        the receipt. The gas limit is estimated against the latest block unless given. If the node rejects the
+        transaction, the error is raised and its nonce is used by the next submission.
+        """
+        while len(self.in_flight) >= self.max_in_flight:
+            self.wait_fn()
+            self.poll()
+        tx = {
+            'from': self.address,
+            'to': Web3.toChecksumAddress(str(fn._address)),
+            'data': fn.encode_input(*args),
+            'value': 0,
+        }
+        tx['gas'] = gas_limit if gas_limit is not None else self.web3.eth.estimate_gas(tx)
+        tx['gasPrice'] = self.gas_price if self.gas_price is not None else self.web3.eth.gas_price
+        job = Job(self.next_nonce, dict(tx, nonce=self.next_nonce), label)
+        # The nonce is only used once the node accepted the transaction; a rejected send leaves no gap.
+        self._send(job)
+        self.next_nonce += 1
+        self.jobs.append(job)
+        self.in_flight.append(job)
+        return job
+
+    def _send(self, job):
+        if hasattr(self.sender, 'private_key'):
+            signed = self.web3.eth.account.sign_transaction(dict(job.tx, chainId=self.web3.eth.chain_id),
+                                                            self.sender.private_key)
+            tx_hash = self.web3.eth.send_raw_transaction(signed.rawTransaction)
+        else:
+            tx_hash = self.web3.eth.send_transaction(job.tx)
+        job.tx_hashes.append(tx_hash)
+        job.sent_at = time.time()
+
+    def _replace(self, job):
+        job.tx = dict(job.tx, gasPrice=max(int(job.tx['gasPrice'] * self.gas_price_bump), job.tx['gasPrice'] + 1))
+        try:
+            self._send(job)
+        except ValueError:
+            # Already mined or already known to the node; the receipt check picks it up.
+            pass
+
+    def _get_receipt(self, job):
+        for tx_hash in reversed(job.tx_hashes):
+            try:
+                receipt = self.web3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+            if receipt is not None:
+                return receipt
+        return None
+
+    def _is_known(self, job):
+        for tx_hash in job.tx_hashes:
+            try:
+                if self.web3.eth.get_transaction(tx_hash) is not None:
+                    return True
+            except TransactionNotFound:
+                pass
+        return False
+
+    def poll(self):
+        """Collect available receipts and resend dropped or stuck transactions. Returns the jobs still pending."""
+        mined_nonce = None
+        still_in_flight = []
+        for job in self.in_flight:
+            job.receipt = self._get_receipt(job)
+            if job.done:
+                continue
+            still_in_flight.append(job)
+            if mined_nonce is None:
+                mined_nonce = self.web3.eth.get_transaction_count(self.address, 'latest')
+            if job.nonce < mined_nonce:
+                # The nonce is used, so one of the sent versions is mined; its receipt shows up on a later poll.
+                continue
+            if not self._is_known(job) or time.time() - job.sent_at > self.replace_after:
+                self._replace(job)
+        self.in_flight = still_in_flight
+        return self.in_flight
+
+    def barrier(self):
+        """
+        Wait for all sent transactions and return the receipts of those sent since the previous barrier.
+        Raises `PipelineError` if any of them failed.
+        """
+        while len(self.poll()) > 0:
+            self.wait_fn()
+        jobs = self.jobs[self._barrier_index:]
+        self._barrier_index = len(self.jobs)
+        failed = [job for job in jobs if job.failed]
+        if len(failed) > 0:
+            raise PipelineError(failed)
+        return [job.receipt for job in jobs]
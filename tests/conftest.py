@@ -0,0 +1,153 @@
+import json
+import pytest
+from brownie.network.state import TxHistory
+from brownie.project import get_loaded_projects
+from brownie.test import output
+from instrumentation import instrumentation, profile, Profile
+from worlds import WorldCache
+from competition_flow import CompetitionFlow
+
+# Parallel runs (`brownie test -n <workers>`): brownie starts one local chain per worker, on the configured port
+# plus the worker number, and only distributes tests that are isolated per module, so parallel runs apply
+# `module_isolation` to every module. Each worker deploys its own worlds, again after each module's reset. Test
+# classes are sharded across workers, and the gas profiles of the workers are merged into one report on the master.
+
+GAS_PROFILE_GLOB = 'gas-profile-*.json'
+INSTRUMENTATION_GLOB = 'instrumentation-*.json'
+INSTRUMENTATION_TRACE = 'instrumentation.json'
+INSTRUMENTATION_ROWS = 25
+
+
+class XdistIsolation:
+    # Registered for parallel runs only: modules that share a worker's chain each start from a reset chain.
+    @pytest.fixture(scope="module", autouse=True)
+    def isolation(self, module_isolation):
+        pass
+
+
+def pytest_configure(config):
+    if _is_worker(config) or config.getoption('numprocesses', None):
+        config.pluginmanager.register(XdistIsolation(), 'xdist-isolation')
+
+
+def register_token_proxy(world):
+    # The token is reached through its proxy, which is not a deployment of the project's `ChildToken`.
+    if 'proxy_admin' in world:
+        instrumentation.register(world['token'], 'ChildToken')
+
+
+@pytest.fixture(scope="session")
+def world_cache():
+    # Worlds are deployed once per session and kept in the chain snapshot, see `WorldCache`.
+    return WorldCache(on_build=register_token_proxy)
+
+
+@pytest.fixture
+def worlds(world_cache):
+    # A test using the worlds starts from the snapshot holding them and is reverted to it when it ends.
+    world_cache.begin()
+    yield world_cache
+    world_cache.end()
+
+
+@pytest.fixture
+def world(worlds):
+    return worlds.get('competition')
+
+
+@pytest.fixture
+def flow(world, worlds):
+    # The competition scenarios on the deployed world, for the tests of the off-chain tools in their own modules.
+    flow = CompetitionFlow()
+    flow.setup_world(world, worlds)
+    return flow
+
+
+@pytest.fixture(autouse=True)
+def instrumented(request):
+    # Every write through `execute_fn` and every view call is profiled, grouped under the running test.
+    instrumentation.install()
+    with instrumentation.phase(request.node.name):
+        yield
+
+
+@pytest.hookimpl(optionalhook=True, tryfirst=True)
+def pytest_xdist_make_scheduler(config, log):
+    # Group by test class rather than by file, so that the classes of one module can run on different workers.
+    from xdist.scheduler import LoadScopeScheduling
+    return LoadScopeScheduling(config, log)
+
+
+def _build_path():
+    return get_loaded_projects()[0]._build_path
+
+
+def _is_worker(config):
+    return hasattr(config, 'workerinput')
+
+
+def pytest_sessionfinish(session):
+    if _is_worker(session.config):
+        profile.dump(_build_path().joinpath('instrumentation-{}.json'.format(session.config.workerinput['workerid'])))
+    if not _is_worker(session.config) or not session.config.getoption('--gas'):
+        return
+    path = _build_path().joinpath('gas-profile-{}.json'.format(session.config.workerinput['workerid']))
+    with path.open('w') as f:
+        json.dump(TxHistory().gas_profile, f)
+
+
+def merge_gas_profiles(profiles):
+    """Merge brownie gas profiles, as kept by `TxHistory().gas_profile`, weighting averages by call count."""
+    merged = {}
+    for profile in profiles:
+        for name, values in profile.items():
+            if name not in merged:
+                merged[name] = dict(values)
+                continue
+            gas = merged[name]
+            count, count_success = gas['count'] + values['count'], gas['count_success'] + values['count_success']
+            gas['avg'] = (gas['avg'] * gas['count'] + values['avg'] * values['count']) // count
+            if count_success > 0:
+                gas['avg_success'] = (gas['avg_success'] * gas['count_success'] +
+                                      values['avg_success'] * values['count_success']) // count_success
+            gas['high'] = max(gas['high'], values['high'])
+            gas['low'] = min(gas['low'], values['low'])
+            gas['count'], gas['count_success'] = count, count_success
+    return merged
+
+
+def write_instrumentation(terminalreporter, config):
+    # The master merges the profiles of the workers; a run without workers has its own.
+    merged = profile
+    if config.getoption('numprocesses', None):
+        merged = Profile()
+        for path in sorted(_build_path().glob(INSTRUMENTATION_GLOB)):
+            with path.open() as f:
+                merged.merge(json.load(f))
+            path.unlink()
+    path = _build_path().joinpath(INSTRUMENTATION_TRACE)
+    merged.dump(path)
+    terminalreporter.section('Instrumentation')
+    for by in ['functions', 'phases']:
+        for line in merged.table(by, INSTRUMENTATION_ROWS):
+            terminalreporter.write_line(line)
+        terminalreporter.write_line('')
+    terminalreporter.write_line('Trace written to {}'.format(path))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if _is_worker(config):
+        return
+    write_instrumentation(terminalreporter, config)
+    if not config.getoption('numprocesses', None) or not config.getoption('--gas'):
+        return
+    profiles = []
+    for path in sorted(_build_path().glob(GAS_PROFILE_GLOB)):
+        with path.open() as f:
+            profiles.append(json.load(f))
+        path.unlink()
+    # The master runs no transactions itself; the merged profile is printed with brownie's own formatting.
+    TxHistory().gas_profile.update(merge_gas_profiles(profiles))
+    terminalreporter.section('Gas Profile (all workers)')
+    for line in output._build_gas_profile_output():
+        terminalreporter.write_line(line)
@@ -0,0 +1,176 @@
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from brownie import history as tx_history, web3
+from brownie.project import get_loaded_projects
+from eth_utils import to_checksum_address
+
+
+class Instrumentation:
+    """
+    Measurements of the writes and reads the tests make.
+
+    Writes are measured around `execute_fn`: the transactions it sent (one directly, several through the
+    multisig), their gas and calldata, the RPC requests made and the wall time. Reads are measured as they reach
+    the provider: every `eth_call` is attributed to the contract function it calls, for the deployments of the
+    loaded projects and the contracts passed to `register()`. Each measurement is a record handed to every hook; the
+    phase of a record is the innermost `phase()` in effect, by default the test name.
+    """
+    def __init__(self):
+        self.hooks = []
+        self.phases = []
+        self.rpc_count = 0
+        self.registered = {}
+        self._installed = None
+
+    def register(self, contract, name):
+        """Attribute calls to `contract`, e.g. one created with `Contract.from_abi`, to the functions of `name`."""
+        self.registered[str(contract.address)] = (name, contract)
+
+    def find_contract(self, address):
+        """`(name, contract)` of the contract at `address`, or `None` if it is not known."""
+        address = to_checksum_address(address)
+        if address in self.registered:
+            return self.registered[address]
+        # Deployments are looked up on every call, as reverting the chain removes them from their containers.
+        for project in get_loaded_projects():
+            for name, container in project.dict().items():
+                for contract in container:
+                    if contract.address == address:
+                        return name, contract
+        return None
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def emit(self, record):
+        for hook in self.hooks:
+            hook(record)
+
+    @property
+    def current_phase(self):
+        return self.phases[-1] if self.phases else None
+
+    @contextmanager
+    def phase(self, name):
+        self.phases.append(name)
+        try:
+            yield
+        finally:
+            self.phases.pop()
+
+    def install(self):
+        # The middleware stays on the web3 instance; it is added again only if brownie replaced the instance.
+        if self._installed is web3:
+            return
+        web3.middleware_onion.add(self.middleware, name='instrumentation')
+        self._installed = web3
+
+    def middleware(self, make_request, w3):
+        def request(method, params):
+            self.rpc_count += 1
+            if method != 'eth_call' or not params:
+                return make_request(method, params)
+            start = time.perf_counter()
+            response = make_request(method, params)
+            self.emit(self.call_record(params[0], time.perf_counter() - start))
+            return response
+        return request
+
+    def call_record(self, call, wall_time):
+        data = call.get('data', '0x') or '0x'
+        found = self.find_contract(call['to']) if call.get('to') else None
+        name = found[1].get_method(data) if found is not None else None
+        function = '{}.{}'.format(found[0], name) if name else 'eth_call'
+        return {'kind': 'call', 'function': function, 'path': 'view', 'phase': self.current_phase, 'txs': 0,
+                'gas_used': 0, 'calldata_bytes': (len(data) - 2) // 2, 'rpc_count': 1, 'wall_time': wall_time,
+                'reverted': False}
+
+    @contextmanager
+    def transaction(self, fn, path):
+        """
+        Measure the transactions sent for the contract function `fn`, on `path` ('direct' or 'multisig'). The write
+        reverted if its last transaction did, or, through the multisig, if the multisig failed to execute it.
+        """
+        self.install()
+        first_tx = len(tx_history)
+        rpc_count = self.rpc_count
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start
+            txs = tx_history[first_tx:]
+            reverted = bool(txs) and (txs[-1].status == 0 or 'ExecutionFailure' in txs[-1].events)
+            self.emit({'kind': 'tx', 'function': fn._name, 'path': path, 'phase': self.current_phase,
+                       'txs': len(txs), 'gas_used': sum(tx.gas_used or 0 for tx in txs),
+                       'calldata_bytes': sum((len(tx.input) - 2) // 2 for tx in txs),
+                       'rpc_count': self.rpc_count - rpc_count, 'wall_time': wall_time, 'reverted': reverted})
+
+
+COLUMNS = ['count', 'reverted', 'txs', 'gas_used', 'calldata_bytes', 'rpc_count', 'wall_time']
+MAX_TRACE = 100_000
+
+
+class Profile:
+    """
+    Hook that keeps the trace of the latest `max_trace` writes and aggregates every record per function and path,
+    and per phase.
+    """
+    def __init__(self, max_trace=MAX_TRACE):
+        self.trace = deque(maxlen=max_trace)
+        self.functions = {}
+        self.phases = {}
+
+    def __call__(self, record):
+        if record['kind'] == 'tx':
+            self.trace.append(record)
+        for table, key in [(self.functions, (record['kind'], record['function'], record['path'])),
+                           (self.phases, (record['kind'], record['phase'] or '', ''))]:
+            row = table.setdefault(key, dict.fromkeys(COLUMNS, 0))
+            row['count'] += 1
+            row['reverted'] += int(record['reverted'])
+            for column in COLUMNS[2:]:
+                row[column] += record[column]
+
+    def merge(self, data):
+        """Add the `to_json()` output of another profile, e.g. of another worker."""
+        self.trace.extend(data['trace'])
+        for table, rows in [(self.functions, data['functions']), (self.phases, data['phases'])]:
+            for row in rows:
+                key = (row['kind'], row['name'], row['path'])
+                total = table.setdefault(key, dict.fromkeys(COLUMNS, 0))
+                for column in COLUMNS:
+                    total[column] += row[column]
+
+    def to_json(self):
+        def rows(table):
+            return [dict(kind=k[0], name=k[1], path=k[2], **row) for k, row in sorted(table.items())]
+        return {'trace': list(self.trace), 'functions': rows(self.functions), 'phases': rows(self.phases)}
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_json(), f, indent=1)
+
+    def table(self, by='functions', limit=None):
+        """Lines of a table of the aggregated records, the most gas first, then the most wall time."""
+        table = self.functions if by == 'functions' else self.phases
+        keys = sorted(table, key=lambda k: (-table[k]['gas_used'], -table[k]['wall_time']))[:limit]
+        header = '{:<4} {:<50} {:<8} {:>7} {:>5} {:>12} {:>10} {:>10} {:>8} {:>9}'.format(
+            'kind', 'function' if by == 'functions' else 'phase', 'path', 'count', 'revs', 'avg gas', 'avg data',
+            'avg rpc', 'avg ms', 'total s')
+        lines = [header, '-' * len(header)]
+        for key in keys:
+            row = table[key]
+            count = row['count']
+            lines.append('{:<4} {:<50} {:<8} {:>7} {:>5} {:>12} {:>10} {:>10.1f} {:>8.2f} {:>9.2f}'.format(
+                key[0], key[1][-50:], key[2], count, row['reverted'], row['gas_used'] // count,
+                row['calldata_bytes'] // count, row['rpc_count'] / count, 1000 * row['wall_time'] / count,
+                row['wall_time']))
+        return lines
+
+
+instrumentation = Instrumentation()
+profile = Profile()
+instrumentation.add_hook(profile)
@@ -1,11 +1,13 @@
 from utils_for_testing import *
-from brownie import Token, Competition, reverts, accounts
+from brownie import Token, Competition, reverts
+from scripts.population import development_accounts
 
 class TestAccessControl:
 
     def setup(self):
-        self.admin = accounts[0]
-        self.participants = accounts[1:]
+        dev_accounts = development_accounts()
+        self.admin = dev_accounts[0]
+        self.participants = dev_accounts[1:]
         self.token = Token.deploy({'from': self.admin})
         self.token.initialize("RockCap Token", "RCP", int(Decimal('100000000e6')), self.admin, {'from': self.admin})
         self.competition = Competition.deploy({'from': self.admin})
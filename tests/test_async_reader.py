@@ -0,0 +1,31 @@
+from utils_for_testing import *
+from brownie import web3
+from scripts.async_reader import AsyncPagedReader
+
+
+class TestAsyncReader:
+    def test_async_reader(self, flow):
+        participants = flow.participants
+        challenge_number = flow.challenge_in_phase_3(len(participants))
+        reader = AsyncPagedReader(web3, page_size=2, max_concurrency=3)
+        try:
+            verify(list(flow.competition.getAllStakers()), reader.run(reader.collect(reader.stakers(flow.competition))))
+            verify(list(flow.competition.getSubmitters(challenge_number, 0,
+                                                       flow.competition.getSubmissionCounter(challenge_number))),
+                   reader.run(reader.collect(reader.submitters(flow.competition, challenge_number))))
+            historical_stakers, historical_amounts = flow.get_historical_stakers_and_amounts(challenge_number)
+            verify(historical_stakers,
+                   reader.run(reader.collect(reader.historical_stakers(flow.competition, challenge_number))))
+            verify(list(zip(historical_stakers, historical_amounts)),
+                   reader.run(reader.collect(reader.historical_stakes(flow.competition, challenge_number))))
+
+            # Reads are pinned to a block.
+            block = web3.eth.block_number
+            shareholders = list(flow.token.getShareHolders(0, flow.token.numberOfShareHolders()))
+            new_holder = "0x" + (7654321).to_bytes(20, "big").hex()
+            flow.execute_fn(flow.token, flow.token.transfer, [new_holder, 1, {'from': flow.admin}],
+                            flow.use_multi_admin, exp_revert=False)
+            verify(shareholders, reader.run(reader.collect(reader.shareholders(flow.token, block))))
+            verify(len(shareholders) + 1, len(reader.run(reader.collect(reader.shareholders(flow.token)))))
+        finally:
+            reader.close()
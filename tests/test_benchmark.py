@@ -0,0 +1,25 @@
+from utils_for_testing import *
+import json
+from scripts.benchmark import run_benchmark, compare_to_baseline
+
+OPERATIONS = ['recordStakes', 'updateChallengeAndTournamentScores', 'payRewards', 'burn',
+              'getHistoricalStakeAmounts', 'getAllSubmitters']
+
+
+class TestBenchmark:
+    def test_benchmark(self):
+        report = run_benchmark([10])
+        results = report['results']['10']
+        verify(set(OPERATIONS), set(results.keys()))
+        for name in OPERATIONS:
+            verify(10, results[name]['elements'])
+            assert results[name]['gas_per_element'] > 0
+            assert results[name]['max_chunk'] is None or results[name]['max_chunk'] >= 10
+        verify(1, results['payRewards']['calls'])
+
+        verify([], compare_to_baseline(report, report))
+        baseline = json.loads(json.dumps(report))
+        for result in baseline['results']['10'].values():
+            result['gas_per_element'] /= 2
+        verify(len(OPERATIONS), len(compare_to_baseline(report, baseline)))
+        verify([], compare_to_baseline(report, {'results': {}}))
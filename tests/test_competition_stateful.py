@@ -0,0 +1,209 @@
+from utils_for_testing import *
+from brownie import Token, Competition, reverts
+from brownie.test import strategy
+from scripts.competition_model import CompetitionModel, ModelRevert, ZERO_HASH
+from scripts.population import development_accounts
+
+NUM_PARTICIPANTS = 8
+AIRDROP = int(Decimal('1000e6'))
+STAKE_THRESHOLD = int(Decimal('10e6'))
+REWARDS_THRESHOLD = int(Decimal('10e6'))
+
+
+class CompetitionStateMachine:
+    """
+    Random sequences of participant and admin transactions, each checked against `CompetitionModel`: the contracts
+    must revert exactly when the model does, with the same reason, and agree with the model after every step.
+    """
+    st_participant = strategy('uint8', max_value=NUM_PARTICIPANTS - 1)
+    st_stake = strategy('uint256', max_value=AIRDROP * 5 // 4)
+    st_sponsor = strategy('uint256', max_value=AIRDROP * 10)
+    st_reward = strategy('uint256', max_value=AIRDROP // 10)
+    st_burn = strategy('uint256', max_value=AIRDROP)
+    st_bps = strategy('uint16', max_value=12000)
+    st_phase = strategy('uint8', max_value=5)
+    st_index = strategy('uint8', max_value=NUM_PARTICIPANTS + 1)
+
+    def __init__(cls, token, competition, admin, participants, burn_recipient):
+        cls.token = token
+        cls.competition = competition
+        cls.admin = admin
+        cls.participants = participants
+        cls.burn_recipient = burn_recipient
+        cls.initial_balances = {a.address: token.balanceOf(a) for a in [admin] + participants}
+
+    def setup(self):
+        self.model = CompetitionModel(STAKE_THRESHOLD, REWARDS_THRESHOLD, self.initial_balances,
+                                      self.burn_recipient.address)
+        self.touched = set()
+
+    def execute(self, model_fn, model_args, contract_fn, contract_args, sender, touched=()):
+        # Apply the transaction to the model first; if the model reverts, the contracts must revert the same way.
+        self.touched.update(touched)
+        try:
+            model_fn(*model_args)
+        except ModelRevert as e:
+            with reverts(e.reason):
+                contract_fn(*contract_args, {'from': sender})
+            return
+        contract_fn(*contract_args, {'from': sender})
+
+    """
+    PARTICIPANT RULES
+    """
+
+    def rule_stake(self, st_participant, st_stake):
+        p = self.participants[st_participant]
+        self.execute(self.model.increase_stake, [p.address, st_stake],
+                     self.token.increaseStake, [self.competition, st_stake], p, [p.address])
+
+    def rule_unstake(self, st_participant, st_stake):
+        p = self.participants[st_participant]
+        self.execute(self.model.decrease_stake, [p.address, st_stake],
+                     self.token.decreaseStake, [self.competition, st_stake], p, [p.address])
+
+    def rule_submit(self, st_participant, st_stake):
+        p = self.participants[st_participant]
+        submission_hash = bytes.fromhex(getHash())
+        self.execute(self.model.stake_and_submit, [p.address, st_stake, submission_hash],
+                     self.token.stakeAndSubmit, [self.competition, st_stake, submission_hash], p, [p.address])
+
+    def rule_withdraw(self, st_participant):
+        p = self.participants[st_participant]
+        self.execute(self.model.stake_and_submit, [p.address, 0, ZERO_HASH],
+                     self.token.stakeAndSubmit, [self.competition, 0, ZERO_HASH], p, [p.address])
+
+    def rule_transfer(self, st_participant, amount='st_reward'):
+        p = self.participants[st_participant]
+        self.execute(self.model.transfer, [p.address, amount],
+                     self.token.transfer, [self.competition, amount], p, [p.address])
+
+    """
+    ADMIN RULES
+    """
+
+    def rule_sponsor(self, amount='st_sponsor'):
+        self.token.approve(self.competition, amount, {'from': self.admin})
+        self.execute(self.model.sponsor, [self.admin.address, amount],
+                     self.competition.sponsor, [amount], self.admin, [self.admin.address])
+
+    def rule_open_challenge(self):
+        self.execute(self.model.open_challenge, [],
+                     self.competition.openChallenge, [getHash(), getHash(), getTimestamp(), getTimestamp()],
+                     self.admin)
+
+    def rule_close_submission(self):
+        self.execute(self.model.close_submission, [], self.competition.closeSubmission, [], self.admin)
+
+    def rule_record_stakes(self, start='st_index', end='st_index'):
+        self.execute(self.model.record_stakes, [start, end],
+                     self.competition.recordStakes, [start, end], self.admin)
+
+    def rule_record_all_stakes(self):
+        end = len(self.model.staker_set)
+        self.execute(self.model.record_stakes, [0, end], self.competition.recordStakes, [0, end], self.admin)
+
+    def rule_pay_rewards(self, st_participant, staking='st_reward', challenge='st_reward', tournament='st_reward'):
+        p = self.participants[st_participant]
+        self.execute(self.model.pay_rewards, [[p.address], [staking], [challenge], [tournament]],
+                     self.competition.payRewards, [[p], [staking], [challenge], [tournament]], self.admin,
+                     [p.address])
+
+    def rule_pay_staking_rewards_pro_rata(self, budget='st_reward'):
+        challenge_number = self.model.challenge_counter
+        start = self.model.staking_rewards_cursor.get(challenge_number, 0)
+        end = len(self.model.get_historical_stakers(challenge_number))
+        budget = self.model.staking_rewards_budget if start > 0 else budget
+        self.execute(self.model.pay_staking_rewards_pro_rata, [budget, start, end],
+                     self.competition.payStakingRewardsProRata, [budget, start, end], self.admin,
+                     self.model.get_historical_stakers(challenge_number).values())
+
+    def rule_pay_staking_rewards_pro_rata_chunk(self, budget='st_reward'):
+        # One staker at a time, so that stakes can be recorded while the payout is under way.
+        challenge_number = self.model.challenge_counter
+        start = self.model.staking_rewards_cursor.get(challenge_number, 0)
+        budget = self.model.staking_rewards_budget if start > 0 else budget
+        stakers = self.model.get_historical_stakers(challenge_number)
+        paid = [stakers.at(start)] if start < len(stakers) else []
+        self.execute(self.model.pay_staking_rewards_pro_rata, [budget, start, start + 1],
+                     self.competition.payStakingRewardsProRata, [budget, start, start + 1], self.admin, paid)
+
+    def rule_burn(self, st_participant, amount='st_burn'):
+        p = self.participants[st_participant]
+        self.execute(self.model.burn, [[p.address], [amount]],
+                     self.competition.burn, [[p], [amount]], self.admin, [p.address])
+
+    def rule_burn_bps(self, st_participant, st_bps):
+        p = self.participants[st_participant]
+        self.execute(self.model.burn_bps, [[p.address], [st_bps]],
+                     self.competition.burnBps, [[p], [st_bps]], self.admin, [p.address])
+
+    def rule_burn_uniform_bps(self, st_participant, st_bps):
+        # The same participant twice: the second burn applies to the stake left after the first.
+        p, q = self.participants[st_participant], self.participants[(st_participant + 1) % len(self.participants)]
+        self.execute(self.model.burn_uniform_bps, [[p.address, q.address, p.address], st_bps],
+                     self.competition.burnUniformBps, [[p, q, p], st_bps], self.admin, [p.address, q.address])
+
+    def rule_advance(self, st_phase):
+        self.execute(self.model.advance_to_phase, [st_phase], self.competition.advanceToPhase, [st_phase], self.admin)
+
+    def rule_retreat(self, st_phase):
+        self.execute(self.model.retreat_to_phase, [st_phase], self.competition.retreatToPhase, [st_phase], self.admin)
+
+    def rule_move_remainder_to_pool(self):
+        self.execute(self.model.move_remainder_to_pool, [], self.competition.moveRemainderToPool, [], self.admin)
+
+    def rule_move_burned_to_pool(self, amount='st_burn'):
+        self.execute(self.model.move_burned_to_pool, [amount],
+                     self.competition.moveBurnedToPool, [amount], self.admin)
+
+    def rule_move_burned_out(self, amount='st_burn'):
+        self.execute(self.model.move_burned_out, [amount],
+                     self.competition.moveBurnedOut, [amount], self.admin, [self.burn_recipient.address])
+
+    """
+    INVARIANTS
+    """
+
+    def invariant_model(self):
+        # In memory only, so it costs nothing per step.
+        self.model.check_invariants()
+
+    def invariant_competition(self):
+        model = self.model
+        verify(model.total_staked, self.competition.getCurrentTotalStaked())
+        verify(model.competition_pool, self.competition.getCompetitionPool())
+        verify(model.burned_amount, self.competition.getTotalBurnedAmount())
+        verify(model.balance, self.token.balanceOf(self.competition))
+        verify(model.remainder, self.competition.getRemainder())
+        verify(model.challenge_counter, self.competition.getLatestChallengeNumber())
+        verify(model.phase, self.competition.getPhase(model.challenge_counter))
+        verify(model.staker_set.values(), list(self.competition.getStakers(0, len(model.staker_set))))
+
+        # Per-account state is only compared for the accounts the last step could have changed.
+        for address in self.touched:
+            verify(model.get_stake(address), self.competition.getStake(address))
+            verify(model.balances[address], self.token.balanceOf(address))
+        self.touched.clear()
+
+
+class TestCompetitionStateful:
+    def setup(self):
+        dev_accounts = development_accounts()
+        self.admin = dev_accounts[0]
+        self.participants = dev_accounts[1:NUM_PARTICIPANTS + 1]
+        self.burn_recipient = dev_accounts[NUM_PARTICIPANTS + 1]
+
+        self.token = Token.deploy({'from': self.admin})
+        self.token.initialize("RockCap Token", "RCP", int(Decimal('100000000e6')), self.admin, {'from': self.admin})
+        self.competition = Competition.deploy({'from': self.admin})
+        self.competition.initialize(STAKE_THRESHOLD, REWARDS_THRESHOLD, self.token, {'from': self.admin})
+        self.token.authorizeCompetition(self.competition, "Stateful", {'from': self.admin})
+        self.competition.updateBurnRecipient(self.burn_recipient, {'from': self.admin})
+        for p in self.participants:
+            self.token.transfer(p, AIRDROP, {'from': self.admin})
+
+    def test_competition_state_machine(self, state_machine):
+        # Step count and number of runs are set under `hypothesis` in brownie-config.yaml.
+        state_machine(CompetitionStateMachine, self.token, self.competition, self.admin, self.participants,
+                      self.burn_recipient)
@@ -0,0 +1,166 @@
+from utils_for_testing import *
+import pytest
+from brownie import accounts, chain, web3
+from scripts.indexer import IndexStore, EventIndexer
+
+
+class TestIndexer:
+    @pytest.fixture(autouse=True)
+    def setup(self, flow):
+        # Drive the contracts with the existing competition flow, over fewer rounds.
+        self.flow = flow
+        self.flow.num_rounds = 2
+        self.flow.challenge_list = list(range(1, self.flow.num_rounds + 1))
+        self.competition = self.flow.competition
+        self.token = self.flow.token
+        self.admin = self.flow.admin
+
+    def verify_challenge(self, store, challenge_number):
+        competition = self.competition
+        historical_stakers, historical_amounts = self.flow.get_historical_stakers_and_amounts(challenge_number)
+        recorded_stakes = store.get_recorded_stakes(challenge_number)
+        for staker, amount in zip(historical_stakers, historical_amounts):
+            verify(amount, recorded_stakes.get(staker, 0))
+
+        submitters = competition.getSubmitters(challenge_number, 0, competition.getSubmissionCounter(challenge_number))
+        submissions = store.get_submissions(challenge_number)
+        verify(set(submitters), set(submissions.keys()))
+        for submitter in submitters:
+            verify(competition.getSubmission(challenge_number, submitter).hex(), submissions[submitter][2:])
+
+        rewards = store.get_rewards(challenge_number)
+        burns = store.get_burns(challenge_number)
+        for participant in set(historical_stakers) | set(submitters):
+            staking, challenge, tournament = rewards.get(participant, (0, 0, 0))
+            verify(competition.getStakingRewards(challenge_number, participant), staking)
+            verify(competition.getChallengeRewards(challenge_number, participant), challenge)
+            verify(competition.getTournamentRewards(challenge_number, participant), tournament)
+            verify(competition.getBurnedAmount(challenge_number, participant), burns.get(participant, 0))
+
+        totals = store.get_reward_totals(challenge_number)
+        verify(sum(r[0] for r in rewards.values()), totals[0])
+        verify(sum(r[1] for r in rewards.values()), totals[1])
+        verify(sum(r[2] for r in rewards.values()), totals[2])
+
+    def test_index_full_run(self):
+        start_block = web3.eth.block_number
+        self.flow.full_run()
+
+        # Index in two passes to exercise resuming from the stored cursor.
+        store = IndexStore()
+        indexer = EventIndexer(web3, self.competition, store, batch_size=50, start_block=start_block)
+        middle_block = (start_block + web3.eth.block_number) // 2
+        verify(middle_block, indexer.sync(middle_block))
+        verify(web3.eth.block_number, indexer.sync())
+        verify(web3.eth.block_number, indexer.sync())
+
+        challenges = store.get_challenges()
+        verify(list(range(1, self.competition.getLatestChallengeNumber() + 1)), sorted(challenges.keys()))
+        for challenge_number in challenges:
+            verify(self.competition.challengeOpenedBlockNumbers(challenge_number), challenges[challenge_number][0])
+            verify(self.competition.submissionClosedBlockNumbers(challenge_number), challenges[challenge_number][1])
+            self.verify_challenge(store, challenge_number)
+
+        stakes = store.get_stakes()
+        for participant in self.flow.participants:
+            verify(self.competition.getStake(participant), stakes.get(participant, 0))
+
+    def test_reorg_rollback(self):
+        store = IndexStore()
+        indexer = EventIndexer(web3, self.competition, store, start_block=web3.eth.block_number)
+        amount = int(Decimal('1000e6'))
+        self.token.increaseAllowance(self.competition, 10 * amount, {'from': self.admin})
+        self.competition.sponsor(amount, {'from': self.admin})
+        indexer.sync()
+        verify(amount, store.get_sponsored_amount())
+
+        # Replace the last blocks with a longer branch that sponsors a different amount.
+        self.competition.sponsor(2 * amount, {'from': self.admin})
+        indexer.sync()
+        verify(3 * amount, store.get_sponsored_amount())
+        chain.undo()
+        self.competition.sponsor(3 * amount, {'from': self.admin})
+        chain.mine(2)
+        indexer.sync()
+        verify(4 * amount, store.get_sponsored_amount())
+        verify(web3.eth.get_block('latest')['hash'].hex(), store.get_cursor()[1])
+
+    def test_rpc_error_is_not_a_reorg(self):
+        store = IndexStore()
+        indexer = EventIndexer(web3, self.competition, store, start_block=web3.eth.block_number)
+        indexer.sync()
+        cursor = store.get_cursor()
+
+        # A failing node must stop the sync rather than roll the store back or store an empty block hash.
+        class FailingEth:
+            def __getattr__(self, name):
+                return getattr(web3.eth, name)
+
+            def get_block(self, block_identifier):
+                raise ValueError('upstream unavailable')
+
+        class FailingWeb3:
+            eth = FailingEth()
+
+        indexer.web3 = FailingWeb3()
+        chain.mine(1)
+        with pytest.raises(ValueError):
+            indexer.sync()
+        verify(cursor, store.get_cursor())
+
+        indexer.web3 = web3
+        verify(web3.eth.block_number, indexer.sync())
+
+    def test_log_limit_errors(self):
+        amount = int(Decimal('1000e6'))
+        self.token.increaseAllowance(self.competition, 10 * amount, {'from': self.admin})
+        start_block = web3.eth.block_number
+        for i in range(3):
+            self.competition.sponsor(amount, {'from': self.admin})
+        calls = []
+
+        # Ranges of more than one block exceed the response limit of this node, so the indexer splits them.
+        class LimitedEth:
+            def __getattr__(self, name):
+                return getattr(web3.eth, name)
+
+            def get_logs(self, params):
+                calls.append((params['fromBlock'], params['toBlock']))
+                if params['toBlock'] > params['fromBlock']:
+                    raise ValueError({'code': -32005, 'message': 'query returned more than 10000 results'})
+                return web3.eth.get_logs(params)
+
+        class LimitedWeb3:
+            eth = LimitedEth()
+
+        store = IndexStore()
+        indexer = EventIndexer(LimitedWeb3(), self.competition, store, start_block=start_block)
+        verify(web3.eth.block_number, indexer.sync())
+        verify(3 * amount, store.get_sponsored_amount())
+        assert len(calls) > web3.eth.block_number - start_block
+
+        # Any other error is raised without splitting the range.
+        class FailingEth(LimitedEth):
+            def get_logs(self, params):
+                calls.append((params['fromBlock'], params['toBlock']))
+                raise ValueError({'code': -32000, 'message': 'upstream unavailable'})
+
+        class FailingWeb3:
+            eth = FailingEth()
+
+        calls.clear()
+        indexer.web3 = FailingWeb3()
+        chain.mine(4)
+        with pytest.raises(ValueError):
+            indexer.sync()
+        verify(1, len(calls))
+
+    def test_uint256_amounts(self):
+        # Amounts wider than SQLite integers are summed exactly.
+        store = IndexStore()
+        store.add_stake_change(1, 0, 1, self.admin.address, 'increase', 2 ** 255)
+        store.add_stake_change(2, 0, 1, self.admin.address, 'reward', 2 ** 255 - 1)
+        store.add_burn(2, 1, 1, self.admin.address, 2 ** 200)
+        store.add_burn(3, 0, 1, self.admin.address, 1)
+        verify({self.admin.address: 2 ** 256 - 1}, store.get_stakes())
+        verify({self.admin.address: 2 ** 200 + 1}, store.get_burns(1))
@@ -0,0 +1,54 @@
+from utils_for_testing import *
+from brownie import history as tx_history
+from instrumentation import instrumentation, Profile
+
+
+class TestInstrumentation:
+    def test_instrumentation(self, flow):
+        participants = flow.participants
+        records = []
+        instrumentation.add_hook(records.append)
+        try:
+            with instrumentation.phase('staking'):
+                flow.execute_fn(flow.token, flow.token.setStake, [flow.competition, int(Decimal('10e6')),
+                                                                  {'from': participants[0]}], False, exp_revert=True)
+                flow.execute_fn(flow.token, flow.token.stakeAndSubmit,
+                                [flow.competition, int(Decimal('10e6')), getHash(), {'from': participants[0]}],
+                                False, exp_revert=True)
+            flow.execute_fn(flow.competition, flow.competition.updateVault, [flow.vault2, {'from': flow.admin}],
+                            flow.use_multi_admin, exp_revert=False)
+            flow.competition.getVault()
+            # The token proxy is attributed to `ChildToken` through `register()`.
+            flow.token.balanceOf(participants[0])
+        finally:
+            instrumentation.hooks.remove(records.append)
+
+        writes = [r for r in records if r['kind'] == 'tx']
+        verify(['ChildToken.setStake', 'ChildToken.stakeAndSubmit', 'Competition.updateVault'],
+               [r['function'] for r in writes])
+        verify(['staking', 'staking', 'test_instrumentation'], [r['phase'] for r in writes])
+        verify([True, True, False], [r['reverted'] for r in writes])
+        update_vault = writes[-1]
+        verify(1, update_vault['txs'])
+        verify(len(flow.competition.updateVault.encode_input(flow.vault2)) // 2 - 1, update_vault['calldata_bytes'])
+        verify(tx_history[-1].gas_used, update_vault['gas_used'])
+        assert update_vault['rpc_count'] > 0 and update_vault['wall_time'] > 0
+        verify(['Competition.getVault', 'ChildToken.balanceOf'], [r['function'] for r in records[-2:]])
+        verify('view', records[-1]['path'])
+
+        profile = Profile()
+        for record in records:
+            profile(record)
+        row = profile.functions[('tx', 'Competition.updateVault', 'direct')]
+        verify((1, update_vault['gas_used']), (row['count'], row['gas_used']))
+        verify(2, profile.phases[('tx', 'staking', '')]['reverted'])
+        merged = Profile()
+        merged.merge(profile.to_json())
+        merged.merge(profile.to_json())
+        verify(2 * row['gas_used'], merged.functions[('tx', 'Competition.updateVault', 'direct')]['gas_used'])
+        verify(2 * len(writes), len(merged.trace))
+        # Only the latest writes are kept in the trace.
+        capped = Profile(max_trace=2)
+        capped.merge(profile.to_json())
+        verify(writes[-2:], list(capped.trace))
+        assert 'Competition.updateVault' in '\n'.join(merged.table())
@@ -1,21 +1,20 @@
 from utils_for_testing import *
+import pytest
 from brownie import Token, Competition, ChildToken, MultiSig, reverts, accounts
 
 class TestMultiSig:
 
-    def setup(self):
-        self.admin = accounts[0]
-        self.owners = accounts[1:11]
-        self.non_owners = accounts[11:]
-        self.required = 6
-        self.multi_sig = MultiSig.deploy(self.owners, self.required, {'from': self.admin})
-        self.token = Token.deploy({'from': self.admin})
-        self.token.initialize("RockCap Token", "RCP", int(Decimal('100000000e6')), self.admin, {'from': self.admin})
-        self.competition = Competition.deploy({'from': self.admin})
-        stake_threshold = int(Decimal('10e6'))
-        challenge_rewards_threshold = int(Decimal('10e6'))
-        self.competition.initialize(stake_threshold, challenge_rewards_threshold, self.token, {'from': self.admin})
-        self.token.transfer(self.multi_sig, self.token.balanceOf(self.admin), {'from': self.admin})
+    @pytest.fixture(autouse=True)
+    def setup(self, worlds):
+        # The multisig and its token are deployed once per session, see `build_multisig_world`.
+        world = worlds.get('multisig')
+        self.admin = world['admin']
+        self.owners = world['owners']
+        self.non_owners = world['non_owners']
+        self.required = world['required']
+        self.multi_sig = world['multi_sig']
+        self.token = world['token']
+        self.competition = world['competition']
 
     def execute_one_transaction(self, dest, data, execute_should_fail=False, value=0):
         proposer = self.owners[0]
@@ -0,0 +1,22 @@
+from utils_for_testing import *
+from scripts.population import derive_accounts, fund_accounts
+
+
+class TestPopulation:
+    def test_derived_participants(self, flow):
+        derived = derive_accounts(25, seed='derived-participants')
+        verify([a.address for a in derived], [a.address for a in derive_accounts(25, seed='derived-participants')])
+        verify(25, len(set(a.address for a in derived) | set(a.address for a in flow.participants))
+               - len(flow.participants))
+
+        native_amount = 10 ** 15
+        token_amount = int(Decimal('100e6'))
+        native_balances = [a.balance() for a in derived]
+        fund_accounts(flow.token, flow.admin, derived, native_amount, token_amount, chunk=10)
+        for a, balance in zip(derived, native_balances):
+            verify(balance + native_amount, a.balance())
+            verify(token_amount, flow.token.balanceOf(a))
+
+        challenge_number = flow.run_challenge_to_phase_3(derived, stake_amount=token_amount)
+        verify(25, flow.competition.getHistoricalStakersCounter(challenge_number))
+        verify(25 * token_amount, flow.competition.getHistoricalTotalStaked(challenge_number))
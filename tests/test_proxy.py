@@ -1,12 +1,14 @@
 from utils_for_testing import *
-from brownie import Contract, Token, Competition, BadCompetition3, reverts, accounts
+from brownie import Contract, Token, Competition, BadCompetition3, reverts
+from scripts.population import development_accounts
 
 
 class TestProxy:
 
     def setup(self):
-        self.admin = accounts[0]
-        self.participants = accounts[1:]
+        dev_accounts = development_accounts()
+        self.admin = dev_accounts[0]
+        self.participants = dev_accounts[1:]
         self.token = Token.deploy({'from': self.admin})
         self.token.initialize("RockCap Token", "RCP", int(Decimal('100e12')), self.admin, {'from': self.admin})
         self.comp_logic = Competition.deploy({'from': self.admin})
@@ -0,0 +1,46 @@
+from utils_for_testing import *
+from brownie import web3
+from concurrent.futures import ThreadPoolExecutor
+from scripts.read_cache import ReadCache, CachedContract
+
+
+class TestReadCache:
+    def test_read_cache(self, flow):
+        participants = flow.participants
+        challenge_number = flow.challenge_in_phase_3(len(participants))
+        cache = ReadCache(web3, block_interval=60)
+        competition = CachedContract(flow.competition, cache)
+        token = CachedContract(flow.token, cache)
+
+        for _ in range(3):
+            for p in participants:
+                verify(flow.competition.getStake(p), competition.getStake(p))
+                verify(flow.token.getStake(flow.competition, p), token.getStake(competition, p))
+            verify(3, competition.getPhase(challenge_number))
+            verify(challenge_number, competition.getLatestChallengeNumber())
+        verify(2 * len(participants) + 2, cache.stats()['misses'])
+        verify(2 * (2 * len(participants) + 2), cache.stats()['hits'])
+
+        # Own transactions move reads to the new block; earlier blocks can still be read when pinned.
+        block = web3.eth.block_number
+        stake = competition.getStake(participants[0])
+        competition.payRewards([participants[0]], [7], [0], [0], {'from': flow.admin})
+        verify(stake + 7, competition.getStake(participants[0]))
+        verify(stake, competition.getStake(participants[0], block_identifier=block))
+        verify(stake, competition.getStake(participants[0], block_identifier=block))
+
+        # Entries beyond the size bound are evicted, least recently used first.
+        small_cache = ReadCache(web3, max_size=2, block_interval=60)
+        small_competition = CachedContract(flow.competition, small_cache)
+        for p in participants[:3] + participants[:1]:
+            small_competition.getStake(p)
+        verify(4, small_cache.stats()['misses'])
+        verify(2, small_cache.stats()['size'])
+
+        # Concurrent identical calls result in a single request.
+        coalescing_cache = ReadCache(web3, block_interval=60)
+        coalescing_competition = CachedContract(flow.competition, coalescing_cache)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            stakes = list(executor.map(lambda _: coalescing_competition.getStake(participants[1]), range(16)))
+        verify([flow.competition.getStake(participants[1])] * 16, stakes)
+        verify(1, coalescing_cache.stats()['misses'])
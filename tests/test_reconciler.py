@@ -0,0 +1,41 @@
+from utils_for_testing import *
+from brownie import web3
+from scripts.reconciler import Reconciler, Discrepancy
+
+
+class TestReconciler:
+    def test_reconciler(self, flow):
+        participants = flow.participants
+        challenge_number = flow.challenge_in_phase_3(len(participants))
+        stakes = {p: flow.competition.getStake(p) for p in participants}
+        verify(list(stakes.values()), flow.competition.getStakesBatch(participants))
+        snapshot = dict(zip(*flow.get_historical_stakers_and_amounts(challenge_number)))
+        reconciler = Reconciler(web3, flow.competition, flow.token, page_size=2, max_concurrency=3)
+        try:
+            report = reconciler.reconcile([challenge_number], expected_stakes=stakes,
+                                          expected_snapshots={challenge_number: snapshot})
+            assert report.ok, report.discrepancies
+            verify(len(participants), report.counts['stakers'])
+            verify(len(snapshot), report.counts['snapshot_{}'.format(challenge_number)])
+            verify(flow.competition.getRemainder(), report.totals['remainder'])
+
+            # Reads are pinned to a block.
+            block = web3.eth.block_number
+            flow.execute_fn(flow.competition, flow.competition.payRewards,
+                            [[participants[0]], [1], [0], [0], {'from': flow.admin}],
+                            flow.use_multi_admin, exp_revert=False)
+            assert reconciler.reconcile([challenge_number], expected_stakes=stakes, block=block).ok
+            report = reconciler.reconcile([challenge_number], expected_stakes=stakes)
+            verify([Discrepancy('stakes', stakes[participants[0]], stakes[participants[0]] + 1, participants[0])],
+                   report.discrepancies)
+
+            # Missing and unexpected addresses are reported per address.
+            stakes[participants[0]] += 1
+            outsider = "0x" + (7654321).to_bytes(20, "big").hex()
+            expected = {p: s for p, s in stakes.items() if p != participants[1]}
+            expected[outsider] = 1
+            report = reconciler.reconcile(expected_stakes=expected)
+            verify([Discrepancy('stakes', 0, stakes[participants[1]], participants[1]),
+                    Discrepancy('stakes', 1, 0, outsider)], report.discrepancies)
+        finally:
+            reconciler.close()
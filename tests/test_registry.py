@@ -1,27 +1,31 @@
 from utils_for_testing import *
-from brownie import reverts, accounts, Token, MultiSig
+from brownie import reverts, Token, MultiSig
+from scripts.population import development_accounts
+from instrumentation import instrumentation
 
 class TestRegistry:
     def setup(self):
-        self.admin = accounts[0]
-        self.competitions = accounts[1:6]
-        self.tokens = accounts[6:10]
+        dev_accounts = development_accounts()
+        self.admin = dev_accounts[0]
+        self.competitions = dev_accounts[1:6]
+        self.tokens = dev_accounts[6:10]
         self.use_multi_admin = False
         self.registry = Token.deploy({'from': self.admin})
         self.registry.initialize("RockCap Token", "RCP", int(Decimal("1e12")), self.admin, {'from': self.admin})
 
     
     def execute_fn(self, dest, fn, args_list, use_multi_admin, exp_revert):
-        if not use_multi_admin:
-            if exp_revert:
-                with reverts():
+        with instrumentation.transaction(fn, 'multisig' if use_multi_admin else 'direct'):
+            if not use_multi_admin:
+                if exp_revert:
+                    with reverts():
+                        fn(*args_list)
+                else:
                     fn(*args_list)
             else:
-                fn(*args_list)
-        else:
-            args_no_sender = args_list[:-1]
-            data = fn.encode_input(*args_no_sender)
-            self.execute_one_transaction(dest, data, exp_revert)
+                args_no_sender = args_list[:-1]
+                data = fn.encode_input(*args_no_sender)
+                self.execute_one_transaction(dest, data, exp_revert)
 
     def test_authorize_new_competition(self):
         verify([], self.registry.getCompetitionList())
@@ -187,13 +191,14 @@ class TestRegistry:
 
 class TestRegistryMulti(TestRegistry):
     def setup(self):
-        assert len(accounts) >= 10, 'Please run this test with at least 10 accounts.'
+        dev_accounts = development_accounts()
+        assert len(dev_accounts) >= 10, 'Please run this test with at least 10 accounts.'
         self.use_multi_admin = True
-        self.admin = accounts[0]
-        self.owners = accounts[1:5]
-        self.non_owners = [accounts[5]]
-        self.competitions = accounts[6:8]
-        self.tokens = accounts[8:]
+        self.admin = dev_accounts[0]
+        self.owners = dev_accounts[1:5]
+        self.non_owners = [dev_accounts[5]]
+        self.competitions = dev_accounts[6:8]
+        self.tokens = dev_accounts[8:]
         self.required = 3
         self.multi_sig = MultiSig.deploy(self.owners, self.required, {'from': self.admin})
         self.registry = Token.deploy({'from': self.admin})
@@ -0,0 +1,75 @@
+from utils_for_testing import *
+import pytest
+np = pytest.importorskip('numpy')
+from scripts.reward_engine import compute_rewards, split_budget, allocate, mul_div, snapshot_from_chain, RewardError
+from scripts.settlement import SettlementPlanner
+from worlds import run_challenge_to_phase_3
+
+
+class TestRewardEngine:
+    def test_mul_div(self):
+        # Exact integer arithmetic, also where the intermediate products do not fit in 64 bits.
+        random.seed(3)
+        a = [random.randrange(2 ** 47) for i in range(1000)]
+        b = [random.randrange(2 ** 40) for i in range(1000)]
+        c = [random.randrange(2 ** 40, 2 ** 47) for i in range(1000)]
+        verify([x * y // z for x, y, z in zip(a, b, c)], mul_div(a, b, c).tolist())
+        verify([0, 0], mul_div([5, 7], 3, 0).tolist())
+
+        # Beyond the 64-bit limits the quotients are computed on Python ints.
+        verify([2 ** 63], mul_div([2 ** 62], [2 ** 62], [2 ** 61]).tolist())
+        verify([2 ** 200 // 3], mul_div([2 ** 100], [2 ** 100], [3]).tolist())
+
+    def test_allocate(self):
+        random.seed(5)
+        weights = [random.randrange(10 ** 12) for i in range(1000)]
+        budget = 10 ** 13 + 7
+        shares = allocate(weights, budget).tolist()
+        verify(budget, sum(shares))
+        for w, share in zip(weights, shares):
+            assert w * budget // sum(weights) <= share <= w * budget // sum(weights) + 1
+        verify([0, 0], allocate([0, 0], 100).tolist())
+
+        # Weights whose total does not fit in 64 bits.
+        weights = [random.randrange(10 ** 17, 10 ** 18) for i in range(100)]
+        budget = 10 ** 14 + 3
+        shares = allocate(weights, budget).tolist()
+        verify(budget, sum(shares))
+        for w, share in zip(weights, shares):
+            assert w * budget // sum(weights) <= share <= w * budget // sum(weights) + 1
+        verify([5, 5, 0], allocate([2 ** 70, 2 ** 70, 1], 10).tolist())
+        with pytest.raises(RewardError):
+            split_budget(100, 5000, 5000, 1)
+
+    def test_reward_plan(self, world):
+        competition, admin = world['competition'], world['admin']
+        challenge_number = run_challenge_to_phase_3(world, world['participants'])
+        stakers, stakes = snapshot_from_chain(competition, challenge_number, page_size=3)
+        verify(list(competition.getHistoricalStakers(challenge_number)), stakers)
+        verify(competition.getHistoricalStakeAmounts(challenge_number, stakers), stakes.tolist())
+
+        pool = competition.getCompetitionPool()
+        budgets = split_budget(pool // 2, 3000, 4500, 2500)
+        challenge_scores = [random.randint(0, int(1e6)) for s in stakers]
+        tournament_scores = [random.randint(0, int(1e6)) for s in stakers]
+        burn_bps = [random.randint(0, 10000) for s in stakers]
+        with pytest.raises(RewardError):
+            compute_rewards(stakers, stakes, challenge_scores, tournament_scores, pool, 1, 0, competition_pool=pool)
+        plan = compute_rewards(stakers, stakes, challenge_scores, tournament_scores, *budgets, burn_bps=burn_bps,
+                               competition_pool=pool)
+        verify(sum(budgets), plan.total_rewards)
+        verify(0, plan.undistributed)
+        burned, paid = len(plan.burn_arguments()[0]), len(plan.payment_arguments()[0])
+        verify(-(-burned // 3) + -(-paid // 3), len(plan.chunks(3)))
+
+        planner = SettlementPlanner({'from': admin}, probe_sizes=(1, 4))
+        plan.execute(competition, planner)
+        verify(pool - plan.total_rewards, competition.getCompetitionPool())
+        for i, s in enumerate(stakers):
+            staking, challenge, tournament, burn = [int(v[i]) for v in (
+                plan.staking_rewards, plan.challenge_rewards, plan.tournament_rewards, plan.burn_amounts)]
+            verify(staking, competition.getStakingRewards(challenge_number, s))
+            verify(challenge, competition.getChallengeRewards(challenge_number, s))
+            verify(tournament, competition.getTournamentRewards(challenge_number, s))
+            verify(burn, competition.getBurnedAmount(challenge_number, s))
+            verify(int(stakes[i]) - burn + staking + challenge + tournament, competition.getStake(s))
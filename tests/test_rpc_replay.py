@@ -0,0 +1,42 @@
+from utils_for_testing import *
+import pytest
+from brownie import Contract, web3
+from scripts.rpc_replay import RpcRecorder, RpcReplayProvider, ReplayMiss, load_fixture, seed_chain
+
+
+class TestRpcReplay:
+    def test_rpc_replay(self, flow, tmp_path):
+        participants = flow.participants
+        challenge_number = flow.challenge_in_phase_3(len(participants))
+        block = web3.eth.block_number
+        address = flow.competition.address
+
+        # Record a few reads and the storage behind the current total stake (slot 6) and the staker set size (slot 15).
+        recorder = RpcRecorder(web3.provider, block)
+        competition = Web3(recorder).eth.contract(address=address, abi=flow.competition.abi)
+        stakers = competition.functions.getAllStakers().call()
+        amounts = competition.functions.getHistoricalStakeAmounts(challenge_number, stakers).call()
+        total_staked = competition.functions.getCurrentTotalStaked().call()
+        recorder.record_account(address, slots=[6, 15])
+        path = tmp_path / 'replay.json.gz'
+        recorder.save(path)
+
+        # Later blocks do not change the recorded reads.
+        flow.execute_fn(flow.competition, flow.competition.payRewards,
+                        [[participants[0]], [1], [0], [0], {'from': flow.admin}], flow.use_multi_admin, exp_revert=False)
+        fixture = load_fixture(path)
+        verify(block, fixture['block'])
+        competition = Web3(RpcReplayProvider(fixture)).eth.contract(address=address, abi=flow.competition.abi)
+        verify(stakers, competition.functions.getAllStakers().call())
+        verify(amounts, competition.functions.getHistoricalStakeAmounts(challenge_number, stakers).call())
+        verify(total_staked, competition.functions.getCurrentTotalStaked().call())
+        verify(total_staked + 1, flow.competition.getCurrentTotalStaked())
+        with pytest.raises(ReplayMiss):
+            competition.functions.getCompetitionPool().call()
+
+        # A local chain seeded from the fixture holds the recorded state.
+        seeded = "0x" + (7654321).to_bytes(20, "big").hex()
+        seed_chain(web3, fixture, relocate={address: seeded})
+        seeded_competition = Contract.from_abi("Competition", seeded, flow.competition.abi)
+        verify(total_staked, seeded_competition.getCurrentTotalStaked())
+        verify(len(stakers), seeded_competition.getStakersCounter())
@@ -0,0 +1,69 @@
+from utils_for_testing import *
+import pytest
+from types import SimpleNamespace
+from scripts.settlement import SettlementPlanner, Operation, record_stakes_operation, pay_rewards_operation, \
+    burn_operation, scores_operation, information_operation
+
+
+class TestSettlementPlanner:
+    def test_settlement_planner(self, flow):
+        participants = flow.participants
+        challenge_number = flow.challenge_in_phase_3(len(participants))
+        n = len(participants)
+        planner = SettlementPlanner({'from': flow.admin}, probe_sizes=(1, 4))
+
+        # Size the ceiling so that only about three items fit in one transaction.
+        operation = pay_rewards_operation(flow.competition, participants, [int(Decimal('1e6'))] * n,
+                                          [int(Decimal('2e6'))] * n, [int(Decimal('3e6'))] * n)
+        model = planner.fit(operation)
+        planner.gas_ceiling = int(model.estimate(3) * planner.safety_margin)
+        chunks = planner.plan(operation, model)
+        verify(list(range(0, n)), [i for s, e in chunks for i in range(s, e)])
+        assert len(chunks) <= -(-n // 2)
+        txs = planner.execute(operation, chunks)
+        assert len(txs) >= len(chunks)
+        for tx in txs:
+            assert tx.gas_used <= planner.gas_ceiling
+        for p in participants:
+            verify(int(Decimal('1e6')), flow.competition.getStakingRewards(challenge_number, p))
+            verify(int(Decimal('3e6')), flow.competition.getTournamentRewards(challenge_number, p))
+
+        # Chunks planned too large are split before being sent.
+        txs = planner.execute(burn_operation(flow.competition, participants, [1] * n), [(0, n)])
+        assert len(txs) > 1
+        for p in participants:
+            verify(1, flow.competition.getBurnedAmount(challenge_number, p))
+
+        for operation in [record_stakes_operation(flow.competition),
+                          scores_operation(flow.competition, challenge_number, participants, list(range(n)),
+                                           list(range(n, 2 * n))),
+                          information_operation(flow.competition, challenge_number, participants, 5,
+                                                list(range(2 * n, 3 * n)))]:
+            for tx in planner.execute(operation):
+                assert tx.gas_used <= planner.gas_ceiling
+        for i, p in enumerate(participants):
+            verify(i, flow.competition.getChallengeScores(challenge_number, p))
+            verify(n + i, flow.competition.getTournamentScores(challenge_number, p))
+            verify(2 * n + i, flow.competition.getInformation(challenge_number, p, 5))
+
+        # Only out-of-gas failures are split; other errors that mention gas are raised.
+        sent = []
+
+        def send(start, end, tx_params, error):
+            sent.append((start, end))
+            if end - start > 1:
+                raise ValueError(error)
+            return SimpleNamespace(status=1)
+
+        operation = Operation(None, 4, None)
+        operation.estimate_gas = lambda start, end, tx_params: 100_000
+        operation.send = lambda start, end, tx_params: send(start, end, tx_params,
+                                                            'VM Exception while processing transaction: out of gas')
+        verify(4, len(planner.execute(operation, [(0, 4)])))
+        verify([(0, 4), (0, 2), (0, 1), (1, 2), (2, 4), (2, 3), (3, 4)], sent)
+        sent.clear()
+        operation.send = lambda start, end, tx_params: send(start, end, tx_params,
+                                                            'insufficient funds for gas * price + value')
+        with pytest.raises(ValueError):
+            planner.execute(operation, [(0, 4)])
+        verify([(0, 4)], sent)
@@ -0,0 +1,100 @@
+from utils_for_testing import *
+import pytest
+np = pytest.importorskip('numpy')
+from brownie import Token, Competition, reverts
+from scripts.simulator import Simulator, SimulationParameters, sweep
+from scripts.population import development_accounts
+
+
+class TestSimulator:
+    def setup(self):
+        dev_accounts = development_accounts()
+        self.admin = dev_accounts[0]
+        self.participants = dev_accounts[1:9]
+        self.parameters = SimulationParameters(
+            stake_threshold=int(Decimal('10e6')), rewards_threshold=int(Decimal('10e6')),
+            sponsor_amount=int(Decimal('100e6')), budget=int(Decimal('50e6')), burn_bps=1500, burned_to_pool_bps=5000,
+            initial_balance=int(Decimal('1000e6')), mean_stake=int(Decimal('200e6')), stake_probability=0.6,
+            submit_probability=0.7, exit_probability=0.2)
+
+        self.token = Token.deploy({'from': self.admin})
+        self.token.initialize("RockCap Token", "RCP", int(Decimal('100000000e6')), self.admin, {'from': self.admin})
+        self.competition = Competition.deploy({'from': self.admin})
+        self.competition.initialize(self.parameters.stake_threshold, self.parameters.rewards_threshold, self.token,
+                                    {'from': self.admin})
+        self.token.authorizeCompetition(self.competition, "Simulation", {'from': self.admin})
+        for p in self.participants:
+            self.token.transfer(p, self.parameters.initial_balance, {'from': self.admin})
+
+    def replay(self, actions):
+        # Send the actions of one simulated round to the contracts.
+        admin = {'from': self.admin}
+        if actions.sponsor_amount > 0:
+            self.token.approve(self.competition, actions.sponsor_amount, admin)
+            self.competition.sponsor(actions.sponsor_amount, admin)
+        if not actions.opened:
+            with reverts():
+                self.competition.openChallenge(getHash(), getHash(), getTimestamp(), getTimestamp(), admin)
+            return
+        self.competition.openChallenge(getHash(), getHash(), getTimestamp(), getTimestamp(), admin)
+
+        for p, target, applied in zip(self.participants, actions.targets, actions.applied):
+            if int(target) == self.competition.getStake(p):
+                continue
+            if applied:
+                self.token.setStake(self.competition, int(target), {'from': p})
+            else:
+                with reverts():
+                    self.token.setStake(self.competition, int(target), {'from': p})
+        for p, submitted in zip(self.participants, actions.submitted):
+            if submitted:
+                self.token.stakeAndSubmit(self.competition, self.competition.getStake(p), getHash(), {'from': p})
+
+        self.competition.closeSubmission(admin)
+        self.competition.recordStakes(0, self.competition.getStakersCounter(), admin)
+        self.competition.advanceToPhase(3, admin)
+
+        rewards = [actions.staking_rewards, actions.challenge_rewards, actions.tournament_rewards]
+        paid = np.flatnonzero(sum(rewards))
+        self.competition.payRewards([self.participants[i] for i in paid],
+                                    *[[int(r[i]) for i in paid] for r in rewards], admin)
+        if actions.burned is not None:
+            self.competition.burnUniformBps([self.participants[i] for i in np.flatnonzero(actions.burned)],
+                                            actions.burn_bps, admin)
+
+        if actions.closed:
+            self.competition.advanceToPhase(4, admin)
+        else:
+            with reverts("PYBN"):
+                self.competition.advanceToPhase(4, admin)
+        if actions.burned_to_pool > 0:
+            self.competition.moveBurnedToPool(actions.burned_to_pool, admin)
+
+    def verify_state(self, simulator):
+        for i, p in enumerate(self.participants):
+            verify(int(simulator.stakes[i]), self.competition.getStake(p))
+            verify(int(simulator.balances[i]), self.token.balanceOf(p))
+        verify(simulator.competition_pool, self.competition.getCompetitionPool())
+        verify(simulator.total_staked, self.competition.getCurrentTotalStaked())
+        verify(simulator.burned_amount, self.competition.getTotalBurnedAmount())
+        verify(simulator.remainder, self.competition.getRemainder())
+        verify(simulator.balance, self.token.balanceOf(self.competition))
+        verify(simulator.challenge_counter, self.competition.getLatestChallengeNumber())
+        verify(simulator.phase, self.competition.getPhase(simulator.challenge_counter))
+
+    def test_simulator_matches_contract(self):
+        simulator = Simulator(self.parameters, len(self.participants), seed=11)
+        for i in range(6):
+            self.replay(simulator.run_round())
+            self.verify_state(simulator)
+        verify(6, simulator.challenge_counter)
+        assert simulator.burned_amount > 0
+
+    def test_sweep(self):
+        parameter_sets = [SimulationParameters(stake_threshold=t, initial_pool=int(Decimal('1000e6')))
+                          for t in [int(Decimal('1e6')), int(Decimal('100e6'))]]
+        results = sweep(parameter_sets, num_participants=1000, num_rounds=20, seed=5)
+        verify(2, len(results))
+        verify(results, sweep(parameter_sets, num_participants=1000, num_rounds=20, seed=5))
+        for result in results:
+            verify(0, result['remainder'])
@@ -0,0 +1,84 @@
+from utils_for_testing import *
+import pytest
+np = pytest.importorskip('numpy')
+from brownie import web3
+from scripts.settlement import SettlementPlanner
+from scripts.staker_history import read_chunks, load_history, verify_history, HistoryError, import_history, \
+    pack_stakes
+
+
+class TestStakerHistory:
+    def test_staker_history(self, flow, tmp_path):
+        participants = flow.participants
+        challenge_number = flow.challenge_in_phase_3(len(participants))
+        stakers, amounts = flow.get_historical_stakers_and_amounts(challenge_number)
+        path = tmp_path / 'staker_info.csv'
+        with open(path, 'w') as f:
+            f.write('challenge_number,staker,amount\n')
+            for staker, amount in zip(stakers, amounts):
+                # Interleave rows of the previous challenge, which has no recorded stakes.
+                f.write('{},{},{}\n{},{},0\n'.format(challenge_number, staker, amount, challenge_number - 1, staker))
+
+        # Small chunks split the file over many reads.
+        verify(2 * len(stakers), sum(len(chunk) for chunk in read_chunks(path, chunk_bytes=200)))
+        history = load_history(path, chunk_bytes=200)
+        verify([str(s) for s in stakers], history[challenge_number][0].tolist())
+        verify(list(amounts), history[challenge_number][1].tolist())
+        verify([0] * len(stakers), history[challenge_number - 1][1].tolist())
+
+        report = verify_history(path, flow.competition, web3, batch_size=2, max_in_flight=3, chunk_bytes=200,
+                                check_totals=True)
+        assert report.ok, report.mismatches
+        verify(2 * len(stakers), report.rows)
+        verify(sum(amounts), report.totals[challenge_number])
+
+        with open(path, 'a') as f:
+            f.write('{},{},{}\n'.format(challenge_number, stakers[0], amounts[0] + 1))
+        report = verify_history(path, flow.competition, web3, batch_size=2, max_in_flight=3, chunk_bytes=200,
+                                check_totals=True)
+        verify([(challenge_number, str(stakers[0]), amounts[0] + 1, amounts[0]),
+                (challenge_number, None, sum(amounts) + amounts[0] + 1, sum(amounts))], report.mismatches)
+
+        with open(path, 'a') as f:
+            f.write('{},{}\n'.format(challenge_number, stakers[0]))
+        with pytest.raises(HistoryError):
+            verify_history(path, flow.competition, web3)
+
+        # Amounts of 2**64 and above are kept exact, and packed into all 32 bytes of the amount.
+        path = tmp_path / 'wide_staker_info.csv'
+        with open(path, 'w') as f:
+            f.write('{},{},{}\n{},{},{}\n'.format(challenge_number, stakers[0], 2 ** 70 + 1,
+                                                  challenge_number, stakers[1], amounts[1]))
+        verify([2 ** 70 + 1, amounts[1]], load_history(path)[challenge_number][1].tolist())
+        verify([(challenge_number, str(stakers[0]), 2 ** 70 + 1, amounts[0])],
+               verify_history(path, flow.competition, web3).mismatches)
+        verify(2 ** 70 + 1, int.from_bytes(pack_stakes(stakers[:1], [2 ** 70 + 1])[20:], 'big'))
+
+    def test_import_history(self, flow, tmp_path):
+        participants = flow.participants
+        admin = {'from': flow.admin}
+        # Snapshots are imported for challenges before the latest one.
+        for _ in range(3):
+            flow.run_challenge_to_phase_3(participants[:1])
+        history = {challenge_number: {p: random.randint(1, int(Decimal('1000e6'))) for p in participants}
+                   for challenge_number in [1, 2]}
+        path = tmp_path / 'staker_info.csv'
+        with open(path, 'w') as f:
+            for challenge_number, stakes in history.items():
+                for p, amount in stakes.items():
+                    f.write('{},{},{}\n'.format(challenge_number, p, amount))
+            # A later row for a staker already imported replaces the amount.
+            history[1][participants[0]] += 1
+            f.write('{},{},{}\n'.format(1, participants[0], history[1][participants[0]]))
+
+        planner = SettlementPlanner(admin, gas_ceiling=1_000_000, probe_sizes=(1, 4))
+        txs = import_history(path, flow.competition, planner, chunk_bytes=300)
+        assert len(txs) > 2
+        for challenge_number, stakes in history.items():
+            verify(len(participants), flow.competition.getHistoricalStakersCounter(challenge_number))
+            verify(sum(stakes.values()), flow.competition.getHistoricalTotalStaked(challenge_number))
+            verify(list(stakes.values()), flow.competition.getHistoricalStakeAmounts(challenge_number, participants))
+        # Only the replaced row differs from the imported snapshot.
+        replaced = history[1][participants[0]]
+        verify([(1, str(participants[0]), replaced - 1, replaced)],
+               verify_history(path, flow.competition, web3).mismatches)
@@ -0,0 +1,67 @@
+from utils_for_testing import *
+import pytest
+np = pytest.importorskip('numpy')
+from brownie import Competition, reverts, web3
+from scripts.state_snapshot import export_snapshot, load_snapshot, seed_snapshot, to_addresses, to_ints
+from scripts.storage_reader import CompetitionStorageReader, mapping_slot, SLOTS
+
+
+class TestStateSnapshot:
+    def test_state_snapshot(self, flow, tmp_path):
+        participants = flow.participants
+        admin = {'from': flow.admin}
+        challenge_number = flow.challenge_in_phase_3(len(participants))
+        flow.competition.payRewards(participants[:3], [1, 2, 3], [4, 5, 6], [7, 8, 9], admin)
+        flow.competition.burn(participants[2:4], [10, 11], admin)
+        flow.competition.updateChallengeAndTournamentScores(challenge_number, participants[:2], [2 ** 70, 13],
+                                                            [14, 15], admin)
+        flow.competition.completeMigration(admin)
+        c = flow.competition
+
+        snapshot = export_snapshot(web3, c.address, tmp_path / 'snapshot', batch_size=4)
+        verify(web3.eth.block_number, snapshot.manifest['block'])
+        verify([str(s).lower() for s in c.getAllStakers()], to_addresses(snapshot.columns['stakers']))
+        verify(list(c.getStakesBatch(c.getAllStakers())), to_ints(snapshot.columns['stakes']))
+        verify([challenge_number], snapshot.challenge_numbers)
+
+        # Columns are memory-mapped, and a score that does not fit 64 bits switches its column to 32-byte rows.
+        loaded = load_snapshot(tmp_path / 'snapshot')
+        assert isinstance(loaded.columns['stakes'], np.memmap)
+        verify((len(participants), 32), loaded.columns['challenge_scores'].shape)
+        challenge = loaded.challenge(challenge_number)
+        addresses = to_addresses(challenge['participants'])
+        verify([str(s).lower() for s in c.getHistoricalStakers(challenge_number)], addresses)
+        verify([c.getStakedAmountForChallenge(challenge_number, a) for a in addresses],
+               to_ints(challenge['historical_stake']))
+        verify([c.getChallengeScores(challenge_number, a) for a in addresses], to_ints(challenge['challenge_scores']))
+        verify([c.getBurnedAmount(challenge_number, a) for a in addresses], to_ints(challenge['tokens_burned']))
+        verify([c.getSubmission(challenge_number, a) for a in addresses],
+               ['0x' + row.tobytes().hex() for row in challenge['submissions']])
+        verify(c.getPhase(challenge_number), int(challenge['phase']))
+        verify(c.challengePayments(challenge_number), int(challenge['challenge_payments']))
+        verify(list(c.getDeadlinesBatch(challenge_number, [0, 1])), to_ints(challenge['deadlines']))
+
+        # A fresh deployment seeded with the snapshot holds the same state.
+        fresh = Competition.deploy(admin)
+        fresh.initialize(flow.stake_threshold, flow.challenge_rewards_threshold, flow.token, admin)
+        seed_snapshot(web3, loaded, fresh.address, batch_size=7)
+        flow.token.transfer(fresh, flow.token.balanceOf(c), admin)
+        original = CompetitionStorageReader(web3, c.address)
+        seeded = CompetitionStorageReader(web3, fresh.address)
+        try:
+            verify(original.export(), seeded.export())
+        finally:
+            original.close()
+            seeded.close()
+        verify(c.getRemainder(), fresh.getRemainder())
+        verify(list(c.getAllSubmitters(challenge_number)), list(fresh.getAllSubmitters(challenge_number)))
+        verify(c.challengePayments(challenge_number), fresh.challengePayments(challenge_number))
+        verify(c.challengeBurns(challenge_number), fresh.challengeBurns(challenge_number))
+        verify(True, fresh.migrationCompleted())
+        verify(c.getVault(), fresh.getVault())
+        # The seeded deployment stays initialized.
+        with reverts("Initializable: contract is already initialized"):
+            fresh.initialize(flow.stake_threshold, flow.challenge_rewards_threshold, flow.token, admin)
+        # The dataset hash stays marked as used.
+        verify(1, web3.eth.get_storage_at(fresh.address, mapping_slot(int(c.getDatasetHash(challenge_number).hex(), 16),
+                                                                      SLOTS['dataset_hashes']))[-1])
@@ -0,0 +1,89 @@
+from utils_for_testing import *
+from brownie import web3
+from scripts.storage_reader import CompetitionStorageReader, SLOTS, layout_slots
+
+
+class TestStorageReader:
+    def test_slots(self):
+        # The slot table matches the storage layout of the compiled contract.
+        verify(SLOTS, layout_slots())
+
+    def test_storage_reader(self, flow):
+        participants = flow.participants
+        admin = {'from': flow.admin}
+        challenge_number = flow.challenge_in_phase_3(len(participants))
+        flow.competition.updateMessage(getRandomString(40), admin)
+        flow.competition.payRewards(participants[:3], [1, 2, 3], [4, 5, 6], [7, 8, 9], admin)
+        flow.competition.burn(participants[2:4], [10, 11], admin)
+        flow.competition.updateChallengeAndTournamentScores(challenge_number, participants[:2], [12, 13], [14, 15],
+                                                            admin)
+        flow.competition.updateInformationBatch(challenge_number, participants[:2], 3, [16, 17], admin)
+        flow.competition.completeMigration(admin)
+        c = flow.competition
+
+        reader = CompetitionStorageReader(web3, c.address, batch_size=3)
+        try:
+            scalars = reader.scalars()
+            verify(c.getTokenAddress(), scalars['token'])
+            verify(c.getLatestChallengeNumber(), scalars['challenge_counter'])
+            verify(c.getStakeThreshold(), scalars['stake_threshold'])
+            verify(c.getCompetitionPool(), scalars['competition_pool'])
+            verify(c.getRewardsThreshold(), scalars['rewards_threshold'])
+            verify(c.getCurrentTotalStaked(), scalars['current_total_staked'])
+            verify(c.getBurnRecipient(), scalars['burn_recipient'])
+            verify(c.getTotalBurnedAmount(), scalars['burned_amount'])
+            verify(c.getVault().lower(), scalars['vault'].lower())
+            verify(True, scalars['migration_completed'])
+            verify(1, scalars['initialized'])
+            verify(c.getStakersCounter(), scalars['stakers_counter'])
+            verify(c.getMessage(), reader.message())
+
+            stakers = reader.stakers()
+            verify(list(c.getAllStakers()), stakers)
+            verify(list(c.getStakesBatch(stakers)), reader.stakes(stakers))
+            verify(list(c.getHistoricalStakers(challenge_number)), reader.historical_stakers(challenge_number))
+            verify(list(c.getHistoricalStakeAmounts(challenge_number, stakers)),
+                   reader.historical_stake_amounts(challenge_number, stakers))
+            verify(list(c.getAllSubmitters(challenge_number)), reader.submitters(challenge_number))
+            verify(list(c.getDeadlinesBatch(challenge_number, [0, 1, 2])),
+                   reader.deadlines(challenge_number, [0, 1, 2]))
+
+            challenge = reader.challenge(challenge_number)
+            verify(c.getDatasetHash(challenge_number), challenge['dataset'])
+            verify(c.getResultsHash(challenge_number), challenge['results'])
+            verify(c.getKeyHash(challenge_number), challenge['key'])
+            verify(c.getPrivateKeyHash(challenge_number), challenge['private_key'])
+            verify(c.getPhase(challenge_number), challenge['phase'])
+            verify(c.challengeOpenedBlockNumbers(challenge_number), challenge['challenge_opened_block_numbers'])
+            verify(c.submissionClosedBlockNumbers(challenge_number), challenge['submission_closed_block_numbers'])
+            verify(c.getHistoricalTotalStaked(challenge_number), challenge['historical_total_stake'])
+            verify(c.challengePayments(challenge_number), challenge['challenge_payments'])
+            verify(c.challengeBurns(challenge_number), challenge['challenge_burns'])
+            verify(c.challengeArchiveHashes(challenge_number), challenge['challenge_archive_hashes'])
+            verify(c.stakingRewardsCursor(challenge_number), challenge['staking_rewards_cursor'])
+            verify(c.getSubmissionCounter(challenge_number), challenge['submission_counter'])
+            verify(c.getHistoricalStakersCounter(challenge_number), challenge['historical_stakers_counter'])
+
+            information = reader.information(challenge_number, participants)
+            for i, p in enumerate(participants):
+                verify(c.getSubmission(challenge_number, p), information['submission'][i])
+                verify(0, information['staked'][i])
+                verify(c.getStakingRewards(challenge_number, p), information['staking_rewards'][i])
+                verify(c.getChallengeRewards(challenge_number, p), information['challenge_rewards'][i])
+                verify(c.getTournamentRewards(challenge_number, p), information['tournament_rewards'][i])
+                verify(c.getChallengeScores(challenge_number, p), information['challenge_scores'][i])
+                verify(c.getTournamentScores(challenge_number, p), information['tournament_scores'][i])
+                verify(c.getBurnedAmount(challenge_number, p), information['tokens_burned'][i])
+            verify([c.getInformation(challenge_number, p, 3) for p in participants],
+                   reader.information_items(challenge_number, participants, 3))
+
+            # Reads stay at the block the reader was created at.
+            state = reader.export()
+            c.payRewards([participants[0]], [1], [0], [0], admin)
+            verify(state, reader.export())
+            verify(len(stakers), len(state['stakes']))
+            verify(challenge['historical_total_stake'],
+                   sum(state['challenges'][challenge_number]['historical_stakes'].values()))
+            verify(c.getStake(participants[0]) - 1, state['stakes'][participants[0]])
+        finally:
+            reader.close()
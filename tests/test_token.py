@@ -1,50 +1,28 @@
 from utils_for_testing import *
+import pytest
 from brownie import ChildToken, Competition, reverts, accounts, BadCompetition, BadCompetition2
 from brownie import ShareTaxPolicyVanilla, Contract
 from brownie import TestTokenUpgraded
 
 class TestToken:
-    def setup(self):
-        self.admin = accounts[0]
-        self.client1 = accounts[1]
-        self.client2 = accounts[2]
-        self.fee_collector = accounts[3]
-        self.tax_collector = accounts[4]
-        self.participants = accounts[5:]
-        self.initial_supply = 100_000_000 * 1_000_000
-
-        # Upgradeable ChildToken
-        token_logic = ChildToken.deploy({'from': self.admin})
-        self.proxy_admin = op.ProxyAdmin.deploy({'from': self.admin})
-        data = token_logic.initialize.encode_input("Yiedl", "YIEDL", self.initial_supply, self.admin)
-        tup = op.TransparentUpgradeableProxy.deploy(token_logic, self.proxy_admin, data, {'from': self.admin})
-        op.TransparentUpgradeableProxy.remove(tup)
-        combined_abi = op.TransparentUpgradeableProxy.abi + ChildToken.abi
-        self.token = Contract.from_abi("ChildToken", tup.address, combined_abi)
-
-        # Upgradeable Competition
-        self.competition = Competition.deploy({'from': self.admin})
-        self.competition_name = "The new competition"
+    @pytest.fixture(autouse=True)
+    def setup(self, worlds):
+        # The token, the competition and the airdrops are deployed once per session, see `build_token_world`.
+        world = worlds.get('token')
+        self.admin = world['admin']
+        self.client1 = world['client1']
+        self.client2 = world['client2']
+        self.fee_collector = world['fee_collector']
+        self.tax_collector = world['tax_collector']
+        self.participants = world['participants']
+        self.initial_supply = world['initial_supply']
+        self.token = world['token']
+        self.proxy_admin = world['proxy_admin']
+        self.competition = world['competition']
+        self.competition_name = world['competition_name']
         self.zero_address = "0x" + (0).to_bytes(20, "big").hex()
         self.max_uint = 2 ** 256 - 1
-        self.shareholders = set([self.admin.address])
-
-        # airdrop to participants
-        total_airdrop = int(Decimal(0.01) * Decimal(self.token.totalSupply()))
-        single_airdrop = total_airdrop // (len(accounts) - 1)
-        recipients = [self.client1, self.client2] + self.participants
-        for recipient in recipients:
-            tx = self.token.transfer(recipient, single_airdrop, {'from': self.admin})
-            self.shareholders.add(recipient.address)
-
-        stake_threshold = int(Decimal('10e6'))
-        challenge_rewards_threshold = int(Decimal('10e6'))
-
-        self.competition.initialize(stake_threshold, challenge_rewards_threshold, self.token, {'from': self.admin})
-        self.token.increaseAllowance(self.competition, challenge_rewards_threshold * 2, {'from': self.admin})
-        self.competition.sponsor(challenge_rewards_threshold * 2, {'from': self.admin})
-        self.competition.openChallenge(getHash(), getHash(), getTimestamp(), getTimestamp())
-        self.shareholders.add(self.competition.address)
+        self.shareholders = set(world['shareholders'])
 
         self.cleanup_local_shareholders()
 
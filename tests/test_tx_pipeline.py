@@ -0,0 +1,51 @@
+from utils_for_testing import *
+import pytest
+from brownie import chain, web3
+from scripts.tx_pipeline import TxPipeline, PipelineError
+
+
+class TestTxPipeline:
+    def test_tx_pipeline(self, flow):
+        participants = flow.participants
+        challenge_number = flow.challenge_in_phase_3(len(participants))
+        reward = int(Decimal('5e6'))
+
+        # With automine off, transactions stay pending until a block is mined between polls.
+        web3.provider.make_request('miner_stop', [])
+        try:
+            pipeline = TxPipeline(web3, flow.admin, max_in_flight=4, wait_fn=chain.mine)
+
+            # A send the node rejects uses up no nonce, so the next transactions do not wait behind a gap.
+            nonce = pipeline.next_nonce
+            with pytest.raises(ValueError):
+                pipeline.submit(flow.competition.payRewards, [[participants[0]], [reward], [0], [0]],
+                                gas_limit=web3.eth.get_block('latest')['gasLimit'] + 1)
+            verify(nonce, pipeline.next_nonce)
+            verify([], pipeline.jobs)
+
+            jobs = [pipeline.submit(flow.competition.payRewards, [[p], [reward], [0], [0]]) for p in participants]
+            verify(list(range(nonce, nonce + len(participants))), [job.nonce for job in jobs])
+
+            # A transaction pending for too long is replaced with the same nonce at a higher gas price.
+            pipeline.replace_after = 0
+            job = pipeline.submit(flow.competition.updateInformationBatch, [challenge_number, [participants[0]], 1, [7]])
+            pipeline.poll()
+            verify(2, len(job.tx_hashes))
+            pipeline.replace_after = 120
+
+            receipts = pipeline.barrier()
+            verify(len(participants) + 1, len(receipts))
+            for p in participants:
+                verify(reward, flow.competition.getStakingRewards(challenge_number, p))
+            verify(7, flow.competition.getInformation(challenge_number, participants[0], 1))
+
+            # Dependent calls are sent after the barrier.
+            pipeline.submit(flow.competition.advanceToPhase, [4])
+            pipeline.barrier()
+            verify(4, flow.competition.getPhase(challenge_number))
+
+            pipeline.submit(flow.competition.advanceToPhase, [4], gas_limit=200000)
+            with pytest.raises(PipelineError):
+                pipeline.barrier()
+        finally:
+            web3.provider.make_request('miner_start', [])
@@ -0,0 +1,191 @@
+from utils_for_testing import *
+import os
+from brownie import ChildToken, Competition, Contract, MultiSig, Token, accounts, chain, reverts, web3
+from scripts.population import make_participants, development_accounts
+
+# Settings of the competition world.
+INITIAL_SUPPLY = 100_000_000 * 1_000_000
+STAKE_THRESHOLD = int(Decimal('1e6'))
+REWARDS_THRESHOLD = int(Decimal('0e6'))
+COMPETITION_NAME = "The new competition"
+VAULT = "0x" + (1234567).to_bytes(20, "big").hex()
+
+
+def num_participants():
+    # Set NUM_PARTICIPANTS to run with more participants than there are development accounts.
+    return int(os.environ.get('NUM_PARTICIPANTS', len(development_accounts()) - 1))
+
+
+def deploy_token_proxy(admin, initial_supply):
+    # Upgradeable ChildToken
+    token_logic = ChildToken.deploy({'from': admin})
+    proxy_admin = op.ProxyAdmin.deploy({'from': admin})
+    data = token_logic.initialize.encode_input("Yiedl", "YIEDL", initial_supply, admin)
+    tup = op.TransparentUpgradeableProxy.deploy(token_logic, proxy_admin, data, {'from': admin})
+    op.TransparentUpgradeableProxy.remove(tup)
+    combined_abi = op.TransparentUpgradeableProxy.abi + ChildToken.abi
+    return Contract.from_abi("ChildToken", tup.address, combined_abi), proxy_admin
+
+
+def build_competition_world(admin=None, count=None):
+    """
+    Deploy the token proxy and an initialized competition, and airdrop tokens to `count` participants
+    (default: `num_participants()`). Returns the contracts, participants and settings of the world.
+    """
+    admin = accounts[0] if admin is None else admin
+    count = num_participants() if count is None else count
+    token, proxy_admin = deploy_token_proxy(admin, INITIAL_SUPPLY)
+    competition = Competition.deploy({'from': admin})
+
+    # airdrop to participants
+    total_airdrop = int(Decimal(0.01) * Decimal(token.totalSupply()))
+    single_airdrop = total_airdrop // count
+    participants = make_participants(count, token, admin, native_amount=10 ** 15, token_amount=single_airdrop)
+
+    # Cannot initialize with token address set to 0.
+    with reverts():
+        competition.initialize(STAKE_THRESHOLD, REWARDS_THRESHOLD, '0x{}'.format('0'*40), {'from': admin})
+    competition.initialize(STAKE_THRESHOLD, REWARDS_THRESHOLD, token, {'from': admin})
+    token.authorizeCompetition(competition, COMPETITION_NAME, {'from': admin})
+    competition.updateVault(VAULT, {'from': admin})
+    return {'token': token, 'proxy_admin': proxy_admin, 'competition': competition, 'participants': participants,
+            'admin': admin, 'single_airdrop': single_airdrop, 'initial_supply': INITIAL_SUPPLY, 'stake_threshold': STAKE_THRESHOLD,
+            'rewards_threshold': REWARDS_THRESHOLD, 'competition_name': COMPETITION_NAME, 'vault': VAULT}
+
+
+def run_challenge_to_phase_3(world, stakers, stake_amount=int(Decimal('100e6')),
+                             sponsor_amount=int(Decimal('100000e6'))):
+    # Sponsor and open a new challenge, stake and submit for each of `stakers`,
+    # record the stakes snapshot and advance to phase 3.
+    # `stake_amount` may be a single amount for all stakers or a list of amounts.
+    token, competition, admin = world['token'], world['competition'], world['admin']
+    stake_amounts = stake_amount if isinstance(stake_amount, list) else [stake_amount] * len(stakers)
+    token.increaseAllowance(competition, sponsor_amount, {'from': admin})
+    competition.sponsor(sponsor_amount, {'from': admin})
+    competition.openChallenge(getHash(), getHash(), getTimestamp(), getTimestamp(), {'from': admin})
+    challenge_number = competition.getLatestChallengeNumber()
+
+    for p, amount in zip(stakers, stake_amounts):
+        token.stakeAndSubmit(competition, amount, getHash(), {'from': p})
+
+    competition.closeSubmission({'from': admin})
+    competition.recordStakes(0, competition.getStakersCounter(), {'from': admin})
+    competition.advanceToPhase(3, {'from': admin})
+    verify(3, competition.getPhase(challenge_number))
+    return challenge_number
+
+
+def build_phase_3_world(num_stakers):
+    """
+    A competition world whose challenge 1 is in phase 3, staked and submitted to by its first `num_stakers`
+    participants. The challenge number is kept under `challenge_number`.
+    """
+    world = build_competition_world()
+    world['challenge_number'] = run_challenge_to_phase_3(world, world['participants'][:num_stakers])
+    return world
+
+
+def build_token_world():
+    """The token proxy and a competition with an open challenge, with tokens airdropped to the token test roles."""
+    dev_accounts = development_accounts()
+    admin, client1, client2, fee_collector, tax_collector = dev_accounts[:5]
+    participants = dev_accounts[5:]
+    token, proxy_admin = deploy_token_proxy(admin, INITIAL_SUPPLY)
+
+    # Upgradeable Competition
+    competition = Competition.deploy({'from': admin})
+    shareholders = set([admin.address])
+
+    # airdrop to participants
+    total_airdrop = int(Decimal(0.01) * Decimal(token.totalSupply()))
+    single_airdrop = total_airdrop // (len(dev_accounts) - 1)
+    for recipient in [client1, client2] + participants:
+        token.transfer(recipient, single_airdrop, {'from': admin})
+        shareholders.add(recipient.address)
+
+    stake_threshold = int(Decimal('10e6'))
+    challenge_rewards_threshold = int(Decimal('10e6'))
+    competition.initialize(stake_threshold, challenge_rewards_threshold, token, {'from': admin})
+    token.increaseAllowance(competition, challenge_rewards_threshold * 2, {'from': admin})
+    competition.sponsor(challenge_rewards_threshold * 2, {'from': admin})
+    competition.openChallenge(getHash(), getHash(), getTimestamp(), getTimestamp(), {'from': admin})
+    shareholders.add(competition.address)
+    return {'token': token, 'proxy_admin': proxy_admin, 'competition': competition, 'admin': admin,
+            'client1': client1, 'client2': client2, 'fee_collector': fee_collector, 'tax_collector': tax_collector,
+            'participants': participants, 'initial_supply': INITIAL_SUPPLY, 'competition_name': COMPETITION_NAME,
+            'shareholders': shareholders}
+
+
+def build_multisig_world(required=6):
+    """A multisig of development accounts 1 to 10 holding the whole supply of a token, and a competition."""
+    dev_accounts = development_accounts()
+    admin, owners, non_owners = dev_accounts[0], dev_accounts[1:11], dev_accounts[11:]
+    multi_sig = MultiSig.deploy(owners, required, {'from': admin})
+    token = Token.deploy({'from': admin})
+    token.initialize("RockCap Token", "RCP", int(Decimal('100000000e6')), admin, {'from': admin})
+    competition = Competition.deploy({'from': admin})
+    stake_threshold = int(Decimal('10e6'))
+    challenge_rewards_threshold = int(Decimal('10e6'))
+    competition.initialize(stake_threshold, challenge_rewards_threshold, token, {'from': admin})
+    token.transfer(multi_sig, token.balanceOf(admin), {'from': admin})
+    return {'multi_sig': multi_sig, 'token': token, 'competition': competition, 'admin': admin, 'owners': owners,
+            'non_owners': non_owners, 'required': required}
+
+
+BUILDERS = {
+    'competition': build_competition_world,
+    'phase_3': build_phase_3_world,
+    'token': build_token_world,
+    'multisig': build_multisig_world,
+}
+
+
+class WorldCache:
+    """
+    Worlds deployed once per session and kept in brownie's chain snapshot.
+
+    Every world is deployed on the same chain, so one `chain.snapshot()` holds all of them. A world not built yet is
+    deployed on top of the snapshot, which is then taken again; every test reverts to it with `chain.revert()` when it
+    ends. Worlds are requested by builder name and arguments, e.g. `get('phase_3', 5)` for a pre-advanced challenge
+    in phase 3 with five submitters. If something else moved the chain away from the snapshot between tests, e.g. a
+    module reset by `module_isolation` or a test taking its own snapshot, the cached worlds are dropped and built
+    again as needed.
+    """
+    def __init__(self, on_build=None):
+        self.worlds = {}
+        self.head = None
+        self.start = None
+        self.on_build = on_build
+
+    def latest_hash(self):
+        return web3.eth.get_block('latest')['hash']
+
+    def begin(self):
+        # Called before each test: the chain is expected at the snapshot the previous test reverted to.
+        self.start = self.latest_hash()
+        if self.head != self.start:
+            self.worlds.clear()
+            self.head = None
+
+    def end(self):
+        # Called after each test.
+        if self.head is not None:
+            chain.revert()
+        self.start = None
+
+    def available(self, name, *args):
+        """Whether `get(name, *args)` can be called now: the world is built, or the test has not sent transactions."""
+        return (name,) + args in self.worlds or self.latest_hash() == self.start
+
+    def get(self, name, *args):
+        key = (name,) + args
+        if key not in self.worlds:
+            if self.latest_hash() != self.start:
+                raise RuntimeError("World {} is built after the test sent transactions".format(key))
+            world = BUILDERS[name](*args)
+            if self.on_build is not None:
+                self.on_build(world)
+            self.worlds[key] = world
+            chain.snapshot()
+            self.head = self.start = self.latest_hash()
+        return self.worlds[key]